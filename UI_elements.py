@@ -5,14 +5,17 @@ class ScrollFrame(tk.Frame):
     """
     A custom scrollable frame widget.
     Allows content to extend beyond the visible area and be scrolled.
+    on_scroll() is called whenever the visible part of the content changes, so
+    callers can build or recycle widgets for just that part (see visibleSpan()).
     """
-    def __init__(self, parent, *args, **kw):
+    def __init__(self, parent, *args, on_scroll=None, **kw):
         tk.Frame.__init__(self, parent, *args, **kw)
+        self.on_scroll = on_scroll
 
         self.canvas = tk.Canvas(self, borderwidth=0, background="#ffffff")
         self.frame = tk.Frame(self.canvas, background="#ffffff")
         self.vsb = tk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
-        self.canvas.configure(yscrollcommand=self.vsb.set)
+        self.canvas.configure(yscrollcommand=self.onCanvasScroll)
 
         self.vsb.pack(side="right", fill="y")
         self.canvas.pack(side="left", fill="both", expand=True)
@@ -31,6 +34,20 @@ class ScrollFrame(tk.Frame):
         canvas_width = event.width
         self.canvas.itemconfig(self.canvas_frame_id, width=canvas_width)
 
+    def onCanvasScroll(self, first, last):
+        """Update the scrollbar and tell the owner which part of the content is now visible"""
+        self.vsb.set(first, last)
+        if self.on_scroll:
+            self.on_scroll()
+
+    def visibleSpan(self):
+        """(top, bottom) of the visible area in inner frame pixels"""
+        top = self.canvas.canvasy(0) - self.canvas.coords(self.canvas_frame_id)[1]
+        return top, top + self.canvas.winfo_height()
+
+    def scrollToTop(self):
+        self.canvas.yview_moveto(0)
+
 class NotificationManager:
     """Manages simple in-app notifications."""
     _notification_label = None
@@ -60,4 +77,120 @@ class NotificationManager:
         """Clears the displayed notification."""
         if NotificationManager._notification_label:
             NotificationManager._notification_label.config(text="")
-            NotificationManager._after_id = None
\ No newline at end of file
+            NotificationManager._after_id = None
+
+class GifPlayer:
+    """
+    Plays an animation in a Label, scheduling each frame with its own duration.
+    Frames can be added while playback is running (progressive loading); the player
+    waits on the last available frame until more arrive or mark_complete() is called.
+    Long animations can instead be streamed with play_stream(), keeping only one frame.
+    """
+    DEFAULT_DURATION_MS = 100
+    MIN_DURATION_MS = 20 # Browsers treat smaller GIF delays as "unspecified"
+    STREAM_RETRY_MS = 10 # Poll interval while a streamed frame is still being decoded
+
+    def __init__(self, label):
+        self.label = label
+        self.frames = [] # (PhotoImage, duration_ms)
+        self.complete = False
+        self.paused = False
+        self._index = 0
+        self._after_id = None
+        self._waiting = False # Stalled on the last decoded frame
+        self._next_frame = None # Frame source in streaming mode
+
+    def _duration(self, duration_ms):
+        if duration_ms is None or duration_ms < self.MIN_DURATION_MS:
+            return self.DEFAULT_DURATION_MS
+        return duration_ms
+
+    def add_frame(self, photo, duration_ms=None):
+        """Appends a frame. The first frame is shown immediately."""
+        self.frames.append((photo, self._duration(duration_ms)))
+        if len(self.frames) == 1:
+            self._show(0)
+        elif self._waiting:
+            self._waiting = False
+            self._advance()
+
+    def mark_complete(self):
+        """Signals that every frame has been added so playback can loop."""
+        self.complete = True
+        if self._waiting:
+            self._waiting = False
+            self._advance()
+
+    def play_stream(self, next_frame):
+        """
+        Plays frames pulled one at a time from next_frame(), which returns (photo, duration_ms)
+        or None if the next frame is not decoded yet. Only the frame on screen is kept.
+        """
+        self.stop()
+        self._next_frame = next_frame
+        self._pull()
+
+    def pause(self):
+        """Stops the frame timer but keeps the current frame on screen."""
+        self.paused = True
+        self._cancel()
+
+    def resume(self):
+        """Restarts the frame timer after pause()."""
+        if self.paused:
+            self.paused = False
+            if self._next_frame:
+                self._pull()
+            elif self.frames:
+                self._schedule()
+
+    def stop(self):
+        """Stops playback and drops every frame."""
+        self._cancel()
+        self.frames = []
+        self.complete = False
+        self._index = 0
+        self._waiting = False
+        self._next_frame = None
+        self.label.config(image='')
+        self.label.image = None
+
+    def _show(self, index):
+        self._index = index
+        photo = self.frames[index][0]
+        self.label.config(image=photo)
+        self.label.image = photo
+        self._schedule()
+
+    def _schedule(self):
+        self._cancel()
+        if not self.paused and (len(self.frames) > 1 or not self.complete):
+            self._after_id = self.label.after(self.frames[self._index][1], self._advance)
+
+    def _advance(self):
+        self._after_id = None
+        next_index = self._index + 1
+        if next_index >= len(self.frames):
+            if not self.complete:
+                self._waiting = True # add_frame() or mark_complete() resumes playback
+                return
+            next_index = 0
+        self._show(next_index)
+
+    def _pull(self):
+        self._after_id = None
+        if self.paused:
+            return
+        frame = self._next_frame()
+        delay = self.STREAM_RETRY_MS
+        if frame is not None:
+            photo, duration_ms = frame
+            self.label.config(image=photo)
+            self.label.image = photo
+            delay = self._duration(duration_ms)
+        self._after_id = self.label.after(delay, self._pull)
+
+    def _cancel(self):
+        if self._after_id:
+            self.label.after_cancel(self._after_id)
+            self._after_id = None
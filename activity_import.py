@@ -0,0 +1,275 @@
+"""
+Imports activity files exported by watches and bike computers (GPX and TCX) as logged sessions.
+
+Files are parsed with iterparse. Every element is cleared and detached from its parent as soon
+as it ends, so the XML tree never grows, however large the file is. Trackpoint samples are
+collected in arrays of 8 + 4 bytes per sample and packed into a samples.py chunk whenever a
+channel fills one; packed chunks are staged in a temporary file, so memory stays within a
+chunk per channel however long the activity is. Each file becomes one exercise log, with its
+duration and calories derived from the file, and one samples.py series per sensor channel.
+Only once the whole file has been parsed and packed does the worker take the write lock, for
+one short transaction that inserts the log, copies the staged chunks in and records the
+import; a file that fails leaves nothing behind. A directory is imported by a process pool,
+one file per task, so the workers parse in parallel and only their short commits take turns.
+
+    python activity_import.py USERNAME PATH [PATH ...] [--workers N] [--exercise NAME]
+"""
+import argparse
+import datetime
+import os
+import pickle
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
+from array import array
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import database
+import samples
+
+ACTIVITY_EXTENSIONS = (".gpx", ".tcx")
+
+# Local tag name inside a trackpoint -> sample channel. TCX heart rate is HeartRateBpm/Value.
+CHANNEL_TAGS = {
+    "hr": "heart_rate", "Value": "heart_rate",
+    "cad": "cadence", "Cadence": "cadence", "RunCadence": "cadence",
+    "power": "power", "Watts": "power",
+    "ele": "elevation", "AltitudeMeters": "elevation",
+}
+TIME_TAGS = ("time", "Time")
+POINT_TAGS = ("trkpt", "Trackpoint")
+
+# Sport as written by the device (TCX Activity/@Sport, GPX trk/type) -> exercise name
+SPORT_EXERCISES = {
+    "running": "Running", "run": "Running",
+    "biking": "Cycling", "cycling": "Cycling", "ride": "Cycling",
+    "walking": "Walking", "walk": "Walking",
+    "hiking": "Hiking",
+    "swimming": "Swimming",
+}
+DEFAULT_EXERCISE = "Cardio"
+
+# Calorie estimate for files without one (GPX never has it): MET x body weight x hours
+SPORT_METS = {"Running": 9.8, "Cycling": 7.5, "Walking": 3.5, "Hiking": 6.0, "Swimming": 7.0}
+DEFAULT_MET = 6.0
+DEFAULT_BODY_WEIGHT_KG = 70
+
+Activity = namedtuple("Activity", "sport start_ms end_ms duration_minutes calories_burned channels")
+
+def _timestamp_ms(text):
+    """Parses an ISO 8601 time as written in GPX/TCX files; times without a zone are UTC."""
+    moment = datetime.datetime.fromisoformat(text.strip().replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return int(moment.timestamp() * 1000)
+
+def _trackpoints(path, summary):
+    """
+    Yields {"time": ..., channel: value} per trackpoint of a GPX or TCX file, and fills
+    `summary` with the sport and the per-lap totals as they are read.
+    """
+    stack = [] # Open elements, to detach each finished one from its parent
+    names = {} # Tag -> local name without the namespace
+    point = None
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        name = names.get(elem.tag)
+        if name is None:
+            name = names[elem.tag] = elem.tag.rpartition("}")[2]
+        if event == "start":
+            stack.append(elem)
+            if name in POINT_TAGS:
+                point = {}
+            elif name == "Activity":
+                summary["sport"] = elem.get("Sport")
+            continue
+
+        stack.pop()
+        text = elem.text.strip() if elem.text else ""
+        if name in POINT_TAGS:
+            yield point
+            point = None
+        elif point is not None:
+            field = "time" if name in TIME_TAGS else CHANNEL_TAGS.get(name)
+            if field and text:
+                point[field] = text
+        elif text and stack:
+            parent = names[stack[-1].tag]
+            if parent == "Lap" and name in ("TotalTimeSeconds", "Calories"):
+                summary[name] = summary.get(name, 0) + float(text)
+            elif parent == "trk" and name == "type":
+                summary["sport"] = text
+
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+
+def _exercise_name(sport):
+    """Exercise an activity of the given sport is logged as."""
+    return SPORT_EXERCISES.get((sport or "").strip().lower(), DEFAULT_EXERCISE)
+
+def parse_activity(path, write_chunk=None):
+    """
+    Reads a GPX or TCX file into an Activity whose channels give the sample count per channel.
+    The samples are passed to write_chunk(channel, timestamps, values) as array('q') / array('f')
+    pairs of up to samples.CHUNK_SAMPLES, each channel's in time order, as soon as they fill a
+    chunk and at the end of the file.
+    """
+    summary = {}
+    channels = {} # Channel -> (timestamps, values) not yet written
+    counts = {}
+    start_ms = end_ms = None
+    for point in _trackpoints(path, summary):
+        if "time" not in point:
+            continue
+        timestamp = _timestamp_ms(point.pop("time"))
+        if start_ms is None:
+            start_ms = timestamp
+        end_ms = timestamp
+        for channel, text in point.items():
+            try:
+                value = float(text)
+            except ValueError:
+                continue
+            times, values = channels.setdefault(channel, (array("q"), array("f")))
+            times.append(timestamp)
+            values.append(value)
+            if len(times) == samples.CHUNK_SAMPLES:
+                counts[channel] = counts.get(channel, 0) + len(times)
+                if write_chunk is not None:
+                    write_chunk(channel, times, values)
+                channels[channel] = (array("q"), array("f"))
+    if start_ms is None:
+        raise ValueError("no timed trackpoints")
+    for channel, (times, values) in channels.items():
+        if times:
+            counts[channel] = counts.get(channel, 0) + len(times)
+            if write_chunk is not None:
+                write_chunk(channel, times, values)
+
+    sport = summary.get("sport")
+    if "TotalTimeSeconds" in summary:
+        duration_minutes = summary["TotalTimeSeconds"] / 60 # Moving time of the laps
+    else:
+        duration_minutes = (end_ms - start_ms) / 60000
+    calories = summary.get("Calories") or None
+    if calories is None:
+        met = SPORT_METS.get(_exercise_name(sport), DEFAULT_MET)
+        calories = met * DEFAULT_BODY_WEIGHT_KG * duration_minutes / 60
+    return Activity(sport, start_ms, end_ms, round(duration_minutes, 2), round(calories), counts)
+
+def _exercise_id(cursor, name):
+    """Id of the named exercise, creating it on first use, without committing."""
+    cursor.execute("INSERT INTO exercises (name, description) VALUES (?, 'Imported activity.') "
+                   "ON CONFLICT (name) DO NOTHING", (name,))
+    return cursor.execute("SELECT id FROM exercises WHERE name = ?", (name,)).fetchone()[0]
+
+def _log_date(timestamp_ms):
+    """Log date (UTC) of a millisecond timestamp."""
+    return datetime.datetime.fromtimestamp(timestamp_ms / 1000, datetime.timezone.utc).date().isoformat()
+
+def _staged_chunks(staging):
+    """Reads back the (channel, chunk rows) pairs pickled into `staging`, in order."""
+    staging.seek(0)
+    while True:
+        try:
+            yield pickle.load(staging)
+        except EOFError:
+            return
+
+def import_activity(path, user_id, exercise_name=None):
+    """
+    Logs a GPX or TCX file as one session of `user_id` and stores its sensor samples, all in one
+    transaction taken after the file has been parsed. Returns the new log id, 0 if the file was
+    imported before, or None on error.
+    """
+    conn = database.connect_db()
+    cursor = conn.cursor()
+    try:
+        source = os.path.abspath(path)
+        source_size = os.path.getsize(source)
+        row = conn.execute("SELECT source_size FROM import_progress WHERE source = ? AND table_name = 'activity'",
+                           (source,)).fetchone()
+        if row and row[0] == source_size:
+            return 0
+
+        with tempfile.TemporaryFile() as staging:
+            def stage_chunk(channel, times, values):
+                pickle.dump((channel, samples.encode_chunks(times, values)), staging, pickle.HIGHEST_PROTOCOL)
+
+            # Parse and pack with no lock held, so other workers commit in the meantime
+            activity = parse_activity(source, stage_chunk)
+            conn.execute("BEGIN IMMEDIATE")
+            exercise_id = _exercise_id(cursor, exercise_name or _exercise_name(activity.sport))
+            log_id = database.insert_exercise_log(cursor, user_id, exercise_id, None, None, None,
+                                                  activity.duration_minutes, activity.calories_burned,
+                                                  f"Imported from {os.path.basename(path)}",
+                                                  _log_date(activity.start_ms))
+            for channel, chunks in _staged_chunks(staging):
+                samples.insert_chunks(cursor, log_id, channel, chunks)
+        cursor.execute("""
+            INSERT INTO import_progress (source, table_name, source_size, records_done) VALUES (?, 'activity', ?, 1)
+            ON CONFLICT (source, table_name) DO UPDATE SET source_size = excluded.source_size
+        """, (source, source_size))
+        conn.commit()
+        return log_id
+    except Exception as e:
+        print(f"Error importing '{path}': {e}")
+        conn.rollback()
+        return None
+
+def activity_files(paths):
+    """Expands directories into the GPX/TCX files they contain, in name order."""
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(ACTIVITY_EXTENSIONS):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+def _init_worker(database_name):
+    database.DATABASE_NAME = database_name # Pool workers may be spawned rather than forked
+
+def import_activities(paths, user_id, exercise_name=None, workers=None):
+    """
+    Imports GPX/TCX files and directories of them with a pool of `workers` processes (one per
+    CPU by default). Returns (imported, already imported, failed) file counts.
+    """
+    counts = [0, 0, 0]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(database.DATABASE_NAME,)) as pool:
+        tasks = [(path, pool.submit(import_activity, path, user_id, exercise_name))
+                 for path in activity_files(paths)]
+        for path, task in tasks:
+            try:
+                log_id = task.result()
+            except Exception as e: # The worker itself failed; the other files carry on
+                print(f"Error importing '{path}': {e}")
+                log_id = None
+            counts[0 if log_id else 1 if log_id == 0 else 2] += 1
+            if log_id:
+                print(f"  {os.path.basename(path)}: log {log_id}")
+    # The workers wrote through their own connections and caches
+    database.invalidate_exercise_catalog()
+    database.bump_data_version("exercise_logs", user_id)
+    return tuple(counts)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import GPX/TCX activity files as logged sessions.")
+    parser.add_argument("username")
+    parser.add_argument("paths", nargs="+", metavar="PATH", help="activity files or directories of them")
+    parser.add_argument("--workers", type=int, help="processes to parse with, one per CPU by default")
+    parser.add_argument("--exercise", help="log every file as this exercise instead of one named after its sport")
+    args = parser.parse_args(argv)
+
+    database.init_db()
+    user_id = database.get_user_id(args.username)
+    if user_id is None:
+        print(f"Unknown user '{args.username}'.")
+        return 1
+    imported, skipped, failed = import_activities(args.paths, user_id, args.exercise, args.workers)
+    print(f"Imported {imported} activities ({skipped} already imported, {failed} failed).")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
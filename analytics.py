@@ -0,0 +1,220 @@
+import datetime
+
+import numpy as np
+
+import database
+
+# One row per exercise log. Dates are days since 1970-01-01 and missing numbers are
+# stored as 0 (sets/reps) or NaN (weight/duration/calories) so every column is numeric.
+LOG_DTYPE = np.dtype([
+    ("day", "i4"),
+    ("exercise_id", "i4"),
+    ("sets", "i4"),
+    ("reps", "i4"),
+    ("weight", "f8"),
+    ("duration", "f8"),
+    ("calories", "f8"),
+])
+
+# What summarize_totals() works from instead of the logs themselves: totals per training day
+# across exercises, and rep maxes (the heaviest weight and largest volume per exercise and rep
+# count). The database keeps both current as logs are written, so loading them costs the
+# number of days trained rather than the number of logs.
+DAILY_DTYPE = np.dtype([
+    ("day", "i4"),
+    ("logs", "i4"),
+    ("volume", "f8"),
+    ("calories", "f8"),
+])
+REP_MAX_DTYPE = np.dtype([
+    ("exercise_id", "i4"),
+    ("reps", "i4"),
+    ("weight", "f8"), # NaN if no log at this rep count has a weight
+    ("volume", "f8"),
+])
+
+# 1970-01-01 was a Thursday; shifting by 3 days makes weeks start on Monday
+_WEEK_OFFSET = 3
+
+LOAD_BATCH_ROWS = 4096 # Rows fetched per fetchmany() call by load_user_logs()
+
+def load_user_logs(user_id):
+    """
+    Loads all of a user's exercise logs into a LOG_DTYPE structured array with one query.
+    Rows are fetched in batches and copied into an array sized up front, which NumPy fills
+    from the row tuples in C. The sqlite3 module still builds a tuple per row, so loading
+    costs about 3 µs per log, several times what summarize() needs for it.
+    """
+    conn = database.connect_db()
+    count = conn.execute("SELECT count(*) FROM exercise_logs WHERE user_id = ?", (user_id,)).fetchone()[0]
+    cursor = conn.execute("""
+        SELECT CAST(julianday(log_date) - 2440587.5 AS INTEGER), exercise_id,
+               coalesce(sets, 0), coalesce(reps, 0),
+               coalesce(weight, -1.0), coalesce(duration_minutes, -1.0), coalesce(calories_burned, -1.0)
+        FROM exercise_logs
+        WHERE user_id = ?
+    """, (user_id,))
+    logs = np.empty(count, dtype=LOG_DTYPE)
+    loaded = 0
+    for rows in iter(lambda: cursor.fetchmany(LOAD_BATCH_ROWS), []):
+        if loaded + len(rows) > len(logs): # Logged since the count
+            logs = np.resize(logs, loaded + len(rows))
+        logs[loaded:loaded + len(rows)] = rows
+        loaded += len(rows)
+    logs = logs[:loaded]
+    for column in ("weight", "duration", "calories"):
+        values = logs[column]
+        values[values < 0] = np.nan # Sentinel for NULL from the query above
+    return logs
+
+def load_user_totals(user_id):
+    """Loads a user's daily totals (DAILY_DTYPE) and rep maxes (REP_MAX_DTYPE) as two arrays."""
+    daily = np.array(database.get_user_daily_totals(user_id), dtype=DAILY_DTYPE)
+    rep_maxes = np.array([(exercise_id, reps, np.nan if weight is None else weight, max_volume)
+                          for exercise_id, reps, weight, max_volume in database.get_user_rep_maxes(user_id)],
+                         dtype=REP_MAX_DTYPE)
+    return daily, rep_maxes
+
+def volume(logs):
+    """Training volume per log: sets x reps x weight (0 when there is no weight)."""
+    return logs["sets"] * logs["reps"] * np.nan_to_num(logs["weight"])
+
+def estimated_1rm(weight, reps, formula="epley"):
+    """
+    Estimated one-rep max for arrays of weights and reps.
+    Epley: w * (1 + r / 30). Brzycki: w * 36 / (37 - r), undefined from 37 reps up.
+    A single rep is its own 1RM; logs without reps or weight give NaN.
+    """
+    weight = np.asarray(weight, dtype="f8")
+    reps = np.asarray(reps, dtype="f8")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if formula == "epley":
+            one_rm = weight * (1 + reps / 30)
+        elif formula == "brzycki":
+            one_rm = np.where(reps < 37, weight * 36 / (37 - reps), np.nan)
+        else:
+            raise ValueError(f"Unknown 1RM formula '{formula}', expected 'epley' or 'brzycki'.")
+    one_rm = np.where(reps == 1, weight, one_rm)
+    return np.where(reps > 0, one_rm, np.nan)
+
+def personal_records(logs, formula="epley"):
+    """
+    Best values per exercise. Returns {exercise_id: {"max_weight", "best_1rm", "max_volume",
+    "max_reps"}}; NaN means the exercise was never logged with that measure.
+    """
+    return _best_per_exercise(logs["exercise_id"], logs["weight"], logs["reps"], volume(logs), formula)
+
+def _best_per_exercise(exercise_ids, weights, reps, volumes, formula):
+    """personal_records() of rows given as columns: single logs, or rep maxes."""
+    if not len(exercise_ids):
+        return {}
+    order = np.argsort(exercise_ids, kind="stable")
+    exercise_ids, starts = np.unique(exercise_ids[order], return_index=True)
+
+    def best(values):
+        return np.fmax.reduceat(np.asarray(values, dtype="f8")[order], starts)
+
+    columns = {
+        "max_weight": best(weights),
+        "best_1rm": best(estimated_1rm(weights, reps, formula)),
+        "max_volume": best(volumes),
+        "max_reps": best(reps),
+    }
+    return {
+        int(exercise_id): {name: float(values[i]) for name, values in columns.items()}
+        for i, exercise_id in enumerate(exercise_ids)
+    }
+
+def daily_volume(logs):
+    """Total volume for every day from the first to the last log, rest days included."""
+    if not len(logs):
+        return np.array([], dtype="datetime64[D]"), np.array([])
+    first = logs["day"].min()
+    totals = np.bincount(logs["day"] - first, weights=volume(logs))
+    days = np.arange(first, first + len(totals)).astype("datetime64[D]")
+    return days, totals
+
+def rolling_volume(logs, window_days=7):
+    """Volume over the trailing `window_days` days, for every day of the history."""
+    days, totals = daily_volume(logs)
+    cumulative = np.concatenate(([0.0], np.cumsum(totals)))
+    start = np.maximum(np.arange(1, len(totals) + 1) - window_days, 0)
+    return days, cumulative[1:] - cumulative[start]
+
+def weekly_volume_deltas(logs):
+    """
+    Weekly volume with week-over-week change. Returns (week_starts, volume, delta, pct_change);
+    the first week's delta is NaN and pct_change is NaN after a week with no volume.
+    """
+    return _weekly_volume_deltas(logs["day"], volume(logs))
+
+def _weekly_volume_deltas(days, volumes):
+    """weekly_volume_deltas() of rows given as columns: single logs, or daily totals."""
+    if not len(days):
+        empty = np.array([])
+        return np.array([], dtype="datetime64[D]"), empty, empty, empty
+    weeks = (days + _WEEK_OFFSET) // 7
+    first = weeks.min()
+    totals = np.bincount(weeks - first, weights=volumes)
+    week_starts = ((np.arange(first, first + len(totals)) * 7) - _WEEK_OFFSET).astype("datetime64[D]")
+    delta = np.concatenate(([np.nan], np.diff(totals)))
+    previous = np.concatenate(([np.nan], totals[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct_change = np.where(previous > 0, delta / previous * 100, np.nan)
+    return week_starts, totals, delta, pct_change
+
+def streaks(logs, today=None):
+    """
+    Consistency streaks in consecutive training days, from logs or daily totals. "current"
+    counts back from today (or yesterday, so a streak is not lost before today's workout is
+    logged).
+    """
+    if not len(logs):
+        return {"current": 0, "longest": 0, "active_days": 0}
+    active = np.unique(logs["day"])
+    # Indices where a run of consecutive days ends
+    breaks = np.flatnonzero(np.diff(active) != 1)
+    run_ends = np.concatenate((breaks, [len(active) - 1]))
+    run_starts = np.concatenate(([0], breaks + 1))
+    lengths = run_ends - run_starts + 1
+
+    today_day = ((today or datetime.date.today()) - datetime.date(1970, 1, 1)).days
+    current = int(lengths[-1]) if active[-1] >= today_day - 1 else 0
+    return {"current": current, "longest": int(lengths.max()), "active_days": len(active)}
+
+def summarize(logs, today=None, formula="epley"):
+    """Everything the progress summary panel shows, computed from one array of logs."""
+    _weeks, weekly, delta, pct_change = weekly_volume_deltas(logs)
+    return {
+        "total_logs": len(logs),
+        "total_volume": float(volume(logs).sum()) if len(logs) else 0.0,
+        "total_calories": float(np.nansum(logs["calories"])) if len(logs) else 0.0,
+        "latest_week_volume": float(weekly[-1]) if len(weekly) else 0.0,
+        "week_over_week_pct": float(pct_change[-1]) if len(pct_change) else float("nan"),
+        "streaks": streaks(logs, today),
+        "records": personal_records(logs, formula),
+    }
+
+def summarize_totals(daily, rep_maxes, today=None, formula="epley"):
+    """summarize() computed from load_user_totals() instead of every log; the results are the same."""
+    _weeks, weekly, delta, pct_change = _weekly_volume_deltas(daily["day"], daily["volume"])
+    return {
+        "total_logs": int(daily["logs"].sum()),
+        "total_volume": float(daily["volume"].sum()),
+        "total_calories": float(daily["calories"].sum()),
+        "latest_week_volume": float(weekly[-1]) if len(weekly) else 0.0,
+        "week_over_week_pct": float(pct_change[-1]) if len(pct_change) else float("nan"),
+        "streaks": streaks(daily, today),
+        "records": _best_per_exercise(rep_maxes["exercise_id"], rep_maxes["weight"], rep_maxes["reps"],
+                                      rep_maxes["volume"], formula),
+    }
+
+def user_summary(user_id, today=None):
+    """Summarizes a user's logs from their totals, with exercise names attached to the records."""
+    summary = summarize_totals(*load_user_totals(user_id), today)
+    records = {}
+    for ex_id, record in summary["records"].items():
+        exercise = database.get_exercise_by_id(ex_id)
+        records[exercise.name if exercise else f"Exercise {ex_id}"] = record
+    summary["records"] = records
+    return summary
@@ -0,0 +1,478 @@
+"""
+HTTP/JSON API over database.py, so several terminals and a web client can share one database.
+
+The server runs on asyncio and speaks a small subset of HTTP/1.1 itself: keep-alive is
+the default, and request bodies need a Content-Length. Handlers are plain blocking functions
+built on database.py and run in a ThreadPoolExecutor of `pool_size` threads. database.py
+keeps one SQLite connection per thread, so the executor doubles as a bounded connection
+pool. Writes go through the server's db_writer.DatabaseWriter, whose single writer thread
+commits the writes of concurrent requests together instead of having the pool threads contend
+for the SQLite write lock. A write handler only validates the request and queues the write;
+the event loop awaits its commit, so no pool thread sits waiting for one and a commit can
+gather more writes than there are pool threads. List endpoints are paginated: each response
+carries one page of "items" and the "next" value to pass back (as ?cursor= or ?offset=) for
+the following page, or null after the last.
+
+POST /users and POST /login return a "token". Every /users/{id}/... route needs it, sent as
+`Authorization: Bearer <token>`: without a valid token the answer is 401, and with the token
+of another user, 403. Tokens are kept in memory for TOKEN_SECONDS, so they do not outlive the
+server process.
+
+    python api_server.py [--host 127.0.0.1] [--port 8080] [--pool 4] [--db PATH] [--write-delay-ms 0]
+
+Routes (* needs the token of user {id}):
+    POST /users                      {"username", "password"}
+    POST /login                      {"username", "password"}
+    GET  /exercises                  ?limit&offset, or ?q full-text search
+    POST /exercises                  {"name", "description", "image_path", "gif_path"}
+    GET  /exercises/{id}
+  * GET  /users/{id}/workouts        ?limit&cursor, by name
+  * POST /users/{id}/workouts        {"name", "exercise_ids"}
+    GET  /workouts/{id}
+  * GET  /users/{id}/logs            ?limit&cursor, newest first, or ?q full-text search with &offset
+  * POST /users/{id}/logs            {"exercise_id", "log_date", "sets", "reps", "weight", ...}
+  * GET  /users/{id}/trend           ?period&exercise_id&start&end
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import re
+import secrets
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import database
+from db_writer import MAX_DELAY_MS, DatabaseWriter
+
+POOL_SIZE = 4 # Executor threads, and so SQLite connections
+MAX_CLIENTS = 256 # Open client connections served at once; more wait to be served
+KEEPALIVE_TIMEOUT = 15 # Seconds an idle keep-alive connection is kept open
+MAX_BODY_BYTES = 1024 * 1024
+MAX_HEADERS = 100
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+TOKEN_SECONDS = 24 * 3600 # Lifetime of a token issued by /users or /login
+
+EXERCISE_FIELDS = ("id", "name", "description", "image_path", "gif_path")
+LOG_FIELDS = ("log_date", "exercise", "sets", "reps", "weight", "duration_minutes", "calories_burned", "notes")
+LOG_SEARCH_FIELDS = ("id", "log_date", "exercise", "snippet")
+TREND_FIELDS = ("period_start", "logs", "sets", "reps", "volume", "duration_minutes", "calories")
+EXERCISE_TREND_FIELDS = ("period_start", "logs", "sets", "reps", "volume", "avg_weight", "duration_minutes", "calories")
+
+class ApiError(Exception):
+    """Ends a request with an HTTP error status and a JSON {"error": message} body."""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _records(fields, rows):
+    return [dict(zip(fields, row)) for row in rows]
+
+def _page(items, next_value):
+    return {"items": items, "next": next_value}
+
+def _int(query, name, default=None, low=0, high=None):
+    """An integer query parameter, clamped to [low, high]."""
+    values = query.get(name)
+    if not values:
+        return default
+    try:
+        value = int(values[0])
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} must be an integer") from None
+    return max(low, value if high is None else min(value, high))
+
+def _text(query, name):
+    values = query.get(name)
+    return values[0] if values else None
+
+def _limit(query):
+    return _int(query, "limit", DEFAULT_LIMIT, 1, MAX_LIMIT)
+
+def _field(body, name, kind, required=False):
+    """A field of a JSON request body, checked against `kind`."""
+    value = body.get(name)
+    if value is None:
+        if required:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"missing {name}")
+        return None
+    if kind is float and isinstance(value, int) and not isinstance(value, bool):
+        value = float(value)
+    if not isinstance(value, kind) or isinstance(value, bool):
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} must be {'a string' if kind is str else 'a number'}")
+    return value
+
+class PendingWrite:
+    """
+    Returned by a write handler in place of (status, payload): the Future of a write queued on
+    the DatabaseWriter. Once it is committed the response is respond(result); if it fails, an
+    error with `message`, or `conflict` (409) when the write broke a UNIQUE constraint.
+    """
+    def __init__(self, future, respond, message, conflict=None):
+        self.future = future
+        self.respond = respond
+        self.message = message
+        self.conflict = conflict
+
+async def _finish_write(write):
+    """Awaits a PendingWrite on the event loop and returns its (status, payload)."""
+    try:
+        result = await asyncio.wrap_future(write.future)
+    except sqlite3.Error as e:
+        if write.conflict is not None and isinstance(e, sqlite3.IntegrityError):
+            return HTTPStatus.CONFLICT, {"error": write.conflict}
+        print(f"Error writing to the database: {e}")
+        return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": write.message}
+    return write.respond(result)
+
+_sessions = {} # Token -> (user id, expiry on the time.monotonic() clock)
+_sessions_lock = threading.Lock()
+
+def _issue_token(user_id):
+    token = secrets.token_urlsafe(32)
+    now = time.monotonic()
+    with _sessions_lock:
+        for expired in [t for t, (_user_id, expires) in _sessions.items() if expires <= now]:
+            del _sessions[expired]
+        _sessions[token] = (user_id, now + TOKEN_SECONDS)
+    return token
+
+def _authorize(authorization, user_id):
+    """Checks that an Authorization header carries a live token of `user_id`."""
+    scheme, _, token = (authorization or "").partition(" ")
+    with _sessions_lock:
+        session = _sessions.get(token.strip()) if scheme.lower() == "bearer" else None
+    if session is None or session[1] <= time.monotonic():
+        raise ApiError(HTTPStatus.UNAUTHORIZED, "log in and send the token as 'Authorization: Bearer <token>'")
+    if session[0] != user_id:
+        raise ApiError(HTTPStatus.FORBIDDEN, f"the token does not belong to user {user_id}")
+
+def _user_exists(user_id):
+    # Path ids come from clients; a missing user should be a 404, not an empty page
+    if not database.connect_db().execute("SELECT 1 FROM users WHERE id = ?", (user_id,)).fetchone():
+        raise ApiError(HTTPStatus.NOT_FOUND, f"no user {user_id}")
+
+def create_user(query, body, writer):
+    username = _field(body, "username", str, required=True)
+    password = _field(body, "password", str, required=True)
+    return PendingWrite(writer.add_user(username, password),
+                        lambda user_id: (HTTPStatus.CREATED, {"id": user_id, "username": username,
+                                                              "token": _issue_token(user_id)}),
+                        "could not create the user", f"user '{username}' already exists")
+
+def login(query, body, writer):
+    user = database.get_user(_field(body, "username", str, required=True), _field(body, "password", str, required=True))
+    if user is None:
+        raise ApiError(HTTPStatus.UNAUTHORIZED, "wrong username or password")
+    return HTTPStatus.OK, {"id": user[0], "username": user[1], "token": _issue_token(user[0])}
+
+def list_exercises(query, body, writer):
+    limit = _limit(query)
+    offset = _int(query, "offset", 0)
+    search = _text(query, "q")
+    if search:
+        exercises, next_offset = database.search_exercises(search, limit, offset)
+    else:
+        catalog = database.get_all_exercises()
+        exercises = catalog[offset:offset + limit]
+        next_offset = offset + limit if offset + limit < len(catalog) else None
+    return HTTPStatus.OK, _page(_records(EXERCISE_FIELDS, exercises), next_offset)
+
+def create_exercise(query, body, writer):
+    fields = (_field(body, "name", str, required=True), _field(body, "description", str),
+              _field(body, "image_path", str), _field(body, "gif_path", str))
+    return PendingWrite(writer.add_exercise(*fields),
+                        lambda exercise_id: (HTTPStatus.CREATED, dict(zip(EXERCISE_FIELDS, (exercise_id, *fields)))),
+                        "could not create the exercise", f"exercise '{fields[0]}' already exists")
+
+def get_exercise(query, body, writer, exercise_id):
+    exercise = database.get_exercise_by_id(exercise_id)
+    if exercise is None:
+        raise ApiError(HTTPStatus.NOT_FOUND, f"no exercise {exercise_id}")
+    return HTTPStatus.OK, dict(zip(EXERCISE_FIELDS, exercise))
+
+def list_workouts(query, body, writer, user_id):
+    _user_exists(user_id)
+    after = None
+    cursor = _text(query, "cursor")
+    if cursor:
+        # The cursor is the "next" value of the previous page: "<workout id>,<name>"
+        workout_id, _, name = cursor.partition(",")
+        if not workout_id.isdigit():
+            raise ApiError(HTTPStatus.BAD_REQUEST, "invalid cursor")
+        after = (name, int(workout_id))
+    workouts, next_cursor = database.get_user_workouts_page(user_id, _limit(query), after)
+    return HTTPStatus.OK, _page(_records(("id", "name"), workouts), next_cursor and f"{next_cursor[1]},{next_cursor[0]}")
+
+def create_workout(query, body, writer, user_id):
+    _user_exists(user_id)
+    name = _field(body, "name", str, required=True)
+    exercise_ids = body.get("exercise_ids")
+    if not isinstance(exercise_ids, list) or not all(isinstance(i, int) for i in exercise_ids):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "exercise_ids must be a list of integers")
+    missing = [i for i in exercise_ids if database.get_exercise_by_id(i) is None]
+    if missing:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"unknown exercise ids {missing}")
+    return PendingWrite(writer.create_workout(user_id, name, exercise_ids),
+                        lambda workout_id: (HTTPStatus.CREATED, {"id": workout_id, "name": name,
+                                                                 "exercise_ids": exercise_ids}),
+                        "could not create the workout")
+
+def get_workout(query, body, writer, workout_id):
+    exercises = database.get_workout_details(workout_id)
+    if not exercises:
+        raise ApiError(HTTPStatus.NOT_FOUND, f"no workout {workout_id}")
+    return HTTPStatus.OK, {"id": workout_id, "exercises": _records(EXERCISE_FIELDS, exercises)}
+
+def list_logs(query, body, writer, user_id):
+    _user_exists(user_id)
+    limit = _limit(query)
+    search = _text(query, "q")
+    if search:
+        rows, next_offset = database.search_exercise_logs(user_id, search, limit, _int(query, "offset", 0))
+        return HTTPStatus.OK, _page(_records(LOG_SEARCH_FIELDS, rows), next_offset)
+
+    before = None
+    cursor = _text(query, "cursor")
+    if cursor:
+        # The cursor is the "next" value of the previous page: "<log_date>,<log id>"
+        log_date, _, log_id = cursor.rpartition(",")
+        if not log_date or not log_id.isdigit():
+            raise ApiError(HTTPStatus.BAD_REQUEST, "invalid cursor")
+        before = (log_date, int(log_id))
+    rows, next_cursor = database.get_user_exercise_logs_page(user_id, limit, before)
+    return HTTPStatus.OK, _page(_records(LOG_FIELDS, rows), next_cursor and f"{next_cursor[0]},{next_cursor[1]}")
+
+def create_log(query, body, writer, user_id):
+    _user_exists(user_id)
+    exercise_id = _field(body, "exercise_id", int, required=True)
+    if database.get_exercise_by_id(exercise_id) is None:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"unknown exercise id {exercise_id}")
+    log_date = _field(body, "log_date", str) or datetime.date.today().isoformat()
+    try:
+        log_date = datetime.date.fromisoformat(log_date).isoformat()
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "log_date must be YYYY-MM-DD") from None
+    values = [_field(body, "sets", int), _field(body, "reps", int), _field(body, "weight", float),
+              _field(body, "duration_minutes", float), _field(body, "calories_burned", float)]
+    if any(value is not None and value < 0 for value in values):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "numbers must not be negative")
+    return PendingWrite(writer.log_exercise(user_id, exercise_id, *values, _field(body, "notes", str) or "", log_date),
+                        lambda log_id: (HTTPStatus.CREATED, {"id": log_id}), "could not log the exercise")
+
+def get_trend(query, body, writer, user_id):
+    _user_exists(user_id)
+    period = _text(query, "period") or "week"
+    exercise_id = _int(query, "exercise_id")
+    start, end = _text(query, "start"), _text(query, "end")
+    try:
+        if exercise_id is None:
+            return HTTPStatus.OK, {"items": _records(TREND_FIELDS, database.get_user_trend(user_id, period, start, end))}
+        rows = database.get_exercise_trend(user_id, exercise_id, period, start, end)
+        return HTTPStatus.OK, {"items": _records(EXERCISE_TREND_FIELDS, rows)}
+    except ValueError as e: # Unknown period
+        raise ApiError(HTTPStatus.BAD_REQUEST, str(e)) from None
+
+# (method, path pattern, handler, owner only); handlers are called with (query, body, writer),
+# then the numeric path segments as ints. Owner-only routes start with the user id, and need
+# that user's token.
+ROUTES = [
+    ("POST", r"/users", create_user, False),
+    ("POST", r"/login", login, False),
+    ("GET", r"/exercises", list_exercises, False),
+    ("POST", r"/exercises", create_exercise, False),
+    ("GET", r"/exercises/(\d+)", get_exercise, False),
+    ("GET", r"/users/(\d+)/workouts", list_workouts, True),
+    ("POST", r"/users/(\d+)/workouts", create_workout, True),
+    ("GET", r"/workouts/(\d+)", get_workout, False),
+    ("GET", r"/users/(\d+)/logs", list_logs, True),
+    ("POST", r"/users/(\d+)/logs", create_log, True),
+    ("GET", r"/users/(\d+)/trend", get_trend, True),
+]
+_ROUTES = [(method, re.compile(pattern + r"/?"), handler, owner_only)
+           for method, pattern, handler, owner_only in ROUTES]
+
+def handle_request(method, target, body, writer, authorization=None):
+    """
+    Routes one request and runs its handler, queuing writes on `writer`. `authorization` is
+    the request's Authorization header. Returns (status, JSON-able payload), or a PendingWrite
+    for the caller to await; blocks on SQLite.
+    """
+    url = urlsplit(target)
+    allowed = []
+    for route_method, pattern, handler, owner_only in _ROUTES:
+        match = pattern.fullmatch(url.path)
+        if match is None:
+            continue
+        if route_method != method:
+            allowed.append(route_method)
+            continue
+        try:
+            if owner_only:
+                _authorize(authorization, int(match.group(1)))
+            data = {}
+            if body:
+                data = json.loads(body)
+                if not isinstance(data, dict):
+                    raise ApiError(HTTPStatus.BAD_REQUEST, "the request body must be a JSON object")
+            return handler(parse_qs(url.query), data, writer, *map(int, match.groups()))
+        except ApiError as e:
+            return e.status, {"error": str(e)}
+        except ValueError as e: # Malformed JSON
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except Exception as e:
+            print(f"Error handling {method} {url.path}: {e!r}")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "internal error"}
+    if allowed:
+        return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"use {' or '.join(allowed)}"}
+    return HTTPStatus.NOT_FOUND, {"error": f"no route for {url.path}"}
+
+def _response(status, payload, keep_alive):
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+class ApiServer:
+    """
+    Serves ROUTES over HTTP/1.1 with keep-alive. Handlers run on a fixed pool of executor
+    threads, each with its own persistent SQLite connection, and writes on one writer thread,
+    which waits up to write_delay_ms for more writes to join each commit.
+    """
+    def __init__(self, host="127.0.0.1", port=8080, pool_size=POOL_SIZE, max_clients=MAX_CLIENTS,
+                 write_delay_ms=MAX_DELAY_MS):
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.write_delay_ms = write_delay_ms
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="api-db")
+        self.writer = None # DatabaseWriter, from start() until close()
+        self._clients = asyncio.Semaphore(max_clients)
+        self._server = None
+
+    async def start(self):
+        """Starts listening; returns the bound port (useful with port=0)."""
+        await asyncio.get_running_loop().run_in_executor(self.executor, database.init_db)
+        self.writer = DatabaseWriter(max_delay_ms=self.write_delay_ms)
+        self._server = await asyncio.start_server(self._serve_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"Serving on http://{self.host}:{self.port} with {self.pool_size} database connections.")
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Stops accepting clients and closes every pool thread's database connection."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        # Each pool thread blocks on the barrier until all have arrived, so each closes its own connection
+        barrier = threading.Barrier(self.pool_size)
+        def close_connection():
+            barrier.wait()
+            database.close_db()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, close_connection) for _ in range(self.pool_size)))
+        self.executor.shutdown()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    async def _read_request(self, reader):
+        """
+        Returns (method, target, keep_alive, body, authorization), or None when the client is
+        done or idle.
+        """
+        try:
+            line = await asyncio.wait_for(reader.readline(), KEEPALIVE_TIMEOUT)
+        except asyncio.TimeoutError:
+            return None
+        if not line.strip():
+            return None
+        parts = line.decode("latin-1").split()
+        if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "malformed request line")
+        method, target, version = parts
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise ApiError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "too many headers")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "invalid Content-Length") from None
+        if length > MAX_BODY_BYTES:
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "request body too large")
+        body = await reader.readexactly(length) if length > 0 else b""
+        return method, target, keep_alive, body, headers.get("authorization")
+
+    async def _serve_client(self, reader, stream):
+        loop = asyncio.get_running_loop()
+        async with self._clients:
+            try:
+                while True:
+                    try:
+                        request = await self._read_request(reader)
+                    except ApiError as e:
+                        stream.write(_response(e.status, {"error": str(e)}, keep_alive=False))
+                        await stream.drain()
+                        break
+                    if request is None:
+                        break
+                    method, target, keep_alive, body, authorization = request
+                    result = await loop.run_in_executor(self.executor, handle_request, method, target, body,
+                                                        self.writer, authorization)
+                    status, payload = await _finish_write(result) if isinstance(result, PendingWrite) else result
+                    stream.write(_response(status, payload, keep_alive))
+                    await stream.drain()
+                    if not keep_alive:
+                        break
+            except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+                pass # Client went away or sent an over-long line
+            finally:
+                stream.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP/JSON API over the fitness tracker database.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--pool", type=int, default=POOL_SIZE, help="database connections (executor threads)")
+    parser.add_argument("--db", help=f"database file (default: {database.DATABASE_NAME})")
+    parser.add_argument("--write-delay-ms", type=float, default=MAX_DELAY_MS,
+                        help="longest a write waits for others to join its commit")
+    args = parser.parse_args(argv)
+    if args.db:
+        database.DATABASE_NAME = args.db
+
+    async def serve():
+        server = ApiServer(args.host, args.port, args.pool, write_delay_ms=args.write_delay_ms)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+Offline asset pipeline for exercise images and GIFs.
+
+The build step turns each source image into a pack file holding its frames already
+resized to the display sizes, PNG encoded, together with every frame's duration and
+an offset index. At runtime packs are read through mmap and only the frames that are
+actually shown get decoded.
+
+Asset paths stored in the database are relative to ASSET_DIR, and each pack mirrors that
+relative path under PACK_DIR, so files with the same name in different directories get
+different packs. A pack records the size and mtime of the file it was built from, and a
+stale pack is ignored. Runtime lookups never build: an asset without an up-to-date pack is
+decoded from its source, and frame_loader.py then rebuilds the pack on its low-priority
+prefetch thread. Packs are built ahead of time with
+    python -m fitness_tracker build-packs
+or, for a directory of source files,
+    python asset_packs.py [source_dir] [--out packs]
+"""
+import hashlib
+import io
+import mmap
+import os
+import struct
+import sys
+import threading
+
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+PACK_DIR = os.path.join(ASSET_DIR, "packs")
+PACK_EXTENSION = ".fpk"
+
+# Display sizes built for each kind of source asset
+THUMBNAIL_SIZE = (100, 100)
+ANIMATION_SIZE = (300, 300)
+DISPLAY_SIZES = {
+    ".png": [THUMBNAIL_SIZE],
+    ".gif": [ANIMATION_SIZE],
+}
+
+# File layout (little endian):
+#   header   magic, format version, variant count, source mtime (ns), source size
+#   variants width, height, frame count              (one per display size)
+#   frames   payload offset, payload length, duration (one per frame, variants in order)
+#   payload  PNG encoded frames
+MAGIC = b"FTPK"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<4sHHqQ")
+VARIANT = struct.Struct("<HHI")
+FRAME = struct.Struct("<QII")
+
+def resolve_asset(asset_path):
+    """Absolute path of an asset; relative paths are relative to ASSET_DIR, not the working directory."""
+    return os.path.normpath(os.path.join(ASSET_DIR, asset_path))
+
+def pack_path_for(asset_path, pack_dir=PACK_DIR):
+    """Pack file for an asset, at the asset's path relative to ASSET_DIR under `pack_dir`."""
+    source = resolve_asset(asset_path)
+    rel_path = os.path.relpath(source, ASSET_DIR)
+    if rel_path.startswith(os.pardir):
+        # Outside ASSET_DIR: keep packs of different directories apart by hashing the directory
+        directory_hash = hashlib.sha1(os.path.dirname(source).encode()).hexdigest()[:16]
+        rel_path = os.path.join("_external", directory_hash, os.path.basename(source))
+    return os.path.join(pack_dir, rel_path + PACK_EXTENSION)
+
+class AssetPack:
+    """Read-only, mmap-backed view of one pack file."""
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        self.variants = {} # (width, height) -> list of (offset, length, duration_ms)
+
+        magic, version, variant_count, self.source_mtime_ns, self.source_size = HEADER.unpack_from(self._view, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} asset pack")
+        pos = HEADER.size
+        sizes = []
+        for _ in range(variant_count):
+            width, height, frame_count = VARIANT.unpack_from(self._view, pos)
+            sizes.append(((width, height), frame_count))
+            pos += VARIANT.size
+        for size, frame_count in sizes:
+            frames = []
+            for _ in range(frame_count):
+                frames.append(FRAME.unpack_from(self._view, pos))
+                pos += FRAME.size
+            self.variants[size] = frames
+
+    def built_from(self, st):
+        """True if the pack was built from the source file whose os.stat() result is `st`."""
+        return self.source_mtime_ns == st.st_mtime_ns and self.source_size == st.st_size
+
+    def has_size(self, size):
+        return tuple(size) in self.variants
+
+    def frame_count(self, size):
+        return len(self.variants[tuple(size)])
+
+    def durations(self, size):
+        return [duration for _offset, _length, duration in self.variants[tuple(size)]]
+
+    def frame(self, size, index):
+        """Decodes a single frame. Only this frame's bytes are paged in from the mmap."""
+        from PIL import Image # Deferred so the display sizes above can be imported without PIL
+
+        offset, length, duration = self.variants[tuple(size)][index]
+        img = Image.open(io.BytesIO(self._view[offset:offset + length]))
+        img.load()
+        img.info["duration"] = duration or None
+        return img
+
+    def iter_frames(self, size):
+        for index in range(self.frame_count(size)):
+            yield self.frame(size, index)
+
+    def close(self):
+        self._view.release()
+        self._mmap.close()
+
+_packs = {} # Pack path -> (mtime_ns, AssetPack or None); open packs are shared process-wide
+_packs_lock = threading.Lock()
+
+def _open_pack(path):
+    """Returns the cached AssetPack at `path`, reopening it if the file changed, or None."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    with _packs_lock:
+        cached = _packs.get(path)
+        if cached is None or cached[0] != mtime:
+            try:
+                pack = AssetPack(path)
+            except (OSError, ValueError, struct.error) as e:
+                print(f"Ignoring asset pack {path}: {e}")
+                pack = None
+            _packs[path] = (mtime, pack)
+        return _packs[path][1]
+
+def find_pack(asset_path, size=None, pack_dir=PACK_DIR, build=False):
+    """
+    Returns the up-to-date AssetPack for `asset_path` (containing `size`, if given), or None;
+    callers then fall back to the source file. A pack that is missing, stale or lacks `size`
+    is built from the source file first when `build` is true. Building resizes and encodes
+    every frame, so runtime callers leave it off and build on a background thread instead.
+    """
+    if not asset_path:
+        return None
+    path = pack_path_for(asset_path, pack_dir)
+    pack = _open_pack(path)
+    try:
+        source_st = os.stat(resolve_asset(asset_path))
+    except OSError:
+        source_st = None # Packs can ship without their sources
+    usable = pack is not None and (size is None or pack.has_size(size))
+    if usable and (source_st is None or pack.built_from(source_st)):
+        return pack
+    sizes = DISPLAY_SIZES.get(os.path.splitext(asset_path)[1].lower(), [])
+    if not build or source_st is None or not sizes or (size is not None and tuple(size) not in sizes):
+        return None
+    try:
+        build_pack(resolve_asset(asset_path), sizes, path)
+    except Exception as e:
+        print(f"Could not build asset pack for {asset_path}, decoding the source instead: {e}")
+        return None
+    return find_pack(asset_path, size, pack_dir)
+
+def build_pack(source_path, sizes, out_path):
+    """Resizes every frame of `source_path` to each of `sizes` and writes them to a pack."""
+    from image_cache import decode_frames # Reuses the runtime resampling so packs look identical
+
+    source_st = os.stat(source_path)
+    variants = [(tuple(size), list(decode_frames(source_path, size))) for size in sizes]
+
+    payloads = []
+    for _size, frames in variants:
+        for frame in frames:
+            buf = io.BytesIO()
+            frame.save(buf, format="PNG")
+            payloads.append((buf.getvalue(), frame.info.get("duration") or 0))
+
+    offset = HEADER.size + VARIANT.size * len(variants) + FRAME.size * len(payloads)
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    tmp_path = f"{out_path}.{os.getpid()}.{threading.get_ident()}.tmp" # Builders may race on one pack
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(variants), source_st.st_mtime_ns, source_st.st_size))
+        for (width, height), frames in variants:
+            f.write(VARIANT.pack(width, height, len(frames)))
+        for data, duration in payloads:
+            f.write(FRAME.pack(offset, len(data), duration))
+            offset += len(data)
+        for data, _duration in payloads:
+            f.write(data)
+    os.replace(tmp_path, out_path) # Readers never see a half-written pack
+    return len(payloads)
+
+def build_all(source_dir, pack_dir=PACK_DIR):
+    """Builds a pack for every image and GIF in `source_dir`."""
+    built = 0
+    for name in sorted(os.listdir(source_dir)):
+        sizes = DISPLAY_SIZES.get(os.path.splitext(name)[1].lower())
+        if not sizes:
+            continue
+        source_path = os.path.join(source_dir, name)
+        out_path = pack_path_for(source_path, pack_dir)
+        frame_count = build_pack(source_path, sizes, out_path)
+        print(f"{name}: {frame_count} frame(s) -> {out_path} ({os.path.getsize(out_path) // 1024} KiB)")
+        built += 1
+    return built
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    pack_dir = PACK_DIR
+    if "--out" in args:
+        i = args.index("--out")
+        pack_dir = args[i + 1]
+        del args[i:i + 2]
+    source_dir = args[0] if args else os.path.dirname(os.path.abspath(__file__))
+    print(f"Built {build_all(source_dir, pack_dir)} asset pack(s) in {pack_dir}.")
@@ -0,0 +1,115 @@
+"""Times GPX/TCX activity imports and checks that parsing memory does not grow with the file.
+
+Writes FILES synthetic TCX files of POINTS 1 Hz trackpoints with elevation, heart rate,
+cadence and power, and imports the directory into scratch databases with a
+pool of 1 worker and then of --workers workers (one per CPU by default),
+reporting files/s and the speedup. Then imports one small and one 10x larger
+file under tracemalloc: samples are staged on disk a chunk at a time and the XML tree
+must not grow at all, so the peak must not grow by more than
+MAX_BYTES_PER_POINT per trackpoint (the XML itself takes about 250, the
+buffered samples would take 4 x 12).
+
+    python benchmarks/activity_bench.py [--files N] [--points N] [--workers N]
+"""
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import activity_import
+import database
+
+MAX_BYTES_PER_POINT = 4
+START = datetime.datetime(2024, 5, 1, 7, 30, tzinfo=datetime.timezone.utc)
+
+TCX_HEAD = """<?xml version="1.0" encoding="UTF-8"?>
+<TrainingCenterDatabase xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2"
+    xmlns:ns3="http://www.garmin.com/xmlschemas/ActivityExtension/v2">
+ <Activities><Activity Sport="Biking"><Id>{start}</Id>
+  <Lap StartTime="{start}"><TotalTimeSeconds>{seconds}</TotalTimeSeconds><Calories>{calories}</Calories><Track>
+"""
+TCX_POINT = """   <Trackpoint><Time>{time}</Time><AltitudeMeters>{ele:.1f}</AltitudeMeters><HeartRateBpm><Value>{hr}</Value></HeartRateBpm><Cadence>{cad}</Cadence><Extensions><ns3:TPX><ns3:Watts>{watts}</ns3:Watts></ns3:TPX></Extensions></Trackpoint>
+"""
+TCX_TAIL = """  </Track></Lap></Activity></Activities>
+</TrainingCenterDatabase>
+"""
+
+def write_tcx(path, points, offset_days=0):
+    start = START + datetime.timedelta(days=offset_days)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(TCX_HEAD.format(start=start.isoformat(), seconds=points, calories=points // 6))
+        for i in range(points):
+            f.write(TCX_POINT.format(time=(start + datetime.timedelta(seconds=i)).isoformat(),
+                                     ele=100 + i % 50, hr=120 + i % 40, cad=85 + i % 10, watts=150 + i % 100))
+        f.write(TCX_TAIL)
+
+def import_seconds(directory, db_path, workers):
+    database.DATABASE_NAME = db_path
+    database.init_db()
+    database.add_user("bench", "bench")
+    start = time.perf_counter()
+    imported, _skipped, failed = activity_import.import_activities([directory], 1, workers=workers)
+    elapsed = time.perf_counter() - start
+    database.close_db()
+    if failed or not imported:
+        raise RuntimeError(f"{failed} of {imported + failed} files failed to import")
+    return elapsed
+
+def import_peak_bytes(path, db_path):
+    database.DATABASE_NAME = db_path
+    database.init_db()
+    database.add_user("bench", "bench")
+    tracemalloc.start()
+    log_id = activity_import.import_activity(path, 1)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    database.close_db()
+    if not log_id:
+        raise RuntimeError(f"{path} failed to import")
+    return peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--points", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = os.path.join(tmp, "activities")
+        os.mkdir(directory)
+        for i in range(args.files):
+            write_tcx(os.path.join(directory, f"ride{i:03d}.tcx"), args.points, i)
+        size_mb = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory)) / 2**20
+        print(f"{args.files} TCX files, {args.points:,} trackpoints each, {size_mb:.0f} MiB")
+
+        serial = import_seconds(directory, os.path.join(tmp, "serial.db"), 1)
+        print(f"  1 worker   {serial:6.1f}s  {args.files / serial:6.1f} files/s")
+        if args.workers > 1:
+            pooled = import_seconds(directory, os.path.join(tmp, "pooled.db"), args.workers)
+            print(f"  {args.workers} workers  {pooled:6.1f}s  {args.files / pooled:6.1f} files/s  "
+                  f"({serial / pooled:.1f}x speedup)")
+
+        small, large = os.path.join(tmp, "small.tcx"), os.path.join(tmp, "large.tcx")
+        write_tcx(small, args.points)
+        write_tcx(large, args.points * 10)
+        small_peak = import_peak_bytes(small, os.path.join(tmp, "small.db"))
+        large_peak = import_peak_bytes(large, os.path.join(tmp, "large.db"))
+        per_point = (large_peak - small_peak) / (args.points * 9)
+        print(f"import peak: {small_peak / 2**20:.1f} MiB for {os.path.getsize(small) / 2**20:.0f} MiB, "
+              f"{large_peak / 2**20:.1f} MiB for {os.path.getsize(large) / 2**20:.0f} MiB "
+              f"({per_point:.0f} bytes per extra trackpoint)")
+
+    if per_point > MAX_BYTES_PER_POINT:
+        print(f"FAIL: importing holds {per_point:.0f} bytes per trackpoint, budget is {MAX_BYTES_PER_POINT}.")
+        return 1
+    print(f"ok: import memory does not grow with the file ({per_point:.0f} bytes per trackpoint).")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Times the vectorized analytics over a large synthetic workout history.
+
+Builds ROWS random log rows as a LOG_DTYPE array and times each analytics
+function and the full summary, then writes the same rows to a scratch SQLite
+database and times what the progress screen does: load_user_totals() and
+summarize_totals(), which must give the same summary. Fails if either summary
+takes over BUDGET_SECONDS, including the load.
+
+    python benchmarks/analytics_bench.py [--rows N]
+"""
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analytics
+import database
+
+BUDGET_SECONDS = 1.0 # summarize() of 1M logs, and load_user_totals() plus summarize_totals()
+
+def synthetic_logs(rows, exercises=200, years=10, seed=0):
+    rng = np.random.default_rng(seed)
+    logs = np.empty(rows, dtype=analytics.LOG_DTYPE)
+    logs["day"] = np.sort(rng.integers(19000 - 365 * years, 19000, rows))
+    logs["exercise_id"] = rng.integers(1, exercises + 1, rows)
+    logs["sets"] = rng.integers(0, 6, rows)
+    logs["reps"] = rng.integers(0, 20, rows)
+    logs["weight"] = np.where(rng.random(rows) < 0.2, np.nan, rng.uniform(5, 200, rows))
+    logs["duration"] = rng.uniform(0, 60, rows)
+    logs["calories"] = rng.uniform(0, 600, rows)
+    return logs
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<24} {elapsed * 1000:8.1f} ms")
+    return result, elapsed
+
+def same_summary(a, b):
+    """True if two summaries agree, up to float rounding and with NaN equal to NaN."""
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(same_summary(a[k], b[k]) for k in a)
+    return bool(np.isclose(a, b, equal_nan=True))
+
+def time_db_summary(logs, expected):
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DATABASE_NAME = os.path.join(tmp, "analytics.db")
+        database.init_db()
+        database.add_user("bench", "bench")
+        conn = database.connect_db()
+        conn.executemany("INSERT INTO exercises (id, name) VALUES (?, ?)",
+                         [(i, f"Exercise {i}") for i in range(1, int(logs["exercise_id"].max()) + 1)])
+        conn.commit()
+        dates = logs["day"].astype("datetime64[D]").astype(str)
+        # Bulk load the way data_transfer imports: per-row triggers off, caught up at the end
+        conn.execute("BEGIN IMMEDIATE")
+        triggers = database.suspend_log_insert_triggers(conn)
+        conn.executemany(
+            """INSERT INTO exercise_logs (user_id, exercise_id, log_date, sets, reps, weight, duration_minutes,
+                                          calories_burned) VALUES (1, ?, ?, ?, ?, ?, ?, ?)""",
+            zip(logs["exercise_id"].tolist(), dates.tolist(), logs["sets"].tolist(), logs["reps"].tolist(),
+                [None if np.isnan(w) else w for w in logs["weight"].tolist()], logs["duration"].tolist(),
+                logs["calories"].tolist()))
+        database.resume_log_insert_triggers(conn, triggers)
+        conn.commit()
+        (daily, rep_maxes), load_elapsed = timed("load_user_totals", analytics.load_user_totals, 1)
+        summary, elapsed = timed("summarize_totals", analytics.summarize_totals, daily, rep_maxes,
+                                 expected["today"])
+        database.close_db()
+    if not same_summary(summary, expected["summary"]):
+        raise RuntimeError("summarize_totals() of the database disagrees with summarize() of the logs")
+    return load_elapsed + elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    logs = synthetic_logs(args.rows)
+    print(f"{args.rows:,} log rows")
+    timed("personal_records", analytics.personal_records, logs)
+    timed("rolling_volume", analytics.rolling_volume, logs)
+    timed("weekly_volume_deltas", analytics.weekly_volume_deltas, logs)
+    timed("streaks", analytics.streaks, logs)
+    today = datetime.date(2022, 1, 1)
+    summary, elapsed = timed("summarize (all of it)", analytics.summarize, logs, today)
+    db_elapsed = time_db_summary(logs, {"summary": summary, "today": today})
+    print(f"  {'load + summarize':<24} {db_elapsed * 1000:8.1f} ms")
+
+    if elapsed > BUDGET_SECONDS:
+        print(f"FAIL: summary took {elapsed:.2f}s, budget is {BUDGET_SECONDS:.1f}s.")
+        return 1
+    if db_elapsed > BUDGET_SECONDS:
+        print(f"FAIL: loading and summarizing took {db_elapsed:.2f}s, budget is {BUDGET_SECONDS:.1f}s.")
+        return 1
+    print(f"ok: summary, and loading and summarizing, each under {BUDGET_SECONDS:.1f}s.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""Load-tests the HTTP/JSON API server and reports latency percentiles and throughput.
+
+Seeds a scratch database with USERS users and LOGS exercise logs each, starts
+api_server.py on a free port in a separate process, and runs --clients
+concurrent clients for --seconds seconds. Each client keeps one connection
+open (HTTP keep-alive) and sends a mix of log pages, catalog pages, trends,
+log searches and new logs (one request in ten is a write), each user's requests
+carrying the token from logging in as that user. With --no-keepalive every request
+opens a new connection instead, to show what keep-alive saves.
+Reports requests/s and p50/p99 latency overall and per route, and fails on any
+error response or if the overall p99 exceeds P99_BUDGET_MS.
+
+    python benchmarks/api_load.py [--clients N] [--seconds S] [--pool N] [--no-keepalive]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import database
+
+P99_BUDGET_MS = 100
+USERS = 20
+LOGS = 1000
+EXERCISES = 60
+NOTE_WORDS = ("easy", "heavy", "tired", "strong", "knee", "shoulder", "tempo", "paused", "felt", "great")
+
+def seed(db_path):
+    database.DATABASE_NAME = db_path
+    database.init_db()
+    rng = random.Random(0)
+    for e in range(EXERCISES):
+        database.add_exercise(f"Exercise {e:02d}", f"Description of exercise {e}.", None, None)
+    conn = database.connect_db()
+    for u in range(USERS):
+        database.add_user(f"user{u}", "secret")
+        user_id = database.get_user_id(f"user{u}")
+        database.create_workout(user_id, "Full body", rng.sample(range(1, EXERCISES + 1), 6))
+        with conn:
+            conn.executemany("""
+                INSERT INTO exercise_logs (user_id, exercise_id, sets, reps, weight, notes, log_date)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [(user_id, rng.randint(1, EXERCISES), 3, rng.randint(5, 12), rng.randint(20, 120),
+                   " ".join(rng.sample(NOTE_WORDS, 3)), f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+                  for _ in range(LOGS)])
+    database.close_db()
+
+def next_request(rng):
+    """Returns (route name, method, target, JSON body or None, user id of the token to send or None)."""
+    user_id = rng.randint(1, USERS)
+    roll = rng.random()
+    if roll < 0.4:
+        return "log page", "GET", f"/users/{user_id}/logs?limit=50", None, user_id
+    if roll < 0.6:
+        return "catalog page", "GET", f"/exercises?limit=20&offset={rng.randrange(0, EXERCISES, 20)}", None, None
+    if roll < 0.8:
+        return "trend", "GET", f"/users/{user_id}/trend?period=month", None, user_id
+    if roll < 0.9:
+        return "log search", "GET", f"/users/{user_id}/logs?q={rng.choice(NOTE_WORDS)}&limit=20", None, user_id
+    body = {"exercise_id": rng.randint(1, EXERCISES), "log_date": "2024-06-01", "sets": 3, "reps": 8,
+            "weight": 60, "notes": "load test"}
+    return "new log", "POST", f"/users/{user_id}/logs", body, user_id
+
+async def send(reader, writer, method, target, body, keep_alive, token=None):
+    """Sends one request and returns (status, response body)."""
+    payload = json.dumps(body).encode() if body is not None else b""
+    authorization = f"Authorization: Bearer {token}\r\n" if token else ""
+    writer.write((f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n{authorization}"
+                  f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+                  f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode() + payload)
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+    status = int(head.split(" ", 2)[1])
+    length = int(re.search(r"content-length:\s*(\d+)", head, re.IGNORECASE).group(1))
+    return status, await reader.readexactly(length)
+
+async def log_in(port):
+    """Logs every seeded user in; returns {user id: token}, and checks that tokens are enforced."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        tokens = {}
+        for u in range(USERS):
+            status, body = await send(reader, writer, "POST", "/login", {"username": f"user{u}", "password": "secret"}, True)
+            if status != 200:
+                raise RuntimeError(f"logging in as user{u} failed with {status}")
+            login = json.loads(body)
+            tokens[login["id"]] = login["token"]
+        status_missing, _body = await send(reader, writer, "GET", "/users/1/logs", None, True)
+        status_other, _body = await send(reader, writer, "GET", "/users/1/logs", None, True, tokens[2])
+        if (status_missing, status_other) != (401, 403):
+            raise RuntimeError(f"per-user routes answered {status_missing} without a token and "
+                               f"{status_other} with another user's, expected 401 and 403")
+        return tokens
+    finally:
+        writer.close()
+
+async def client(port, deadline, keep_alive, seed_value, tokens, results):
+    rng = random.Random(seed_value)
+    connection = None
+    while time.perf_counter() < deadline:
+        route, method, target, body, user_id = next_request(rng)
+        start = time.perf_counter()
+        if connection is None:
+            connection = await asyncio.open_connection("127.0.0.1", port)
+        status, _body = await send(*connection, method, target, body, keep_alive, tokens.get(user_id))
+        results.append((route, (time.perf_counter() - start) * 1000, status))
+        if not keep_alive:
+            connection[1].close()
+            connection = None
+    if connection is not None:
+        connection[1].close()
+
+async def run_clients(port, clients, seconds, keep_alive):
+    results = []
+    tokens = await log_in(port)
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(client(port, deadline, keep_alive, i, tokens, results) for i in range(clients)))
+    return results
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+def start_server(db_path, pool):
+    server = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, "api_server.py"), "--port", "0",
+                               "--pool", str(pool), "--db", db_path],
+                              stdout=subprocess.PIPE, text=True, env=dict(os.environ, PYTHONUNBUFFERED="1"))
+    line = server.stdout.readline()
+    match = re.search(r":(\d+) ", line)
+    if match is None:
+        server.kill()
+        raise RuntimeError(f"server did not start: {line!r}")
+    return server, int(match.group(1))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--pool", type=int, default=4, help="server database connections")
+    parser.add_argument("--no-keepalive", dest="keep_alive", action="store_false")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "api.db")
+        seed(db_path)
+        server, port = start_server(db_path, args.pool)
+        try:
+            results = asyncio.run(run_clients(port, args.clients, args.seconds, args.keep_alive))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{args.clients} clients, {args.pool} database connections, "
+          f"{'keep-alive' if args.keep_alive else 'a new connection per request'}, {args.seconds:g}s")
+    print(f"  {'route':<14}{'requests':>10}{'p50 ms':>9}{'p99 ms':>9}")
+    routes = sorted({route for route, _ms, _status in results})
+    for route in routes + ["all"]:
+        latencies = sorted(ms for r, ms, _status in results if route in (r, "all"))
+        print(f"  {route:<14}{len(latencies):>10,}{percentile(latencies, 0.5):>9.1f}{percentile(latencies, 0.99):>9.1f}")
+    errors = sum(1 for _route, _ms, status in results if status >= 400)
+    p99 = percentile(sorted(ms for _route, ms, _status in results), 0.99)
+    print(f"  {len(results) / args.seconds:,.0f} requests/s, {errors} errors")
+
+    if errors:
+        print(f"FAIL: {errors} requests got an error response.")
+        return 1
+    if p99 > P99_BUDGET_MS:
+        print(f"FAIL: p99 latency {p99:.1f} ms, budget is {P99_BUDGET_MS} ms.")
+        return 1
+    print(f"ok: p99 latency {p99:.1f} ms is within {P99_BUDGET_MS} ms.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
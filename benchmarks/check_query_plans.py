@@ -0,0 +1,91 @@
+"""Checks that every read query in database.py is served by an index.
+
+Runs each query function against a scratch database, captures the SQL it
+executes and prints its EXPLAIN QUERY PLAN. Exits non-zero if any query
+scans a table without an index or sorts through a temporary B-tree.
+
+    python benchmarks/check_query_plans.py
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+# (function, args) pairs covering every SELECT in database.py
+QUERIES = [
+    (database.get_user, ("alice", "secret")),
+    (database.get_user_id, ("alice",)),
+    (database.get_all_exercises, ()), # Loads the exercise catalog; later lookups never query
+    (database.get_user_workouts, (1,)),
+    (database.get_user_workouts_page, (1, 1)),
+    (database.get_user_workouts_page, (1, 1, ("Legs", 1))),
+    (database.get_workout_details, (1,)),
+    (database.get_user_exercise_logs, (1,)),
+    (database.get_user_exercise_logs_page, (1, 1)),
+    (database.get_user_exercise_logs_page, (1, 1, ("2024-01-01", 2))),
+    (database.get_exercise_trend, (1, 1, "week", "2024-01-01", "2024-12-31")),
+    (database.get_user_trend, (1, "month")),
+    (database.get_user_daily_totals, (1,)),
+    (database.get_user_rep_maxes, (1,)),
+    (database.get_user_log_version, (1,)),
+    (database.search_exercises, ("push",)),
+    (database.search_exercise_logs, (1, "sore")),
+]
+
+def seed():
+    """Adds a little data so every query has rows to plan against."""
+    database.add_user("alice", "secret")
+    database.add_exercise("Push-ups", "", None, None)
+    database.add_exercise("Squats", "", None, None)
+    database.create_workout(1, "Legs", [2, 1])
+    database.log_workout_session(1, [(1, 3, 10, None, None, None, ""), (2, 3, 8, 40.0, None, None, "Knees sore")], "2024-01-01")
+
+def plan_problems(plan):
+    """Returns the plan steps that read a table without an index or sort in a temp B-tree."""
+    problems = []
+    for _id, _parent, _unused, detail in plan:
+        if detail.startswith("SCAN") and " VIRTUAL TABLE INDEX " in detail:
+            if ":M" not in detail: # FTS5 marks a full-text MATCH lookup with M; anything else reads every row
+                problems.append(detail)
+        elif detail.startswith("SCAN") and " USING " not in detail:
+            problems.append(detail)
+        elif "USE TEMP B-TREE" in detail:
+            problems.append(detail)
+    return problems
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DATABASE_NAME = os.path.join(tmp, "plans.db")
+        database.init_db()
+        seed()
+
+        conn = database.connect_db()
+        failures = 0
+        for func, args in QUERIES:
+            statements = []
+            conn.set_trace_callback(statements.append)
+            func(*args)
+            conn.set_trace_callback(None)
+
+            for sql in statements:
+                if not sql.lstrip().upper().startswith("SELECT"):
+                    continue
+                plan = conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()
+                problems = plan_problems(plan)
+                failures += bool(problems)
+                print(f"{'FAIL' if problems else 'ok  '} {func.__name__}")
+                for step in plan:
+                    print(f"       {step[3]}")
+        database.close_db()
+
+    if failures:
+        print(f"{failures} quer{'y' if failures == 1 else 'ies'} not using an index.")
+        return 1
+    print("All queries use an index.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
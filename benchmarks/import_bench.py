@@ -0,0 +1,108 @@
+"""Times a streaming import and export of a large exercise log file.
+
+Writes ROWS synthetic log records for USERS users as CSV (or JSON Lines with
+--jsonl), imports them into a scratch database with data_transfer.import_file()
+and exports them again. Both are timed, then repeated with tracemalloc on to find
+their peak Python memory (tracing slows them down too much to time them at the same
+time). Fails if either peak exceeds MEMORY_BUDGET_MB, or if the import rate
+projects a 10M-row import to take longer than TEN_MILLION_BUDGET_MINUTES.
+
+    python benchmarks/import_bench.py [--rows N] [--users N] [--jsonl]
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_transfer
+import database
+
+MEMORY_BUDGET_MB = 20
+TEN_MILLION_BUDGET_MINUTES = 30
+EXERCISES = ("Push-ups", "Squats", "Plank", "Lunges", "Deadlift", "Bench Press", "Rowing", "Cycling")
+NOTES = (None, None, None, "felt great", "knees sore", "new personal record", "slow tempo, strict form")
+
+def write_logs(path, rows, users, jsonl, seed=0):
+    rng = random.Random(seed)
+    fields = data_transfer.FIELDS["exercise_logs"]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = None if jsonl else csv.writer(f)
+        if writer:
+            writer.writerow(fields)
+        for _ in range(rows):
+            record = (f"user{rng.randint(1, users)}", rng.choice(EXERCISES),
+                      f"{rng.randint(2015, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                      rng.randint(1, 5), rng.randint(1, 20), round(rng.uniform(5, 200), 1),
+                      None, None, rng.choice(NOTES))
+            if writer:
+                writer.writerow(record)
+            else:
+                f.write(json.dumps(dict(zip(fields, record))) + "\n")
+
+def timed(func, *args, **kwargs):
+    """Runs func and returns (result, seconds)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def peak_memory_mb(func, *args, **kwargs):
+    """Runs func and returns the peak Python memory it allocated, in MiB."""
+    tracemalloc.start()
+    func(*args, **kwargs)
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--jsonl", action="store_true")
+    args = parser.parse_args()
+    ext = "jsonl" if args.jsonl else "csv"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DATABASE_NAME = os.path.join(tmp, "import.db")
+        database.init_db()
+        for user_id in range(1, args.users + 1):
+            database.add_user(f"user{user_id}", "bench")
+        for name in EXERCISES:
+            database.add_exercise(name, "", None, None)
+
+        source = os.path.join(tmp, f"logs.{ext}")
+        write_logs(source, args.rows, args.users, args.jsonl)
+        print(f"{args.rows:,} records, {os.path.getsize(source) / 2**20:.0f} MiB of {ext}")
+
+        output = os.path.join(tmp, f"out.{ext}")
+        result, import_s = timed(data_transfer.import_file, source, "exercise_logs")
+        rate = args.rows / import_s
+        count, export_s = timed(data_transfer.export_file, output, "exercise_logs")
+        import_mb = peak_memory_mb(data_transfer.import_file, source, "exercise_logs", restart=True)
+        export_mb = peak_memory_mb(data_transfer.export_file, output, "exercise_logs")
+        database.close_db()
+        print(f"import: {result[1]:,} rows in {import_s:.1f}s ({rate:,.0f} rows/s), peak {import_mb:.1f} MiB")
+        print(f"export: {count:,} rows in {export_s:.1f}s ({count / export_s:,.0f} rows/s), peak {export_mb:.1f} MiB")
+
+    projected = 10_000_000 / rate / 60
+    print(f"10M-row import projected at {projected:.1f} minutes")
+    failed = False
+    if max(import_mb, export_mb) > MEMORY_BUDGET_MB:
+        print(f"FAIL: peak Python memory {max(import_mb, export_mb):.1f} MiB, budget is {MEMORY_BUDGET_MB} MiB.")
+        failed = True
+    if projected > TEN_MILLION_BUDGET_MINUTES:
+        print(f"FAIL: budget is {TEN_MILLION_BUDGET_MINUTES} minutes for 10M rows.")
+        failed = True
+    if failed:
+        return 1
+    print("ok: flat memory and a 10M-row import within budget.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
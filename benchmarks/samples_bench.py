@@ -0,0 +1,103 @@
+"""Measures the size and read speed of stored wearable samples.
+
+Stores SESSIONS logged sessions of HOURS hours of 1 Hz heart rate, cadence and
+power in a scratch database. One session in five has irregular timestamps
+(dropped samples), which costs 4 extra bytes per sample. Reports the bytes per
+sample on disk and times a full read, a 10 minute range read and a read
+downsampled to 600 points for display. Fails if storage exceeds
+BYTES_PER_SAMPLE_BUDGET or the display read of a session takes longer than
+READ_BUDGET_MS.
+
+    python benchmarks/samples_bench.py [--sessions N] [--hours H]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import samples
+
+BYTES_PER_SAMPLE_BUDGET = 6
+READ_BUDGET_MS = 50
+CHANNELS = {"heart_rate": (60, 190), "cadence": (70, 100), "power": (0, 400)}
+START_MS = 1_700_000_000_000
+
+def session_samples(rng, hours, irregular):
+    """Returns (timestamps, values per channel) of one session at 1 Hz."""
+    timestamps = []
+    t = START_MS
+    for _ in range(hours * 3600):
+        timestamps.append(t)
+        t += 1000 if not irregular or rng.random() > 0.01 else 2000
+    values = {channel: [rng.uniform(low, high) for _ in timestamps] for channel, (low, high) in CHANNELS.items()}
+    return timestamps, values
+
+def database_bytes(conn):
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return conn.execute("PRAGMA page_count").fetchone()[0] * page_size
+
+def timed_ms(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--hours", type=int, default=3)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DATABASE_NAME = os.path.join(tmp, "samples.db")
+        database.init_db()
+        database.add_user("bench", "bench")
+        database.add_exercise("Cycling", "", None, None)
+        conn = database.connect_db()
+        empty_bytes = database_bytes(conn)
+
+        total = 0
+        write_s = 0.0
+        for session in range(args.sessions):
+            log_id = database.log_exercise(1, 1, None, None, None, args.hours * 60, None, "", "2024-01-01")
+            timestamps, values = session_samples(rng, args.hours, irregular=session % 5 == 0)
+            start = time.perf_counter()
+            for channel in CHANNELS:
+                samples.add_samples(log_id, channel, timestamps, values[channel])
+            write_s += time.perf_counter() - start
+            total += len(timestamps) * len(CHANNELS)
+
+        per_sample = (database_bytes(conn) - empty_bytes) / total
+        print(f"{total:,} samples in {args.sessions} sessions: {per_sample:.2f} bytes per sample, "
+              f"written at {total / write_s:,.0f} samples/s")
+
+        log_id = args.sessions // 2 + 1
+        (times, _values), full_ms = timed_ms(samples.read_samples, log_id, "heart_rate")
+        middle = START_MS + args.hours * 1_800_000
+        (window, _values), range_ms = timed_ms(samples.read_samples, log_id, "heart_rate", middle, middle + 600_000)
+        (points, _values), display_ms = timed_ms(samples.read_downsampled, log_id, "heart_rate", 600)
+        print(f"  full read      {len(times):7,} samples {full_ms:6.1f} ms")
+        print(f"  10 min range   {len(window):7,} samples {range_ms:6.1f} ms")
+        print(f"  downsampled    {len(points):7,} points  {display_ms:6.1f} ms")
+        database.close_db()
+
+    failed = False
+    if per_sample > BYTES_PER_SAMPLE_BUDGET:
+        print(f"FAIL: {per_sample:.2f} bytes per sample, budget is {BYTES_PER_SAMPLE_BUDGET}.")
+        failed = True
+    if display_ms > READ_BUDGET_MS:
+        print(f"FAIL: display read took {display_ms:.1f} ms, budget is {READ_BUDGET_MS} ms.")
+        failed = True
+    if failed:
+        return 1
+    print(f"ok: under {BYTES_PER_SAMPLE_BUDGET} bytes per sample and {READ_BUDGET_MS} ms per display read.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Times full-text search over a large synthetic set of log notes.
+
+Fills a scratch database with ROWS exercise logs spread over USERS users.
+Notes are a few words drawn from a VOCABULARY_SIZE word vocabulary with a
+Zipf distribution, like natural text, with the training words the queries
+use placed among the more common ones. Times search_exercise_logs() for
+word, phrase-like and prefix queries; the slowest first page must come back
+within BUDGET_MS (median of REPEATS runs, so cold page-cache reads after
+the bulk load do not dominate).
+
+    python benchmarks/search_bench.py [--rows N] [--users N]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+BUDGET_MS = 50
+REPEATS = 5 # Each search is timed this many times and the median reported
+VOCABULARY_SIZE = 5000
+WORDS = ("sore knees shoulder felt great tired strong easy heavy grip back form tempo slow fast "
+         "warmup cooldown pain tight hamstring hip elbow wrist deload personal record failure").split()
+QUERIES = ("sore", "shoulder pain", "record", "ham", "grip failure", "personal record")
+
+def vocabulary():
+    """Returns (words, weights): filler words with the training words at Zipf ranks 20 and up."""
+    words = [f"w{i}" for i in range(VOCABULARY_SIZE - len(WORDS))]
+    words[20:20] = WORDS
+    return words, [1 / (rank + 1) for rank in range(len(words))]
+
+def fill(rows, users, seed=0):
+    rng = random.Random(seed)
+    words, weights = vocabulary()
+    for user_id in range(1, users + 1):
+        database.add_user(f"user{user_id}", "bench")
+    database.add_exercise("Squats", "", None, None)
+    conn = database.connect_db()
+    # Bulk load the way data_transfer imports: per-row triggers off, indexed set-based at the end
+    conn.execute("BEGIN IMMEDIATE")
+    triggers = database.suspend_log_insert_triggers(conn)
+    conn.executemany(
+        "INSERT INTO exercise_logs (user_id, exercise_id, log_date, sets, reps, notes) VALUES (?, 1, ?, 3, 10, ?)",
+        ((rng.randint(1, users), f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+          " ".join(rng.choices(words, weights, k=rng.randint(3, 12)))) for _ in range(rows)))
+    database.resume_log_insert_triggers(conn, triggers)
+    conn.commit()
+
+def median_ms(func, *args):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(*args)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DATABASE_NAME = os.path.join(tmp, "search.db")
+        database.init_db()
+        start = time.perf_counter()
+        fill(args.rows, args.users)
+        print(f"{args.rows:,} notes for {args.users} users indexed in {time.perf_counter() - start:.1f}s")
+
+        worst = 0.0
+        for query in QUERIES:
+            rows, next_offset = database.search_exercise_logs(1, query, limit=20)
+            first_page = median_ms(database.search_exercise_logs, 1, query, 20)
+            later_page = median_ms(database.search_exercise_logs, 1, query, 20, 200)
+            worst = max(worst, first_page)
+            more = "more" if next_offset is not None else "last page"
+            print(f"  {query!r:<20} {len(rows):3d} rows ({more})  first page {first_page:7.1f} ms  page 11 {later_page:7.1f} ms")
+        database.close_db()
+
+    if worst > BUDGET_MS:
+        print(f"FAIL: slowest search took {worst:.1f} ms, budget is {BUDGET_MS} ms.")
+        return 1
+    print(f"ok: every search under {BUDGET_MS} ms.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Measures application startup: import time and time to the first login frame.
+
+Fresh interpreters are started against a new database in a temp directory:
+
+  * `python -X importtime -c "import main"` reports the slowest imports and fails
+    if a heavy module (PIL, NumPy, Matplotlib, pandas) is imported at startup.
+  * A run of FitnessApp that records when the login screen is first mapped and
+    drawn, and fails if that takes longer than FIRST_FRAME_BUDGET_MS.
+  * `python -m fitness_tracker workouts`, which fails if the CLI imports a GUI,
+    imaging or heavy module, or takes longer than CLI_BUDGET_MS end to end.
+
+    python benchmarks/startup.py [--runs N]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_FRAME_BUDGET_MS = 500
+CLI_BUDGET_MS = 100 # Whole process, interpreter startup included
+HEAVY_MODULES = ("PIL", "numpy", "matplotlib", "pandas")
+GUI_MODULES = ("tkinter", "_tkinter", "screens", "main", "UI_elements", "image_cache", "frame_loader")
+SLOWEST_IMPORTS = 10
+
+# Runs in the child interpreter; prints the wall clock time of the first login frame
+FIRST_FRAME_SCRIPT = """
+import sys, time
+sys.path.insert(0, {repo!r})
+import database
+database.DATABASE_NAME = {db!r}
+import main
+
+app = main.FitnessApp()
+
+def drawn():
+    print(f"first-frame {{time.time()!r}}")
+    app.destroy()
+
+def mapped(_event):
+    app.after_idle(drawn) # Runs once Tk has finished drawing the mapped screen
+
+app.screens["login"].bind("<Map>", mapped)
+app.mainloop()
+app.db_worker.shutdown()
+"""
+
+def import_times(cwd, args=None):
+    """Returns [(cumulative_us, module)] for `import main` (or the given interpreter args) in a fresh interpreter."""
+    args = args or ["-c", f"import sys; sys.path.insert(0, {REPO_DIR!r}); import main"]
+    result = subprocess.run([sys.executable, "-X", "importtime", *args],
+                            cwd=cwd, capture_output=True, text=True, check=True, env=_repo_env())
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times.append((int(cumulative_us), name.strip()))
+    return times
+
+def _repo_env():
+    """Environment that lets `python -m` find the repo's modules from another directory."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, (REPO_DIR, env.get("PYTHONPATH"))))
+    return env
+
+def cli_ms(cwd, db_path, runs):
+    """Median wall time in ms of a read-only CLI command in a fresh interpreter."""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "fitness_tracker", "--db", db_path, "workouts", "nobody"],
+                       cwd=cwd, capture_output=True, env=_repo_env())
+        times.append((time.perf_counter() - started) * 1000)
+    return sorted(times)[len(times) // 2]
+
+def first_frame_ms(cwd, db_path):
+    """Starts the app in a fresh interpreter and returns the ms until the login screen is drawn."""
+    started = time.time()
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_FRAME_SCRIPT.format(repo=REPO_DIR, db=db_path)],
+        cwd=cwd, capture_output=True, text=True, check=True, timeout=60)
+    for line in result.stdout.splitlines():
+        if line.startswith("first-frame "):
+            return (float(line.split()[1]) - started) * 1000
+    raise RuntimeError(f"The app never reported its first frame:\n{result.stdout}{result.stderr}")
+
+def main():
+    args = sys.argv[1:]
+    runs = int(args[args.index("--runs") + 1]) if "--runs" in args else 3
+    failed = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        times = import_times(tmp)
+        total_ms = max(us for us, _name in times) / 1000
+        print(f"import main: {total_ms:.1f} ms cumulative. Slowest imports:")
+        for us, name in sorted(times, reverse=True)[:SLOWEST_IMPORTS]:
+            print(f"  {us / 1000:8.1f} ms  {name}")
+        heavy = sorted({name for _us, name in times if name.split(".")[0] in HEAVY_MODULES})
+        if heavy:
+            print(f"FAIL: heavy modules imported at startup: {', '.join(heavy)}")
+            failed = True
+
+        # The first run creates and seeds the database, later runs open an existing one
+        db_path = os.path.join(tmp, "startup.db")
+        frames = [first_frame_ms(tmp, db_path) for _ in range(runs)]
+        print("first login frame: " + ", ".join(f"{ms:.1f}" for ms in frames) + " ms")
+        if min(frames) > FIRST_FRAME_BUDGET_MS:
+            print(f"FAIL: first frame took {min(frames):.1f} ms, budget is {FIRST_FRAME_BUDGET_MS} ms.")
+            failed = True
+
+        cli_imports = {name for _us, name in import_times(tmp, ["-m", "fitness_tracker", "--db", db_path, "exercises"])}
+        unwanted = sorted(name for name in cli_imports if name.split(".")[0] in HEAVY_MODULES + GUI_MODULES)
+        if unwanted:
+            print(f"FAIL: the CLI imports {', '.join(unwanted)}")
+            failed = True
+        command_ms = cli_ms(tmp, db_path, max(runs, 5))
+        print(f"CLI command: {command_ms:.1f} ms")
+        if command_ms > CLI_BUDGET_MS:
+            print(f"FAIL: the CLI took {command_ms:.1f} ms, budget is {CLI_BUDGET_MS} ms.")
+            failed = True
+
+    if failed:
+        return 1
+    print(f"ok: no heavy imports, the login screen drew within {FIRST_FRAME_BUDGET_MS} ms "
+          f"and the CLI ran within {CLI_BUDGET_MS} ms.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
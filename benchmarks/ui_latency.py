@@ -0,0 +1,96 @@
+"""Measures Tk main-thread frame times while a slow SQLite query runs.
+
+A ticker scheduled with after() every FRAME_INTERVAL_MS records the gap
+between consecutive ticks. The same slow query is run twice: once through
+DatabaseWorker (background thread) and once directly on the Tk thread, as
+the screens used to do. With the worker the worst frame time must stay
+under FRAME_BUDGET_MS.
+
+    python benchmarks/ui_latency.py
+"""
+import os
+import sys
+import tempfile
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from db_worker import DatabaseWorker
+
+FRAME_INTERVAL_MS = 5
+FRAME_BUDGET_MS = 16
+SLOW_QUERY_ROWS = 3_000_000
+
+def slow_query():
+    """A query that keeps SQLite busy for roughly a second or more."""
+    conn = database.connect_db()
+    return conn.execute(
+        "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n LIMIT ?) SELECT sum(x) FROM n",
+        (SLOW_QUERY_ROWS,)
+    ).fetchone()[0]
+
+def measure(root, start_query):
+    """Runs the Tk loop until the query finishes and returns (query seconds, frame gaps in ms)."""
+    gaps = []
+    state = {"last": None, "done": False, "started": None, "finished": None}
+
+    def tick():
+        now = time.perf_counter()
+        if state["last"] is not None:
+            gaps.append((now - state["last"]) * 1000)
+        state["last"] = now
+        if state["done"]:
+            root.quit()
+        else:
+            root.after(FRAME_INTERVAL_MS, tick)
+
+    def finished(_result=None):
+        state["finished"] = time.perf_counter()
+        state["done"] = True
+
+    def start():
+        state["started"] = time.perf_counter()
+        start_query(finished)
+
+    root.after(FRAME_INTERVAL_MS, tick)
+    root.after(50, start)
+    root.mainloop()
+    return state["finished"] - state["started"], gaps
+
+def report(label, seconds, gaps):
+    gaps = sorted(gaps)
+    p99 = gaps[min(len(gaps) - 1, int(len(gaps) * 0.99))]
+    print(f"{label:<22} query {seconds:6.2f}s  frames {len(gaps):5d}  p99 {p99:7.1f} ms  max {gaps[-1]:7.1f} ms")
+    return gaps[-1]
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DATABASE_NAME = os.path.join(tmp, "latency.db")
+        database.init_db()
+
+        root = tk.Tk()
+        root.withdraw()
+        worker = DatabaseWorker(root)
+
+        seconds, gaps = measure(root, lambda done: worker.submit(slow_query, on_done=done))
+        worst_worker = report("background worker", seconds, gaps)
+
+        def on_tk_thread(done):
+            done(slow_query())
+        seconds, gaps = measure(root, on_tk_thread)
+        report("on the Tk thread", seconds, gaps)
+
+        worker.shutdown()
+        root.destroy()
+        database.close_db()
+
+    if worst_worker > FRAME_BUDGET_MS:
+        print(f"FAIL: worst frame {worst_worker:.1f} ms exceeds the {FRAME_BUDGET_MS} ms budget.")
+        return 1
+    print(f"ok: main-thread frames stayed under {FRAME_BUDGET_MS} ms while the query ran.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Compares per-call commits with the group-commit writer as concurrent producers grow.
+
+For each producer count in PRODUCERS, starts that many threads that together log
+--writes exercises into a fresh scratch database, three ways:
+
+  * per call: every thread calls database.log_exercise() on its own connection,
+    so each write is its own commit and the threads contend for the SQLite lock;
+  * group commit: every thread calls DatabaseWriter.log_exercise() and waits for
+    its result, so the writer thread coalesces concurrent writes into one commit;
+  * group commit with --delay-ms: the same, with the writer waiting up to that
+    long after the first write of a batch for more to join it.
+
+Reports writes/s, p99 latency per write, failed writes and writes per group
+commit. With --synchronous FULL every commit is synced to disk, as on a
+database where losing the last writes after a power cut is not acceptable.
+Fails if any write is lost, or if group commit without a delay is slower than
+per-call commits at the highest producer count.
+
+    python benchmarks/writer_bench.py [--writes N] [--synchronous NORMAL|FULL] [--delay-ms 2]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from db_writer import MAX_DELAY_MS, DatabaseWriter
+
+PRODUCERS = (1, 2, 4, 8, 16, 32, 64)
+EXERCISES = 20
+DELAY_MS = 2.0 # Default --delay-ms
+
+def log_args(i):
+    return 1, i % EXERCISES + 1, 3, 10, 50.0, None, None, "bench", "2024-01-01"
+
+def run(db_path, producers, writes, delay_ms):
+    """
+    Logs `writes` exercises per call, or through a DatabaseWriter with max_delay_ms=delay_ms
+    unless delay_ms is None. Returns (seconds, sorted latencies in ms, failed writes, writes per
+    commit or None).
+    """
+    database.DATABASE_NAME = db_path
+    database.init_db()
+    for e in range(EXERCISES):
+        database.add_exercise(f"Exercise {e}", "", None, None)
+    database.add_user("bench", "bench")
+    writer = DatabaseWriter(max_delay_ms=delay_ms) if delay_ms is not None else None
+    latencies = [[] for _ in range(producers)]
+    failures = [0] * producers
+    ready = threading.Barrier(producers + 1)
+
+    def produce(index):
+        ready.wait()
+        for i in range(index, writes, producers):
+            start = time.perf_counter()
+            if writer is not None:
+                try:
+                    ok = writer.log_exercise(*log_args(i)).result()
+                except Exception:
+                    ok = False
+            else:
+                ok = database.log_exercise(*log_args(i))
+            latencies[index].append((time.perf_counter() - start) * 1000)
+            if not ok:
+                failures[index] += 1
+        database.close_db()
+
+    threads = [threading.Thread(target=produce, args=(p,)) for p in range(producers)]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    per_commit = None
+    if writer is not None:
+        writer.close()
+        per_commit = writer.committed / max(writer.commits, 1)
+    stored = database.connect_db().execute("SELECT COUNT(*) FROM exercise_logs").fetchone()[0]
+    database.close_db()
+    failed = sum(failures)
+    if stored != writes - failed:
+        raise RuntimeError(f"{writes - failed} writes reported done but {stored} stored")
+    return elapsed, sorted(ms for mine in latencies for ms in mine), failed, per_commit
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writes", type=int, default=3200)
+    parser.add_argument("--synchronous", choices=("NORMAL", "FULL"), default=database.SYNCHRONOUS)
+    parser.add_argument("--delay-ms", type=float, default=DELAY_MS,
+                        help="max_delay_ms of the third run, which waits for writes to join each commit")
+    args = parser.parse_args()
+    database.SYNCHRONOUS = args.synchronous
+
+    print(f"{args.writes:,} exercise logs per run, synchronous={args.synchronous}")
+    print(f"  {'producers':>9}  {'per call':>26}  {'group commit':>37}  {f'group commit, {args.delay_ms:g} ms delay':>37}")
+    columns = f"{'writes/s':>9}{'p99 ms':>9}{'failed':>8}"
+    print(f"  {'':>9}  {columns}  {columns}{'per commit':>11}  {columns}{'per commit':>11}")
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        for producers in PRODUCERS:
+            row = []
+            for i, delay_ms in enumerate((None, MAX_DELAY_MS, args.delay_ms)):
+                db_path = os.path.join(tmp, f"run{i}-{producers}.db")
+                elapsed, latencies, lost, per_commit = run(db_path, producers, args.writes, delay_ms)
+                p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+                row.append((args.writes / elapsed, p99, lost, per_commit))
+                failed = failed or lost > 0
+            (call_rate, call_p99, call_lost, _), (group_rate, group_p99, group_lost, per_commit), \
+                (delay_rate, delay_p99, delay_lost, delay_per_commit) = row
+            print(f"  {producers:>9}  {call_rate:>9,.0f}{call_p99:>9.1f}{call_lost:>8}  "
+                  f"{group_rate:>9,.0f}{group_p99:>9.1f}{group_lost:>8}{per_commit:>11.1f}  "
+                  f"{delay_rate:>9,.0f}{delay_p99:>9.1f}{delay_lost:>8}{delay_per_commit:>11.1f}")
+
+    if failed:
+        print("FAIL: some writes failed.")
+        return 1
+    if group_rate < call_rate:
+        print(f"FAIL: group commit is slower than per-call commits at {PRODUCERS[-1]} producers.")
+        return 1
+    print(f"ok: group commit is {group_rate / call_rate:.1f}x per-call commits at {PRODUCERS[-1]} producers.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
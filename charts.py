@@ -0,0 +1,143 @@
+"""
+Per-exercise progress charts.
+
+Charts are drawn with Matplotlib's Agg backend on a background thread and saved as
+PNG files, so the Tk thread only ever loads a finished image. Files are cached on disk
+under a name built from (user, exercise, metric, period, date range, data version). Every
+write to a user's exercise logs bumps their data version, so the next request renders
+a fresh chart and the outdated files for that chart are deleted.
+"""
+import datetime
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import database
+
+CHART_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chart_cache")
+CHART_SIZE_INCHES = (6.4, 2.6)
+CHART_DPI = 100
+
+# Metric -> (column in database.get_exercise_trend rows, axis label)
+METRICS = {
+    "weight": (5, "Average weight (kg)"),
+    "volume": (4, "Volume (kg)"),
+    "duration": (6, "Duration (min)"),
+    "calories": (7, "Calories (kcal)"),
+}
+
+def render_png(rows, metric, title, out_path):
+    """Draws one metric of get_exercise_trend rows as a line chart and saves it to `out_path`."""
+    # Imported here so Matplotlib is only loaded by the thread that draws charts
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    column, label = METRICS[metric]
+    points = [(datetime.date.fromisoformat(row[0]), row[column]) for row in rows if row[column] is not None]
+
+    # Figure + FigureCanvasAgg instead of pyplot: no global state, no GUI backend
+    fig = Figure(figsize=CHART_SIZE_INCHES, dpi=CHART_DPI)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    if points:
+        dates, values = zip(*points)
+        ax.plot(dates, values, marker="o", color="#007BFF")
+    ax.set_title(title, fontsize=10)
+    ax.set_ylabel(label, fontsize=9)
+    ax.tick_params(labelsize=8)
+    ax.grid(True, alpha=0.3)
+    fig.autofmt_xdate()
+    fig.tight_layout()
+
+    tmp_path = out_path + ".tmp"
+    fig.savefig(tmp_path, format="png")
+    os.replace(tmp_path, out_path) # Readers never see a half-written chart
+
+class ChartService:
+    """
+    Renders progress charts on a background thread and caches the PNG files.
+    latest() returns the newest chart already on disk without touching the database,
+    so a screen can show it instantly while submit() checks for newer data.
+    """
+    def __init__(self, cache_dir=CHART_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chart-renderer")
+        self._latest = {} # Chart name (without data version) -> newest PNG path
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def chart_name(user_id, exercise_id, metric, period="week", start_date=None, end_date=None):
+        """File name prefix identifying a chart, independent of the data it was drawn from."""
+        return f"u{user_id}_e{exercise_id}_{metric}_{period}_{start_date or 'all'}_{end_date or 'all'}"
+
+    def latest(self, user_id, exercise_id, metric, period="week", start_date=None, end_date=None):
+        """Returns the path of the newest cached chart, which may predate the latest logs, or None."""
+        name = self.chart_name(user_id, exercise_id, metric, period, start_date, end_date)
+        with self._lock:
+            path = self._latest.get(name)
+        if path is None:
+            path = self._find_cached(name)
+        return path if path and os.path.exists(path) else None
+
+    def submit(self, user_id, exercise_id, metric, title="", period="week", start_date=None, end_date=None):
+        """Runs get_chart() on the render thread and returns its Future."""
+        return self._executor.submit(self.get_chart, user_id, exercise_id, metric, title, period, start_date, end_date)
+
+    def get_chart(self, user_id, exercise_id, metric, title="", period="week", start_date=None, end_date=None):
+        """
+        Returns the path of an up-to-date PNG chart, rendering it if the cache has none for
+        the user's current data version, or None if there is nothing to plot.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown chart metric '{metric}', expected one of {', '.join(METRICS)}.")
+        name = self.chart_name(user_id, exercise_id, metric, period, start_date, end_date)
+        version = database.get_user_log_version(user_id)
+        path = os.path.join(self.cache_dir, f"{name}_v{version}.png")
+        if os.path.exists(path):
+            self.hits += 1
+            with self._lock:
+                self._latest[name] = path
+            return path
+
+        self.misses += 1
+        rows = database.get_exercise_trend(user_id, exercise_id, period, start_date, end_date)
+        if not rows:
+            path = None
+        else:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            render_png(rows, metric, title, path)
+        self._replace(name, path)
+        return path
+
+    def _find_cached(self, name):
+        """Newest file on disk for a chart name, so charts survive restarts."""
+        try:
+            files = [f for f in os.listdir(self.cache_dir) if f.startswith(name + "_v") and f.endswith(".png")]
+        except OSError:
+            return None
+        if not files:
+            return None
+        newest = max(files, key=lambda f: int(f[len(name) + 2:-4]))
+        return os.path.join(self.cache_dir, newest)
+
+    def _replace(self, name, path):
+        """Records the current chart for `name` and deletes the older files it replaces."""
+        with self._lock:
+            self._latest[name] = path
+        try:
+            files = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for f in files:
+            stale = os.path.join(self.cache_dir, f)
+            if f.startswith(name + "_v") and stale != path:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+
+    def shutdown(self):
+        """Stops the render thread, dropping charts that have not started rendering."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,415 @@
+"""
+Streaming import and export of exercises, workouts and exercise logs as CSV or JSON Lines.
+
+Records refer to users and exercises by name, so files move between databases. Input is
+parsed one record at a time and inserted with executemany in chunks. The transaction is
+committed every `commit_every` records, together with a checkpoint in import_progress, so
+an interrupted import resumes after the last commit and a finished file is not imported
+twice. Exercise logs are inserted with their per-row triggers suspended: each transaction
+updates the rollups, log versions and notes index once, set-based, for all its rows.
+Exports iterate the query cursor. Memory stays flat in both directions, whatever the size
+of the file.
+
+    python data_transfer.py import exercise_logs logs.csv [--commit-every N] [--restart]
+    python data_transfer.py export exercise_logs logs.jsonl [--user NAME]
+"""
+import argparse
+import csv
+import datetime
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import time
+
+import database
+
+FORMATS = ("csv", "jsonl")
+CHUNK_SIZE = 5_000 # Rows per executemany call
+COMMIT_EVERY = 100_000 # Input records per transaction and checkpoint
+MAX_REPORTED_ERRORS = 20 # Rejected records printed individually, the rest are only counted
+
+# Table -> field names of its records, in file column order
+FIELDS = {
+    "exercises": ("name", "description", "image_path", "gif_path"),
+    "workouts": ("username", "workout", "sequence", "exercise"),
+    "exercise_logs": ("username", "exercise", "log_date", "sets", "reps", "weight",
+                      "duration_minutes", "calories_burned", "notes"),
+}
+
+# Table -> (export query yielding FIELDS[table] columns, user filter, ORDER BY with the
+# filter, ORDER BY without it). Unfiltered exports walk the primary key, filtered ones the
+# per-user index, so neither sorts.
+EXPORT_SQL = {
+    "exercises": (
+        "SELECT name, description, image_path, gif_path FROM exercises {where} ORDER BY {order}",
+        None, None, "id",
+    ),
+    "workouts": (
+        """
+        SELECT u.username, w.name, we.sequence, e.name
+        FROM workouts w
+        CROSS JOIN workout_exercises we ON we.workout_id = w.id -- Keeps workouts as the outer loop
+        JOIN users u ON u.id = w.user_id
+        JOIN exercises e ON e.id = we.exercise_id
+        {where}
+        ORDER BY {order}
+        """,
+        "WHERE w.user_id = ?", "w.name, w.id, we.sequence", "w.id, we.sequence",
+    ),
+    "exercise_logs": (
+        """
+        SELECT u.username, e.name, l.log_date, l.sets, l.reps, l.weight,
+               l.duration_minutes, l.calories_burned, l.notes
+        FROM exercise_logs l
+        JOIN users u ON u.id = l.user_id
+        JOIN exercises e ON e.id = l.exercise_id
+        {where}
+        ORDER BY {order}
+        """,
+        "WHERE l.user_id = ?", "l.log_date, l.id", "l.id",
+    ),
+}
+
+def detect_format(path):
+    """Returns the format implied by the file extension of `path`."""
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext in ("jsonl", "ndjson"):
+        return "jsonl"
+    if ext == "csv":
+        return "csv"
+    raise ValueError(f"Cannot tell the format of '{path}', expected one of {', '.join(FORMATS)}.")
+
+def read_records(f, fmt):
+    """Yields (line number, record dict) for each record in an open CSV or JSON Lines file."""
+    if fmt == "csv":
+        reader = csv.DictReader(f)
+        for record in reader:
+            # Empty CSV cells stand for NULL
+            yield reader.line_num, {k: (v if v != "" else None) for k, v in record.items()}
+    elif fmt == "jsonl":
+        for line_num, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_num, json.loads(line)
+            except ValueError:
+                yield line_num, None # Rejected by the loader like any other bad record
+    else:
+        raise ValueError(f"Unknown format '{fmt}', expected one of {', '.join(FORMATS)}.")
+
+def _number(value, field, kind):
+    """Converts a CSV string or JSON value to a non-negative int/float, keeping None."""
+    if value is None:
+        return None
+    try:
+        number = kind(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a number, got {value!r}") from None
+    if number < 0:
+        raise ValueError(f"{field} must not be negative")
+    return number
+
+def _text(record, field, required=False):
+    """Returns a record field as a string, keeping None unless the field is required."""
+    value = record.get(field)
+    if value is None:
+        if required:
+            raise ValueError(f"missing {field}")
+        return None
+    return str(value)
+
+
+def _date(value):
+    """Normalizes a log date to YYYY-MM-DD, the format the rollup triggers bucket by."""
+    if value is None:
+        raise ValueError("missing log_date")
+    try:
+        return datetime.date.fromisoformat(str(value)[:10]).isoformat()
+    except ValueError:
+        raise ValueError(f"invalid log_date {value!r}") from None
+
+class _Loader:
+    """
+    Buffers rows for one INSERT statement and runs them with executemany in chunks.
+    checkpoint() commits the open transaction, together with the number of input
+    records consumed so far, once commit_every records have passed since the last commit.
+    With suspend_triggers, each transaction inserts exercise logs with their insert
+    triggers suspended and catches up on them just before committing.
+    """
+    def __init__(self, conn, sql, source, table, source_size, records_done, chunk_size, commit_every,
+                 suspend_triggers=False):
+        self.conn = conn
+        self.sql = sql
+        self.source = source
+        self.table = table
+        self.source_size = source_size
+        self.records_done = records_done # Input records consumed, committed or not
+        self.committed = records_done
+        self.chunk_size = chunk_size
+        self.commit_every = commit_every
+        self.suspend_triggers = suspend_triggers
+        self.triggers = None # State of the suspended triggers while a transaction is open
+        self.rows = []
+        self.inserted = 0
+        self.rejected = 0
+        self.user_ids = set() # Users whose rows were written, for the data version bumps
+        self.started = time.perf_counter()
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            if self.suspend_triggers and self.triggers is None:
+                if not self.conn.in_transaction:
+                    self.conn.execute("BEGIN IMMEDIATE") # DDL would otherwise run in autocommit mode
+                self.triggers = database.suspend_log_insert_triggers(self.conn)
+            self.inserted += self.conn.executemany(self.sql, self.rows).rowcount
+            self.rows.clear()
+
+    def reject(self, line_num, error):
+        self.rejected += 1
+        if self.rejected <= MAX_REPORTED_ERRORS:
+            print(f"  line {line_num}: {error}, skipped")
+
+    def checkpoint(self):
+        """Commits if commit_every records have passed; only call between records that may be split."""
+        if self.records_done - self.committed >= self.commit_every:
+            self.commit()
+
+    def commit(self):
+        self.flush()
+        if self.triggers is not None:
+            database.resume_log_insert_triggers(self.conn, self.triggers)
+            self.triggers = None
+        self.conn.execute("""
+            INSERT INTO import_progress (source, table_name, source_size, records_done) VALUES (?, ?, ?, ?)
+            ON CONFLICT (source, table_name) DO UPDATE SET
+                source_size = excluded.source_size, records_done = excluded.records_done
+        """, (self.source, self.table, self.source_size, self.records_done))
+        self.conn.commit()
+        self.committed = self.records_done
+        elapsed = time.perf_counter() - self.started
+        print(f"  {self.records_done:,} records committed, {self.inserted:,} rows inserted ({elapsed:.1f}s)")
+
+def _load_exercises(conn, records, loader, users):
+    for line_num, record in records:
+        loader.records_done += 1
+        try:
+            if not isinstance(record, dict):
+                raise ValueError("malformed record")
+            loader.add((_text(record, "name", required=True), _text(record, "description"),
+                        _text(record, "image_path"), _text(record, "gif_path")))
+        except ValueError as e:
+            loader.reject(line_num, e)
+        loader.checkpoint()
+
+def _load_workouts(conn, records, loader, users):
+    # A workout is a run of consecutive records with the same (username, workout). Commits
+    # only happen where a new workout starts, so a resumed import never splits one.
+    workout_key = workout_id = None
+    position = 0
+    for line_num, record in records:
+        try:
+            if not isinstance(record, dict):
+                raise ValueError("malformed record")
+            key = (_text(record, "username", required=True), _text(record, "workout", required=True))
+            if key != workout_key:
+                loader.checkpoint()
+                workout_key, workout_id, position = key, None, 0
+                user_id = users.get(key[0])
+                if user_id is None:
+                    raise ValueError(f"unknown user '{key[0]}'")
+                workout_id = conn.execute("INSERT INTO workouts (user_id, name) VALUES (?, ?)", (user_id, key[1])).lastrowid
+                loader.user_ids.add(user_id)
+            if workout_id is None:
+                raise ValueError(f"workout '{key[1]}' of '{key[0]}' was skipped")
+            exercise = database.get_exercise_by_name(_text(record, "exercise", required=True))
+            if exercise is None:
+                raise ValueError(f"unknown exercise '{record['exercise']}'")
+            sequence = _number(record.get("sequence"), "sequence", int)
+            loader.add((workout_id, exercise.id, position if sequence is None else sequence))
+            position += 1
+        except ValueError as e:
+            loader.reject(line_num, e)
+        finally:
+            loader.records_done += 1
+
+def _load_exercise_logs(conn, records, loader, users):
+    exercises = {}
+    for line_num, record in records:
+        loader.records_done += 1
+        try:
+            if not isinstance(record, dict):
+                raise ValueError("malformed record")
+            username = _text(record, "username", required=True)
+            user_id = users.get(username)
+            if user_id is None:
+                raise ValueError(f"unknown user '{username}'")
+            name = _text(record, "exercise", required=True)
+            exercise_id = exercises.get(name)
+            if exercise_id is None:
+                exercise = database.get_exercise_by_name(name)
+                if exercise is None:
+                    raise ValueError(f"unknown exercise '{name}'")
+                exercise_id = exercises[name] = exercise.id
+            loader.add((
+                user_id, exercise_id, _date(record.get("log_date")),
+                _number(record.get("sets"), "sets", int), _number(record.get("reps"), "reps", int),
+                _number(record.get("weight"), "weight", float),
+                _number(record.get("duration_minutes"), "duration_minutes", float),
+                _number(record.get("calories_burned"), "calories_burned", float),
+                _text(record, "notes"),
+            ))
+            loader.user_ids.add(user_id)
+        except ValueError as e:
+            loader.reject(line_num, e)
+        loader.checkpoint()
+
+# Table -> (INSERT statement, loader function)
+IMPORTERS = {
+    "exercises": (
+        "INSERT OR IGNORE INTO exercises (name, description, image_path, gif_path) VALUES (?, ?, ?, ?)",
+        _load_exercises,
+    ),
+    "workouts": (
+        "INSERT OR IGNORE INTO workout_exercises (workout_id, exercise_id, sequence) VALUES (?, ?, ?)",
+        _load_workouts,
+    ),
+    "exercise_logs": (
+        """
+        INSERT INTO exercise_logs
+            (user_id, exercise_id, log_date, sets, reps, weight, duration_minutes, calories_burned, notes)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        _load_exercise_logs,
+    ),
+}
+
+def _check_table(table):
+    if table not in FIELDS:
+        raise ValueError(f"Unknown table '{table}', expected one of {', '.join(FIELDS)}.")
+
+def import_file(path, table, fmt=None, chunk_size=CHUNK_SIZE, commit_every=COMMIT_EVERY, restart=False):
+    """
+    Imports the records of a CSV or JSON Lines file into `table`, resuming after the last
+    committed record of an earlier run over the same file unless `restart` is set.
+    Existing exercise names are kept; records naming an unknown user or exercise, or with
+    invalid values, are skipped and counted. Returns (records read, rows inserted, records
+    skipped), or None if the import failed; committed chunks are kept and resumed next time.
+    """
+    _check_table(table)
+    fmt = fmt or detect_format(path)
+    source = os.path.abspath(path)
+    source_size = os.path.getsize(source)
+    conn = database.connect_db()
+
+    done = 0
+    if not restart:
+        row = conn.execute("SELECT source_size, records_done FROM import_progress WHERE source = ? AND table_name = ?",
+                           (source, table)).fetchone()
+        if row and row[0] == source_size:
+            done = row[1]
+            print(f"Resuming {table} import of '{path}' after {done:,} records.")
+        elif row:
+            print(f"'{path}' has changed since its last import, starting over.")
+
+    # The catalog doubles as the exercise name index; users are mapped with a dict of their own
+    users = dict(conn.execute("SELECT username, id FROM users"))
+    sql, load = IMPORTERS[table]
+    loader = _Loader(conn, sql, source, table, source_size, done, chunk_size, commit_every,
+                     suspend_triggers=table == "exercise_logs")
+    try:
+        with open(source, newline="", encoding="utf-8") as f:
+            load(conn, itertools.islice(read_records(f, fmt), done, None), loader, users)
+        loader.commit()
+    except Exception as e:
+        print(f"Error importing '{path}' into {table}: {e}")
+        conn.rollback()
+        return None
+    finally:
+        if loader.inserted:
+            if table == "exercises":
+                database.invalidate_exercise_catalog()
+            for user_id in loader.user_ids:
+                database.bump_data_version(table, user_id)
+    return loader.records_done - done, loader.inserted, loader.rejected
+
+def export_file(path, table, fmt=None, username=None):
+    """
+    Writes the rows of `table` (only `username`'s if given) to a CSV or JSON Lines file,
+    streaming them from the cursor. Returns the number of records written, or None on error.
+    """
+    _check_table(table)
+    fmt = fmt or detect_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of {', '.join(FORMATS)}.")
+    sql, where, user_order, order = EXPORT_SQL[table]
+    conn = database.connect_db()
+    params = ()
+    if username is None:
+        sql = sql.format(where="", order=order)
+    else:
+        if where is None:
+            raise ValueError(f"{table} do not belong to a user.")
+        user_id = database.get_user_id(username)
+        if user_id is None:
+            print(f"Unknown user '{username}'.")
+            return None
+        params = (user_id,)
+        sql = sql.format(where=where, order=user_order)
+
+    fields = FIELDS[table]
+    count = 0
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            if fmt == "csv":
+                writer = csv.writer(f)
+                writer.writerow(fields)
+                for row in conn.execute(sql, params):
+                    writer.writerow(row)
+                    count += 1
+            else:
+                for row in conn.execute(sql, params):
+                    f.write(json.dumps(dict(zip(fields, row))) + "\n")
+                    count += 1
+        os.replace(tmp_path, path) # A failed export never leaves a truncated file behind
+    except (OSError, sqlite3.Error) as e:
+        print(f"Error exporting {table} to '{path}': {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streaming import and export of fitness tracker data.")
+    parser.add_argument("command", choices=("import", "export"))
+    parser.add_argument("table", choices=tuple(FIELDS))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension")
+    parser.add_argument("--user", help="export only this user's rows")
+    parser.add_argument("--commit-every", type=int, default=COMMIT_EVERY)
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint of an earlier import")
+    args = parser.parse_args(argv)
+
+    database.init_db()
+    if args.command == "import":
+        result = import_file(args.path, args.table, args.format, commit_every=args.commit_every, restart=args.restart)
+        if result is None:
+            return 1
+        read, inserted, skipped = result
+        print(f"Imported {inserted:,} {args.table} rows from {read:,} records ({skipped:,} skipped).")
+    else:
+        count = export_file(args.path, args.table, args.format, args.user)
+        if count is None:
+            return 1
+        print(f"Exported {count:,} {args.table} records to '{args.path}'.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,218 @@
+import bisect
+import re
 import sqlite3
+import sys
+import threading
+from collections import namedtuple
+from operator import attrgetter
 
 DATABASE_NAME = "fitness_tracker.db"
 
+# Connection tuning applied to every connection opened by connect_db()
+PAGE_CACHE_KIB = 16384 # Page cache size per connection (16 MiB)
+MMAP_SIZE_BYTES = 256 * 1024 * 1024 # Memory-mapped I/O window (256 MiB)
+STATEMENT_CACHE_SIZE = 128 # Prepared statements kept per connection
+SYNCHRONOUS = "NORMAL" # NORMAL syncs the WAL only at checkpoints; FULL syncs on every commit
+
+_local = threading.local() # Holds each thread's (path, connection) pair
+
+def _open_connection(path):
+    """Opens a new connection to `path` and applies the tuning pragmas."""
+    conn = sqlite3.connect(path, cached_statements=STATEMENT_CACHE_SIZE)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={SYNCHRONOUS}")
+    conn.execute(f"PRAGMA cache_size=-{PAGE_CACHE_KIB}")
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE_BYTES}")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
 def connect_db():
-    """Connects to the SQLite database."""
-    return sqlite3.connect(DATABASE_NAME)
+    """Returns the calling thread's persistent connection to the SQLite database.
 
-def init_db():
-    """Initializes the database schema."""
-    conn = connect_db()
-    cursor = conn.cursor()
+    The connection is opened on first use and reused by every later call from
+    the same thread. It is reopened if DATABASE_NAME has changed since.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.path == DATABASE_NAME:
+        return conn
+    close_db()
+    _local.conn = _open_connection(DATABASE_NAME)
+    _local.path = DATABASE_NAME
+    return _local.conn
 
-    # Users table
-    cursor.execute("""
+def close_db():
+    """Closes the calling thread's connection, if it has one."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+        _local.path = None
+
+# Rollup buckets: SQL giving the first day of the bucket that a log date falls in.
+# Weeks start on Monday.
+ROLLUP_PERIODS = {
+    "day": "date({date})",
+    "week": "date({date}, 'weekday 0', '-6 days')",
+    "month": "date({date}, 'start of month')",
+}
+
+def _rollup_bucket_sql(date):
+    """SELECT yielding one (period, period_start) row per rollup bucket of `date`."""
+    return " UNION ALL ".join(
+        f"SELECT '{period}' AS period, {expr.format(date=date)} AS period_start"
+        for period, expr in ROLLUP_PERIODS.items()
+    )
+
+def _rollup_apply_sql(row, sign):
+    """Adds (sign=1) or subtracts (sign=-1) one log row, NEW or OLD, to/from its rollup buckets."""
+    return f"""
+        INSERT INTO exercise_log_rollups
+            (user_id, exercise_id, period, period_start, log_count, total_sets, total_reps,
+             total_volume, total_weight, weighted_logs, total_duration_minutes, total_calories)
+        SELECT {row}.user_id, {row}.exercise_id, b.period, b.period_start, {sign},
+               {sign} * coalesce({row}.sets, 0), {sign} * coalesce({row}.reps, 0),
+               {sign} * coalesce({row}.sets * {row}.reps * {row}.weight, 0),
+               {sign} * coalesce({row}.weight, 0), {sign} * ({row}.weight IS NOT NULL),
+               {sign} * coalesce({row}.duration_minutes, 0), {sign} * coalesce({row}.calories_burned, 0)
+        FROM ({_rollup_bucket_sql(f"{row}.log_date")}) b
+        WHERE true
+        ON CONFLICT (user_id, exercise_id, period, period_start) DO UPDATE SET
+            log_count = log_count + excluded.log_count,
+            total_sets = total_sets + excluded.total_sets,
+            total_reps = total_reps + excluded.total_reps,
+            total_volume = total_volume + excluded.total_volume,
+            total_weight = total_weight + excluded.total_weight,
+            weighted_logs = weighted_logs + excluded.weighted_logs,
+            total_duration_minutes = total_duration_minutes + excluded.total_duration_minutes,
+            total_calories = total_calories + excluded.total_calories;
+    """
+
+_ROLLUP_PRUNE_SQL = "DELETE FROM exercise_log_rollups WHERE log_count <= 0;"
+
+# Recomputes every rollup bucket from exercise_logs in one pass
+_ROLLUP_REBUILD_SQL = (
+    "DELETE FROM exercise_log_rollups",
+    f"""
+    INSERT INTO exercise_log_rollups
+        (user_id, exercise_id, period, period_start, log_count, total_sets, total_reps,
+         total_volume, total_weight, weighted_logs, total_duration_minutes, total_calories)
+    SELECT el.user_id, el.exercise_id, b.period,
+           CASE b.period {" ".join(f"WHEN '{p}' THEN {e.format(date='el.log_date')}" for p, e in ROLLUP_PERIODS.items())} END AS period_start,
+           count(*), total(el.sets), total(el.reps), total(el.sets * el.reps * el.weight),
+           total(el.weight), count(el.weight), total(el.duration_minutes), total(el.calories_burned)
+    FROM exercise_logs el
+    CROSS JOIN ({" UNION ALL ".join(f"SELECT '{p}' AS period" for p in ROLLUP_PERIODS)}) b
+    GROUP BY el.user_id, el.exercise_id, b.period, period_start
+    """,
+)
+
+# Adds the rollup buckets of the exercise logs with id > ? in one pass, as the insert
+# trigger would have row by row
+_ROLLUP_APPLY_NEW_SQL = f"""
+    INSERT INTO exercise_log_rollups
+        (user_id, exercise_id, period, period_start, log_count, total_sets, total_reps,
+         total_volume, total_weight, weighted_logs, total_duration_minutes, total_calories)
+    SELECT el.user_id, el.exercise_id, b.period,
+           CASE b.period {" ".join(f"WHEN '{p}' THEN {e.format(date='el.log_date')}" for p, e in ROLLUP_PERIODS.items())} END AS period_start,
+           count(*), total(el.sets), total(el.reps), total(el.sets * el.reps * el.weight),
+           total(el.weight), count(el.weight), total(el.duration_minutes), total(el.calories_burned)
+    FROM exercise_logs el
+    CROSS JOIN ({" UNION ALL ".join(f"SELECT '{p}' AS period" for p in ROLLUP_PERIODS)}) b
+    WHERE el.id > ?
+    GROUP BY el.user_id, el.exercise_id, b.period, period_start
+    ON CONFLICT (user_id, exercise_id, period, period_start) DO UPDATE SET
+        log_count = log_count + excluded.log_count,
+        total_sets = total_sets + excluded.total_sets,
+        total_reps = total_reps + excluded.total_reps,
+        total_volume = total_volume + excluded.total_volume,
+        total_weight = total_weight + excluded.total_weight,
+        weighted_logs = weighted_logs + excluded.weighted_logs,
+        total_duration_minutes = total_duration_minutes + excluded.total_duration_minutes,
+        total_calories = total_calories + excluded.total_calories
+"""
+
+# Rep maxes: the heaviest weight and largest volume of each user, exercise and rep count
+# (missing reps count as 0). Personal records and estimated 1RMs follow from these rows,
+# since both 1RM formulas grow with the weight at a given rep count.
+_REP_MAX_SELECT_SQL = """
+    SELECT user_id, exercise_id, coalesce(reps, 0), max(weight),
+           max(coalesce(sets * reps * weight, 0))
+    FROM exercise_logs
+"""
+_REP_MAX_GROUP_SQL = "GROUP BY user_id, exercise_id, coalesce(reps, 0)"
+
+def _rep_max_apply_sql(row):
+    """Raises the rep max of one inserted log row, NEW, to cover it."""
+    return f"""
+        INSERT INTO exercise_rep_maxes (user_id, exercise_id, reps, max_weight, max_volume)
+        VALUES ({row}.user_id, {row}.exercise_id, coalesce({row}.reps, 0), {row}.weight,
+                coalesce({row}.sets * {row}.reps * {row}.weight, 0))
+        ON CONFLICT (user_id, exercise_id, reps) DO UPDATE SET
+            max_weight = max(coalesce(max_weight, excluded.max_weight), coalesce(excluded.max_weight, max_weight)),
+            max_volume = max(max_volume, excluded.max_volume);
+    """
+
+def _rep_max_recompute_sql(row):
+    """Recomputes the rep max that log row OLD or NEW belongs to, after a delete or update."""
+    return f"""
+        DELETE FROM exercise_rep_maxes
+        WHERE user_id = {row}.user_id AND exercise_id = {row}.exercise_id AND reps = coalesce({row}.reps, 0);
+        INSERT INTO exercise_rep_maxes (user_id, exercise_id, reps, max_weight, max_volume)
+        {_REP_MAX_SELECT_SQL}
+        WHERE user_id = {row}.user_id AND exercise_id = {row}.exercise_id
+          AND coalesce(reps, 0) = coalesce({row}.reps, 0)
+        {_REP_MAX_GROUP_SQL};
+    """
+
+_REP_MAX_REBUILD_SQL = (
+    "DELETE FROM exercise_rep_maxes",
+    f"""
+    INSERT INTO exercise_rep_maxes (user_id, exercise_id, reps, max_weight, max_volume)
+    {_REP_MAX_SELECT_SQL}
+    {_REP_MAX_GROUP_SQL}
+    """,
+)
+
+# Raises the rep maxes to cover the exercise logs with id > ?, as the insert trigger would have
+_REP_MAX_APPLY_NEW_SQL = f"""
+    INSERT INTO exercise_rep_maxes (user_id, exercise_id, reps, max_weight, max_volume)
+    {_REP_MAX_SELECT_SQL}
+    WHERE id > ?
+    {_REP_MAX_GROUP_SQL}
+    ON CONFLICT (user_id, exercise_id, reps) DO UPDATE SET
+        max_weight = max(coalesce(max_weight, excluded.max_weight), coalesce(excluded.max_weight, max_weight)),
+        max_volume = max(max_volume, excluded.max_volume)
+"""
+
+def _fts_sync_sql(table, fts_table, columns):
+    """Triggers that mirror inserts, deletes and updates of `table` into its external content FTS5 index."""
+    cols = ", ".join(columns)
+    new = ", ".join(f"NEW.{c}" for c in columns)
+    old = ", ".join(f"OLD.{c}" for c in columns)
+    delete = f"INSERT INTO {fts_table} ({fts_table}, rowid, {cols}) VALUES ('delete', OLD.id, {old});"
+    insert = f"INSERT INTO {fts_table} (rowid, {cols}) VALUES (NEW.id, {new});"
+    return (
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_insert AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_delete AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_update AFTER UPDATE ON {table} BEGIN {delete} {insert} END",
+    )
+
+# Schema migrations, in order. Applying MIGRATIONS[n] upgrades a database from
+# PRAGMA user_version n to n + 1. Never edit a migration that has shipped;
+# append a new one instead.
+MIGRATIONS = [
+    # 1: Initial schema
+    (
+        # Users table
+        """
         CREATE TABLE IF NOT EXISTS users (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             username TEXT UNIQUE NOT NULL,
             password TEXT NOT NULL
         )
-    """)
-
-    # Exercises table (Pre-defined exercises)
-    cursor.execute("""
+        """,
+        # Exercises table (Pre-defined exercises)
+        """
         CREATE TABLE IF NOT EXISTS exercises (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT UNIQUE NOT NULL,
@@ -29,20 +220,18 @@ def init_db():
             image_path TEXT,
             gif_path TEXT
         )
-    """)
-
-    # Workouts table (Custom workout routines)
-    cursor.execute("""
+        """,
+        # Workouts table (Custom workout routines)
+        """
         CREATE TABLE IF NOT EXISTS workouts (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER NOT NULL,
             name TEXT NOT NULL,
             FOREIGN KEY (user_id) REFERENCES users(id)
         )
-    """)
-
-    # Workout_Exercises table (Many-to-many relationship for workouts and exercises)
-    cursor.execute("""
+        """,
+        # Workout_Exercises table (Many-to-many relationship for workouts and exercises)
+        """
         CREATE TABLE IF NOT EXISTS workout_exercises (
             workout_id INTEGER NOT NULL,
             exercise_id INTEGER NOT NULL,
@@ -51,10 +240,9 @@ def init_db():
             FOREIGN KEY (workout_id) REFERENCES workouts(id),
             FOREIGN KEY (exercise_id) REFERENCES exercises(id)
         )
-    """)
-
-    # Exercise_Logs table (User's logged exercise data)
-    cursor.execute("""
+        """,
+        # Exercise_Logs table (User's logged exercise data)
+        """
         CREATE TABLE IF NOT EXISTS exercise_logs (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER NOT NULL,
@@ -69,24 +257,259 @@ def init_db():
             FOREIGN KEY (user_id) REFERENCES users(id),
             FOREIGN KEY (exercise_id) REFERENCES exercises(id)
         )
-    """)
+        """,
+    ),
+    # 2: Indexes for a user's log history (filtered by user, newest first)
+    (
+        "CREATE INDEX IF NOT EXISTS idx_exercise_logs_user_date ON exercise_logs (user_id, log_date)",
+    ),
+    # 3: Covering indexes for a user's workout list and a workout's exercise sequence
+    (
+        "CREATE INDEX IF NOT EXISTS idx_workouts_user ON workouts (user_id, name)",
+        "CREATE INDEX IF NOT EXISTS idx_workout_exercises_sequence ON workout_exercises (workout_id, sequence, exercise_id)",
+    ),
+    # 4: Daily/weekly/monthly rollups per user and exercise, kept current by triggers
+    (
+        """
+        CREATE TABLE IF NOT EXISTS exercise_log_rollups (
+            user_id INTEGER NOT NULL,
+            exercise_id INTEGER NOT NULL,
+            period TEXT NOT NULL, -- 'day', 'week' or 'month'
+            period_start TEXT NOT NULL, -- First day of the bucket (YYYY-MM-DD)
+            log_count INTEGER NOT NULL,
+            total_sets INTEGER NOT NULL,
+            total_reps INTEGER NOT NULL,
+            total_volume REAL NOT NULL, -- Sum of sets x reps x weight
+            total_weight REAL NOT NULL, -- Sum of weight over logs that have one
+            weighted_logs INTEGER NOT NULL, -- Number of logs with a weight
+            total_duration_minutes REAL NOT NULL,
+            total_calories REAL NOT NULL,
+            PRIMARY KEY (user_id, exercise_id, period, period_start)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_exercise_log_rollups_user_period ON exercise_log_rollups (user_id, period, period_start)",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_exercise_logs_rollup_insert AFTER INSERT ON exercise_logs
+        BEGIN
+            {_rollup_apply_sql("NEW", 1)}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_exercise_logs_rollup_delete AFTER DELETE ON exercise_logs
+        BEGIN
+            {_rollup_apply_sql("OLD", -1)}
+            {_ROLLUP_PRUNE_SQL}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_exercise_logs_rollup_update AFTER UPDATE ON exercise_logs
+        BEGIN
+            {_rollup_apply_sql("OLD", -1)}
+            {_rollup_apply_sql("NEW", 1)}
+            {_ROLLUP_PRUNE_SQL}
+        END
+        """,
+        *_ROLLUP_REBUILD_SQL, # Backfill from the logs already in the database
+    ),
+    # 5: Per-user change counter for exercise logs, used to key caches of derived data
+    (
+        """
+        CREATE TABLE IF NOT EXISTS user_log_versions (
+            user_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+        """,
+        *(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_exercise_logs_version_{event.lower()} AFTER {event} ON exercise_logs
+        BEGIN
+            INSERT INTO user_log_versions (user_id, version) VALUES ({row}.user_id, 1)
+            ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+        END
+        """ for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD"))),
+    ),
+    # 6: Full-text search over exercises and log notes. Both indexes read their text from the
+    # base tables (external content) and are kept in sync by triggers. Log notes are indexed
+    # together with user_id so a search only ever visits the searching user's entries.
+    (
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS exercises_fts USING fts5(
+            name, description, content='exercises', content_rowid='id', tokenize='porter unicode61'
+        )
+        """,
+        "INSERT INTO exercises_fts (exercises_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')", # Name hits first
+        *_fts_sync_sql("exercises", "exercises_fts", ("name", "description")),
+        "INSERT INTO exercises_fts (exercises_fts) VALUES ('rebuild')",
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS exercise_logs_fts USING fts5(
+            notes, user_id, content='exercise_logs', content_rowid='id', tokenize='porter unicode61'
+        )
+        """,
+        "INSERT INTO exercise_logs_fts (exercise_logs_fts, rank) VALUES ('rank', 'bm25(1.0, 0.0)')", # Rank on notes only
+        *_fts_sync_sql("exercise_logs", "exercise_logs_fts", ("notes", "user_id")),
+        "INSERT INTO exercise_logs_fts (exercise_logs_fts) VALUES ('rebuild')",
+    ),
+    # 7: Checkpoints of bulk imports, committed with the rows they count so an interrupted
+    # import resumes after the last committed chunk
+    (
+        """
+        CREATE TABLE IF NOT EXISTS import_progress (
+            source TEXT NOT NULL, -- Absolute path of the input file
+            table_name TEXT NOT NULL,
+            source_size INTEGER NOT NULL, -- Size of the input file, to notice a different file at the same path
+            records_done INTEGER NOT NULL, -- Input records committed so far
+            PRIMARY KEY (source, table_name)
+        )
+        """,
+    ),
+    # 8: Wearable sensor samples of a logged session, one row per chunk of up to an hour of
+    # one channel. Values are packed little-endian float32 and timestamps are delta-encoded
+    # (see samples.py for the format).
+    (
+        """
+        CREATE TABLE IF NOT EXISTS session_samples (
+            id INTEGER PRIMARY KEY,
+            log_id INTEGER NOT NULL,
+            channel TEXT NOT NULL, -- e.g. 'heart_rate', 'cadence', 'power'
+            chunk_start INTEGER NOT NULL, -- Timestamp of the first sample (ms since the epoch)
+            chunk_end INTEGER NOT NULL, -- Timestamp of the last sample
+            sample_count INTEGER NOT NULL,
+            interval_ms INTEGER, -- Spacing of evenly spaced samples, NULL if time_deltas is used
+            time_deltas BLOB, -- uint32 ms since the previous sample, NULL for evenly spaced samples
+            sample_values BLOB NOT NULL, -- float32 values
+            FOREIGN KEY (log_id) REFERENCES exercise_logs(id) ON DELETE CASCADE
+        )
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_session_samples_chunk ON session_samples (log_id, channel, chunk_start)",
+    ),
+    # 9: The default exercises used to be seeded with images/... and gifs/... paths, but their
+    # assets ship in the application directory, which asset paths are now relative to
+    (
+        """
+        UPDATE exercises SET image_path = substr(image_path, 8)
+        WHERE image_path IN ('images/pushup.png', 'images/squat.png', 'images/plank.png', 'images/lunge.png')
+        """,
+        """
+        UPDATE exercises SET gif_path = substr(gif_path, 6)
+        WHERE gif_path IN ('gifs/pushup.gif', 'gifs/squat.gif', 'gifs/plank.gif', 'gifs/lunge.gif')
+        """,
+    ),
+    # 10: What the progress summary reads, so it costs no more than the days trained: a rollup
+    # index covering the per-day totals across exercises, and rep maxes kept current by triggers
+    (
+        "DROP INDEX IF EXISTS idx_exercise_log_rollups_user_period",
+        """
+        CREATE INDEX IF NOT EXISTS idx_exercise_log_rollups_user_totals ON exercise_log_rollups
+            (user_id, period, period_start, log_count, total_sets, total_reps, total_volume,
+             total_duration_minutes, total_calories)
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS exercise_rep_maxes (
+            user_id INTEGER NOT NULL,
+            exercise_id INTEGER NOT NULL,
+            reps INTEGER NOT NULL, -- 0 for logs without reps
+            max_weight REAL, -- NULL if no log at this rep count has a weight
+            max_volume REAL NOT NULL, -- Largest sets x reps x weight
+            PRIMARY KEY (user_id, exercise_id, reps)
+        ) WITHOUT ROWID
+        """,
+        # Finds the logs of a rep max to recompute it after a delete or update
+        "CREATE INDEX IF NOT EXISTS idx_exercise_logs_user_exercise ON exercise_logs (user_id, exercise_id)",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_exercise_logs_rep_max_insert AFTER INSERT ON exercise_logs
+        BEGIN
+            {_rep_max_apply_sql("NEW")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_exercise_logs_rep_max_delete AFTER DELETE ON exercise_logs
+        BEGIN
+            {_rep_max_recompute_sql("OLD")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_exercise_logs_rep_max_update AFTER UPDATE ON exercise_logs
+        BEGIN
+            {_rep_max_recompute_sql("OLD")}
+            {_rep_max_recompute_sql("NEW")}
+        END
+        """,
+        *_REP_MAX_REBUILD_SQL, # Backfill from the logs already in the database
+    ),
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def get_schema_version():
+    """Returns the schema version (PRAGMA user_version) of the database."""
+    return connect_db().execute("PRAGMA user_version").fetchone()[0]
+
+def migrate():
+    """Upgrades the database schema in place to SCHEMA_VERSION.
+
+    Each migration runs in its own write transaction together with the
+    user_version bump, so an interrupted upgrade resumes where it stopped.
+    """
+    conn = connect_db()
+    version = get_schema_version()
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(f"Database schema version {version} is newer than this application ({SCHEMA_VERSION}).")
+
+    for target in range(version + 1, SCHEMA_VERSION + 1):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Another process may have migrated while we waited for the write lock
+            if get_schema_version() >= target:
+                conn.rollback()
+                continue
+            for statement in MIGRATIONS[target - 1]:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {target}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+# In-process write counters for the data the screens display, bumped after each commit.
+# (table, None) counts every write to a table and (table, user_id) only one user's rows.
+_data_versions = {}
+_data_versions_lock = threading.Lock()
 
-    conn.commit()
-    conn.close()
+def bump_data_version(table, user_id=None):
+    """Records a committed write to `table`, made on behalf of `user_id` if given."""
+    with _data_versions_lock:
+        _data_versions[(table, None)] = _data_versions.get((table, None), 0) + 1
+        if user_id is not None:
+            _data_versions[(table, user_id)] = _data_versions.get((table, user_id), 0) + 1
+
+def get_data_version(table, user_id=None):
+    """Returns a counter that changes whenever this process writes to `table` (or to one user's rows)."""
+    with _data_versions_lock:
+        return _data_versions.get((table, user_id), 0)
+
+def init_db():
+    """Initializes the database schema, upgrading older databases to the latest version."""
+    migrate()
+
+def insert_user(cursor, username, password):
+    """Inserts a user without committing, and returns the new user id. Raises IntegrityError if the name is taken."""
+    cursor.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, password))
+    return cursor.lastrowid
 
 def add_user(username, password):
     """Adds a new user to the database."""
     conn = connect_db()
     cursor = conn.cursor()
     try:
-        cursor.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, password))
+        insert_user(cursor, username, password)
         conn.commit()
         return True
     except sqlite3.IntegrityError:
+        conn.rollback()
         print(f"User '{username}' already exists.")
         return False
-    finally:
-        conn.close()
+    except Exception:
+        conn.rollback() # Never leave this thread's shared connection inside a transaction
+        raise
 
 def get_user(username, password):
     """Retrieves a user by username and password."""
@@ -94,65 +517,134 @@ def get_user(username, password):
     cursor = conn.cursor()
     cursor.execute("SELECT id, username FROM users WHERE username = ? AND password = ?", (username, password))
     user = cursor.fetchone()
-    conn.close()
     return user
 
+def get_user_id(username):
+    """Retrieves a user's ID by username, or None if there is no such user."""
+    conn = connect_db()
+    cursor = conn.cursor()
+    cursor.execute("SELECT id FROM users WHERE username = ?", (username,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+# Immutable catalog record; still a tuple, so ex[0] / ex[1] indexing and unpacking work
+Exercise = namedtuple("Exercise", ["id", "name", "description", "image_path", "gif_path"])
+
+# Process-wide copy of the exercises table, loaded on first use:
+# (database name, records sorted by name, id -> Exercise, name -> Exercise).
+# It is replaced as a whole, so readers never need the lock.
+_catalog = None
+_catalog_lock = threading.Lock()
+
+def _build_catalog(exercises):
+    exercises = tuple(exercises)
+    return (DATABASE_NAME, exercises, {ex.id: ex for ex in exercises}, {ex.name: ex for ex in exercises})
+
+def _exercise_catalog():
+    """Returns the current catalog, loading it with one query if needed."""
+    global _catalog
+    catalog = _catalog
+    if catalog is None or catalog[0] != DATABASE_NAME:
+        with _catalog_lock:
+            catalog = _catalog
+            if catalog is None or catalog[0] != DATABASE_NAME:
+                conn = connect_db()
+                cursor = conn.cursor()
+                cursor.execute("SELECT id, name, description, image_path, gif_path FROM exercises ORDER BY name")
+                catalog = _catalog = _build_catalog(map(Exercise._make, cursor))
+    return catalog
+
+def _add_to_catalog(exercise):
+    """Adds a newly inserted exercise to the loaded catalog, keeping it sorted by name."""
+    global _catalog
+    with _catalog_lock:
+        catalog = _catalog
+        if catalog is None or catalog[0] != DATABASE_NAME or exercise.id in catalog[2]:
+            return # Not loaded yet, or loaded after the insert and already has it
+        exercises = list(catalog[1])
+        bisect.insort(exercises, exercise, key=attrgetter("name"))
+        _catalog = _build_catalog(exercises)
+
+def is_exercise_catalog_loaded():
+    """True if catalog reads will be answered from memory without touching SQLite."""
+    catalog = _catalog
+    return catalog is not None and catalog[0] == DATABASE_NAME
+
+def add_to_exercise_catalog(exercise):
+    """Adds an exercise committed through insert_exercise() to the catalog cache."""
+    _add_to_catalog(exercise)
+    bump_data_version("exercises")
+
+def invalidate_exercise_catalog():
+    """Drops the cached catalog so the next read reloads it, e.g. after a bulk import."""
+    global _catalog
+    with _catalog_lock:
+        _catalog = None
+    bump_data_version("exercises")
+
+def insert_exercise(cursor, name, description, image_path, gif_path):
+    """
+    Inserts an exercise without committing, and returns the new exercise id. Raises
+    IntegrityError if the name is taken. Once committed, pass it to add_to_exercise_catalog().
+    """
+    cursor.execute(
+        "INSERT INTO exercises (name, description, image_path, gif_path) VALUES (?, ?, ?, ?)",
+        (name, description, image_path, gif_path)
+    )
+    return cursor.lastrowid
+
 def add_exercise(name, description, image_path, gif_path):
     """Adds a new exercise to the database."""
     conn = connect_db()
     cursor = conn.cursor()
     try:
-        cursor.execute(
-            "INSERT INTO exercises (name, description, image_path, gif_path) VALUES (?, ?, ?, ?)",
-            (name, description, image_path, gif_path)
-        )
+        exercise_id = insert_exercise(cursor, name, description, image_path, gif_path)
         conn.commit()
+        add_to_exercise_catalog(Exercise(exercise_id, name, description, image_path, gif_path))
         return True
     except sqlite3.IntegrityError:
+        conn.rollback()
         print(f"Exercise '{name}' already exists.")
         return False
-    finally:
-        conn.close()
+    except Exception:
+        conn.rollback() # Never leave this thread's shared connection inside a transaction
+        raise
 
 def get_all_exercises():
-    """Retrieves all exercises from the database."""
-    conn = connect_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, name, description, image_path, gif_path FROM exercises ORDER BY name")
-    exercises = cursor.fetchall()
-    conn.close()
-    return exercises
+    """Retrieves all exercises, sorted by name, as a tuple of Exercise records from the catalog cache."""
+    return _exercise_catalog()[1]
 
 def get_exercise_by_id(exercise_id):
-    """Retrieves an exercise by its ID."""
-    conn = connect_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, name, description, image_path, gif_path FROM exercises WHERE id = ?", (exercise_id,))
-    exercise = cursor.fetchone()
-    conn.close()
-    return exercise
+    """Retrieves an exercise by its ID from the catalog cache, or None."""
+    return _exercise_catalog()[2].get(exercise_id)
+
+def get_exercise_by_name(name):
+    """Retrieves an exercise by its exact name from the catalog cache, or None."""
+    return _exercise_catalog()[3].get(name)
+
+def insert_workout(cursor, user_id, workout_name, exercise_ids):
+    """Inserts a workout and its exercises without committing, and returns the workout id."""
+    cursor.execute("INSERT INTO workouts (user_id, name) VALUES (?, ?)", (user_id, workout_name))
+    workout_id = cursor.lastrowid
+    cursor.executemany(
+        "INSERT INTO workout_exercises (workout_id, exercise_id, sequence) VALUES (?, ?, ?)",
+        [(workout_id, exercise_id, i) for i, exercise_id in enumerate(exercise_ids)]
+    )
+    return workout_id
 
 def create_workout(user_id, workout_name, exercise_ids):
     """Creates a new workout routine for a user."""
     conn = connect_db()
     cursor = conn.cursor()
     try:
-        cursor.execute("INSERT INTO workouts (user_id, name) VALUES (?, ?)", (user_id, workout_name))
-        workout_id = cursor.lastrowid
-
-        for i, exercise_id in enumerate(exercise_ids):
-            cursor.execute(
-                "INSERT INTO workout_exercises (workout_id, exercise_id, sequence) VALUES (?, ?, ?)",
-                (workout_id, exercise_id, i)
-            )
+        insert_workout(cursor, user_id, workout_name, exercise_ids)
         conn.commit()
+        bump_data_version("workouts", user_id)
         return True
     except Exception as e:
         print(f"Error creating workout: {e}")
         conn.rollback()
         return False
-    finally:
-        conn.close()
 
 def get_user_workouts(user_id):
     """Retrieves all workouts for a given user."""
@@ -160,9 +652,35 @@ def get_user_workouts(user_id):
     cursor = conn.cursor()
     cursor.execute("SELECT id, name FROM workouts WHERE user_id = ?", (user_id,))
     workouts = cursor.fetchall()
-    conn.close()
     return workouts
 
+def get_user_workouts_page(user_id, limit=50, after=None):
+    """
+    Retrieves one page of a user's workouts as (id, name) rows, ordered by name. `after` is
+    the (name, id) cursor returned with the previous page, or None for the first page.
+    Returns (workouts, next_cursor); next_cursor is None after the last page.
+    """
+    conn = connect_db()
+    cursor = conn.cursor()
+    params = [user_id]
+    after_cursor = ""
+    if after is not None:
+        after_cursor = "AND (name, id) > (?, ?)"
+        params.extend(after)
+    params.append(limit + 1) # One extra row tells us whether another page exists
+    cursor.execute(f"""
+        SELECT id, name FROM workouts
+        WHERE user_id = ? {after_cursor}
+        ORDER BY name, id
+        LIMIT ?
+    """, params)
+    workouts = cursor.fetchall()
+    next_cursor = None
+    if len(workouts) > limit:
+        workouts = workouts[:limit]
+        next_cursor = (workouts[-1][1], workouts[-1][0])
+    return workouts, next_cursor
+
 def get_workout_details(workout_id):
     """Retrieves exercises within a specific workout."""
     conn = connect_db()
@@ -175,28 +693,82 @@ def get_workout_details(workout_id):
         ORDER BY we.sequence
     """, (workout_id,))
     exercises = cursor.fetchall()
-    conn.close()
     return exercises
 
+def insert_exercise_log(cursor, user_id, exercise_id, sets, reps, weight, duration_minutes, calories_burned,
+                        notes, log_date):
+    """Inserts an exercise log without committing, and returns the new log id."""
+    cursor.execute(
+        """INSERT INTO exercise_logs
+           (user_id, exercise_id, sets, reps, weight, duration_minutes, calories_burned, notes, log_date)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (user_id, exercise_id, sets, reps, weight, duration_minutes, calories_burned, notes, log_date)
+    )
+    return cursor.lastrowid
+
 def log_exercise(user_id, exercise_id, sets, reps, weight, duration_minutes, calories_burned, notes, log_date):
-    """Logs a performed exercise."""
+    """Logs a performed exercise and returns the id of the new log, or False on error."""
+    conn = connect_db()
+    cursor = conn.cursor()
+    try:
+        log_id = insert_exercise_log(cursor, user_id, exercise_id, sets, reps, weight, duration_minutes,
+                                     calories_burned, notes, log_date)
+        conn.commit()
+        bump_data_version("exercise_logs", user_id)
+        return log_id
+    except Exception as e:
+        print(f"Error logging exercise: {e}")
+        conn.rollback()
+        return False
+
+def _validate_log_entry(entry):
+    """Returns an error message for an invalid session log entry, or None if it is valid."""
+    if len(entry) != 7:
+        return f"expected 7 fields, got {len(entry)}"
+    exercise_id, sets, reps, weight, duration_minutes, calories_burned, notes = entry
+    if not isinstance(exercise_id, int):
+        return f"invalid exercise id {exercise_id!r}"
+    for field, value in (("sets", sets), ("reps", reps)):
+        if value is not None and (not isinstance(value, int) or value < 0):
+            return f"{field} must be a non-negative integer"
+    for field, value in (("weight", weight), ("duration", duration_minutes), ("calories", calories_burned)):
+        if value is not None and (not isinstance(value, (int, float)) or value < 0):
+            return f"{field} must be a non-negative number"
+    if notes is not None and not isinstance(notes, str):
+        return "notes must be text"
+    return None
+
+def log_workout_session(user_id, exercise_logs, log_date):
+    """Logs every exercise of a workout session in a single transaction.
+
+    `exercise_logs` is a sequence of (exercise_id, sets, reps, weight,
+    duration_minutes, calories_burned, notes) tuples. Every entry is validated
+    before anything is written, so an invalid entry leaves the database untouched.
+    """
+    rows = []
+    for entry in exercise_logs:
+        error = _validate_log_entry(entry)
+        if error:
+            print(f"Error logging workout session: {error}")
+            return False
+        rows.append((user_id, *entry, log_date))
+
     conn = connect_db()
     cursor = conn.cursor()
     try:
-        cursor.execute(
+        cursor.executemany(
             """INSERT INTO exercise_logs
                (user_id, exercise_id, sets, reps, weight, duration_minutes, calories_burned, notes, log_date)
                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (user_id, exercise_id, sets, reps, weight, duration_minutes, calories_burned, notes, log_date)
+            rows
         )
         conn.commit()
+        bump_data_version("exercise_logs", user_id)
         return True
     except Exception as e:
-        print(f"Error logging exercise: {e}")
+        print(f"Error logging workout session: {e}")
         conn.rollback()
         return False
-    finally:
-        conn.close()
 
 def get_user_exercise_logs(user_id):
     """Retrieves all exercise logs for a given user, with exercise names."""
@@ -210,18 +782,247 @@ def get_user_exercise_logs(user_id):
         ORDER BY el.log_date DESC
     """, (user_id,))
     logs = cursor.fetchall()
-    conn.close()
     return logs
 
+def get_user_exercise_logs_page(user_id, limit=50, before=None):
+    """
+    Retrieves one page of a user's exercise logs, newest first, in the same row format
+    as get_user_exercise_logs. `before` is the (log_date, id) cursor returned with the
+    previous page, or None for the first page. Returns (logs, next_cursor); next_cursor
+    is None once the history is exhausted. Every page is an index range scan, so its cost
+    does not grow with the length of the history.
+    """
+    conn = connect_db()
+    cursor = conn.cursor()
+    params = [user_id]
+    after_cursor = ""
+    if before is not None:
+        after_cursor = "AND (el.log_date, el.id) < (?, ?)"
+        params.extend(before)
+    params.append(limit + 1) # One extra row tells us whether another page exists
+    cursor.execute(f"""
+        SELECT el.id, el.log_date, e.name, el.sets, el.reps, el.weight, el.duration_minutes, el.calories_burned, el.notes
+        FROM exercise_logs el
+        JOIN exercises e ON el.exercise_id = e.id
+        WHERE el.user_id = ? {after_cursor}
+        ORDER BY el.log_date DESC, el.id DESC
+        LIMIT ?
+    """, params)
+    rows = cursor.fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = (rows[-1][1], rows[-1][0])
+    return [row[1:] for row in rows], next_cursor
+
+# Per-row insert triggers of exercise_logs; resume_log_insert_triggers() does the work of each
+_LOG_INSERT_TRIGGERS = ("trg_exercise_logs_rollup_insert", "trg_exercise_logs_rep_max_insert",
+                        "trg_exercise_logs_version_insert", "trg_exercise_logs_fts_insert")
+
+def suspend_log_insert_triggers(conn):
+    """
+    Drops the per-row AFTER INSERT triggers of exercise_logs (rollups, rep maxes, user log
+    versions, notes index) inside the caller's open write transaction, for bulk inserts. Returns the
+    state resume_log_insert_triggers() needs to catch up and recreate them in the same
+    transaction, so other connections never see the table without its triggers, and a
+    rollback restores them.
+    """
+    triggers = conn.execute(f"""
+        SELECT name, sql FROM sqlite_master
+        WHERE type = 'trigger' AND name IN ({", ".join("?" * len(_LOG_INSERT_TRIGGERS))})
+    """, _LOG_INSERT_TRIGGERS).fetchall()
+    for name, _sql in triggers:
+        conn.execute(f"DROP TRIGGER {name}")
+    last_id = conn.execute("SELECT coalesce(max(id), 0) FROM exercise_logs").fetchone()[0]
+    return triggers, last_id
+
+def resume_log_insert_triggers(conn, state):
+    """
+    Applies what the suspended triggers would have done for every log inserted since
+    suspend_log_insert_triggers(), with one set-based statement per trigger, and recreates
+    the triggers. Does not commit.
+    """
+    triggers, last_id = state
+    conn.execute(_ROLLUP_APPLY_NEW_SQL, (last_id,))
+    conn.execute(_REP_MAX_APPLY_NEW_SQL, (last_id,))
+    conn.execute("""
+        INSERT INTO user_log_versions (user_id, version)
+        SELECT user_id, 1 FROM exercise_logs WHERE id > ? GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE SET version = version + 1
+    """, (last_id,))
+    conn.execute("""
+        INSERT INTO exercise_logs_fts (rowid, notes, user_id)
+        SELECT id, notes, user_id FROM exercise_logs WHERE id > ?
+    """, (last_id,))
+    for _name, sql in triggers:
+        conn.execute(sql)
+
+def rebuild_rollups():
+    """Recomputes every rollup bucket and rep max from exercise_logs, e.g. after bulk edits made with triggers off."""
+    conn = connect_db()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        for statement in _ROLLUP_REBUILD_SQL + _REP_MAX_REBUILD_SQL:
+            conn.execute(statement)
+        conn.commit()
+        return True
+    except Exception as e:
+        print(f"Error rebuilding rollups: {e}")
+        conn.rollback()
+        return False
+
+def get_user_log_version(user_id):
+    """Returns a counter that changes whenever any of the user's exercise logs is written."""
+    conn = connect_db()
+    cursor = conn.cursor()
+    cursor.execute("SELECT version FROM user_log_versions WHERE user_id = ?", (user_id,))
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+def _fts_query(text):
+    """
+    Turns free text into an FTS5 query that matches every word, the last one as a prefix
+    so results update while typing. Returns None if the text has no words. Quoting each
+    word keeps FTS5 operators and punctuation in user input from being interpreted.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words) + "*"
+
+def search_exercises(query, limit=20, offset=0):
+    """
+    Full-text search over exercise names and descriptions, best matches first.
+    Returns (exercises, next_offset); next_offset is None on the last page.
+    """
+    match = _fts_query(query)
+    if match is None:
+        return [], None
+    conn = connect_db()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT rowid FROM exercises_fts
+        WHERE exercises_fts MATCH ?
+        ORDER BY rank
+        LIMIT ? OFFSET ?
+    """, (match, limit + 1, offset))
+    ids = [row[0] for row in cursor.fetchall()]
+    # Records come from the catalog cache, so the search only reads the index
+    exercises = [ex for ex in map(get_exercise_by_id, ids[:limit]) if ex is not None]
+    return exercises, offset + limit if len(ids) > limit else None
+
+def search_exercise_logs(user_id, query, limit=20, offset=0):
+    """
+    Full-text search over the notes of a user's exercise logs, best matches first.
+    Rows are (log_id, log_date, exercise_name, snippet) with matches in the snippet
+    wrapped in [brackets]. Returns (rows, next_offset); next_offset is None on the last page.
+    """
+    match = _fts_query(query)
+    if match is None:
+        return [], None
+    conn = connect_db()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT el.id, el.log_date, e.name, snippet(exercise_logs_fts, 0, '[', ']', '...', 12)
+        FROM exercise_logs_fts
+        JOIN exercise_logs el ON el.id = exercise_logs_fts.rowid
+        JOIN exercises e ON e.id = el.exercise_id
+        WHERE exercise_logs_fts MATCH ?
+        ORDER BY rank
+        LIMIT ? OFFSET ?
+    """, (f'user_id : "{int(user_id)}" AND notes : ({match})', limit + 1, offset))
+    rows = cursor.fetchall()
+    return rows[:limit], offset + limit if len(rows) > limit else None
+
+def _check_period(period):
+    if period not in ROLLUP_PERIODS:
+        raise ValueError(f"Unknown rollup period '{period}', expected one of {', '.join(ROLLUP_PERIODS)}.")
+
+def get_exercise_trend(user_id, exercise_id, period="week", start_date=None, end_date=None):
+    """
+    Retrieves a user's per-bucket totals for one exercise from the rollup table, oldest first.
+    Rows are (period_start, log_count, total_sets, total_reps, total_volume, avg_weight,
+    total_duration_minutes, total_calories). Cost grows with the number of buckets, not logs.
+    """
+    _check_period(period)
+    conn = connect_db()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT period_start, log_count, total_sets, total_reps, total_volume,
+               CASE WHEN weighted_logs > 0 THEN total_weight / weighted_logs END,
+               total_duration_minutes, total_calories
+        FROM exercise_log_rollups
+        WHERE user_id = ? AND exercise_id = ? AND period = ?
+          AND period_start >= coalesce(?, '') AND period_start <= coalesce(?, '9999-12-31')
+        ORDER BY period_start
+    """, (user_id, exercise_id, period, start_date, end_date))
+    return cursor.fetchall()
+
+def get_user_trend(user_id, period="week", start_date=None, end_date=None):
+    """
+    Retrieves a user's per-bucket totals across all exercises from the rollup table, oldest first.
+    Rows are (period_start, log_count, total_sets, total_reps, total_volume,
+    total_duration_minutes, total_calories).
+    """
+    _check_period(period)
+    conn = connect_db()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT period_start, sum(log_count), sum(total_sets), sum(total_reps), sum(total_volume),
+               sum(total_duration_minutes), sum(total_calories)
+        FROM exercise_log_rollups
+        WHERE user_id = ? AND period = ?
+          AND period_start >= coalesce(?, '') AND period_start <= coalesce(?, '9999-12-31')
+        GROUP BY period_start
+        ORDER BY period_start
+    """, (user_id, period, start_date, end_date))
+    return cursor.fetchall()
+
+def get_user_daily_totals(user_id):
+    """
+    Retrieves a user's totals per training day across all exercises, oldest first, read from
+    the rollup index alone. Rows are (day as days since 1970-01-01, log_count, total_volume,
+    total_calories).
+    """
+    conn = connect_db()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT CAST(julianday(period_start) - 2440587.5 AS INTEGER), sum(log_count), sum(total_volume),
+               sum(total_calories)
+        FROM exercise_log_rollups
+        WHERE user_id = ? AND period = 'day'
+        GROUP BY period_start
+        ORDER BY period_start
+    """, (user_id,))
+    return cursor.fetchall()
+
+def get_user_rep_maxes(user_id):
+    """
+    Retrieves a user's rep maxes. Rows are (exercise_id, reps, max_weight, max_volume), with
+    reps 0 for logs without reps and max_weight None if none of the logs has a weight.
+    """
+    conn = connect_db()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT exercise_id, reps, max_weight, max_volume
+        FROM exercise_rep_maxes
+        WHERE user_id = ?
+    """, (user_id,))
+    return cursor.fetchall()
+
 if __name__ == '__main__':
     # This block runs when database.py is executed directly for setup/testing
     init_db()
     print("Database initialized.")
 
+    if "--rebuild-rollups" in sys.argv:
+        if rebuild_rollups():
+            print("Rollups rebuilt.")
+
     # Add some dummy exercises if they don't exist
     if not get_all_exercises():
-        add_exercise("Push-ups", "A common calisthenics exercise performed in a prone position by raising and lowering the body using the arms.", "images/pushup.png", "gifs/pushup.gif")
-        add_exercise("Squats", "A strength exercise in which the trainee lowers their hips from a standing position and then stands back up.", "images/squat.png", "gifs/squat.gif")
-        add_exercise("Plank", "An isometric core strength exercise that involves maintaining a position similar to a push-up for the maximum possible time.", "images/plank.png", "gifs/plank.gif")
-        add_exercise("Lunges", "A strength training exercise that works the quads, glutes, hamstrings, and calves.", "images/lunge.png", "gifs/lunge.gif")
+        add_exercise("Push-ups", "A common calisthenics exercise performed in a prone position by raising and lowering the body using the arms.", "pushup.png", "pushup.gif")
+        add_exercise("Squats", "A strength exercise in which the trainee lowers their hips from a standing position and then stands back up.", "squat.png", "squat.gif")
+        add_exercise("Plank", "An isometric core strength exercise that involves maintaining a position similar to a push-up for the maximum possible time.", "plank.png", "plank.gif")
+        add_exercise("Lunges", "A strength training exercise that works the quads, glutes, hamstrings, and calves.", "lunge.png", "lunge.gif")
         print("Dummy exercises added.")
\ No newline at end of file
@@ -0,0 +1,61 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+class DatabaseWorker:
+    """
+    Runs database calls on a background thread so the Tk mainloop never blocks on SQLite.
+    Results are handed back to the UI thread by polling with after().
+    """
+    def __init__(self, master, max_workers=1, poll_interval_ms=10):
+        self.master = master
+        self.poll_interval_ms = poll_interval_ms
+        # A single worker keeps writes and the reads that follow them in submission order
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-worker")
+        self._completed = queue.SimpleQueue() # (future, on_done, on_error) filled by worker threads
+        self._pending = 0
+        self._after_id = None
+
+    def submit(self, func, *args, on_done=None, on_error=None, **kwargs):
+        """
+        Runs func(*args, **kwargs) on the worker thread and returns its Future.
+        on_done(result) or on_error(exception) is called later on the Tk thread.
+        """
+        return self.watch(self._executor.submit(func, *args, **kwargs), on_done, on_error)
+
+    def watch(self, future, on_done=None, on_error=None):
+        """Hands the outcome of a Future from another executor to the Tk thread, like submit()."""
+        self._pending += 1
+        future.add_done_callback(lambda f: self._completed.put((f, on_done, on_error)))
+        if self._after_id is None:
+            self._after_id = self.master.after(self.poll_interval_ms, self._poll)
+        return future
+
+    def _poll(self):
+        """Delivers finished results on the Tk thread and keeps polling while calls are pending."""
+        self._after_id = None
+        while True:
+            try:
+                future, on_done, on_error = self._completed.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is not None:
+                if on_error:
+                    on_error(error)
+                else:
+                    print(f"Database worker error: {error}")
+            elif on_done:
+                on_done(future.result())
+
+        if self._pending:
+            self._after_id = self.master.after(self.poll_interval_ms, self._poll)
+
+    def shutdown(self):
+        """Stops polling and waits for in-flight database calls to finish."""
+        if self._after_id is not None:
+            self.master.after_cancel(self._after_id)
+            self._after_id = None
+        self._executor.shutdown(wait=True)
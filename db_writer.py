@@ -0,0 +1,164 @@
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+import database
+
+MAX_BATCH = 256 # Most write requests committed together
+MAX_DELAY_MS = 0 # Longest a request waits for others to join its commit
+
+_STOP = object()
+
+class DatabaseWriter:
+    """
+    Funnels writes from any number of threads through one writer thread with group commit.
+
+    The writer takes requests from a queue and runs everything queued (up to max_batch
+    requests, waiting at most max_delay_ms for more to arrive) in one transaction and one
+    commit. Each request runs in its own savepoint. A failing request is rolled back alone
+    and its error goes to its own Future; the rest of the group still commits, unless the error
+    ended the whole transaction (a full disk, for one), which fails the group. Writers never
+    contend for the SQLite lock with one another, and a burst of N writes costs one commit
+    instead of N.
+    """
+    def __init__(self, max_batch=MAX_BATCH, max_delay_ms=MAX_DELAY_MS):
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self.commits = 0 # Group transactions committed
+        self.committed = 0 # Requests committed in them
+        self._queue = queue.SimpleQueue() # (future, func, args, version, on_commit) or _STOP
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, func, *args, version=None, on_commit=None):
+        """
+        Queues func(cursor, *args) to run in the next group transaction and returns a Future
+        of its result. `version` is a (table, user_id) pair passed to bump_data_version()
+        once the write is committed, and on_commit(result) runs then too, before the Future
+        is resolved.
+        """
+        future = Future()
+        self._queue.put((future, func, args, version, on_commit))
+        return future
+
+    def add_user(self, username, password):
+        """Queues a new user; the Future gives the new user id, or IntegrityError if the name is taken."""
+        return self.submit(database.insert_user, username, password)
+
+    def add_exercise(self, name, description, image_path, gif_path):
+        """Queues a new exercise; the Future gives the new exercise id, or IntegrityError if the name is taken."""
+        def add_to_catalog(exercise_id):
+            database.add_to_exercise_catalog(database.Exercise(exercise_id, name, description, image_path, gif_path))
+        return self.submit(database.insert_exercise, name, description, image_path, gif_path,
+                           on_commit=add_to_catalog)
+
+    def log_exercise(self, user_id, exercise_id, sets, reps, weight, duration_minutes, calories_burned, notes,
+                     log_date):
+        """Queues an exercise log; the Future gives the new log id."""
+        return self.submit(database.insert_exercise_log, user_id, exercise_id, sets, reps, weight,
+                           duration_minutes, calories_burned, notes, log_date, version=("exercise_logs", user_id))
+
+    def create_workout(self, user_id, workout_name, exercise_ids):
+        """Queues a new workout; the Future gives the new workout id."""
+        return self.submit(database.insert_workout, user_id, workout_name, exercise_ids,
+                           version=("workouts", user_id))
+
+    def close(self):
+        """Commits everything queued so far and stops the writer thread."""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _next_batch(self):
+        """Blocks for a request, then gathers more until the batch is full or the delay has passed."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_delay
+        while batch[-1] is not _STOP and len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        conn = database.connect_db()
+        cursor = conn.cursor()
+        running = True
+        while running:
+            batch = self._next_batch()
+            if batch[-1] is _STOP:
+                batch.pop()
+                running = False
+            batch = [request for request in batch if request[0].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                self._commit_batch(conn, cursor, batch)
+            except Exception as e: # A bug here must not kill the thread and leave callers waiting forever
+                print(f"Database writer error: {e}")
+                try:
+                    conn.rollback()
+                except sqlite3.Error:
+                    pass
+                for future, _func, _args, _version, _on_commit in batch:
+                    if not future.done():
+                        future.set_exception(e)
+        database.close_db()
+
+    def _commit_batch(self, conn, cursor, batch):
+        """Runs a batch of requests in one transaction and settles their Futures."""
+        done = [] # (future, result, version, on_commit) of the requests that succeeded
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as e:
+            for future, _func, _args, _version, _on_commit in batch:
+                future.set_exception(e)
+            return
+        for i, (future, func, args, version, on_commit) in enumerate(batch):
+            try:
+                conn.execute("SAVEPOINT request")
+                result = func(cursor, *args)
+                conn.execute("RELEASE request")
+                done.append((future, result, version, on_commit))
+            except Exception as e:
+                try:
+                    conn.execute("ROLLBACK TO request")
+                    conn.execute("RELEASE request")
+                except sqlite3.Error:
+                    pass
+                future.set_exception(e)
+                if not conn.in_transaction:
+                    # SQLITE_FULL, IOERR, BUSY or NOMEM rolled back the whole transaction, and with
+                    # it the requests that had already succeeded. The rest get a transaction of their own.
+                    for done_future, _result, _version, _on_commit in done:
+                        done_future.set_exception(e)
+                    if i + 1 < len(batch):
+                        self._commit_batch(conn, cursor, batch[i + 1:])
+                    return
+        try:
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            for future, _result, _version, _on_commit in done:
+                future.set_exception(e)
+            return
+        self.commits += 1
+        self.committed += len(done)
+        for future, result, version, on_commit in done:
+            if version is not None:
+                database.bump_data_version(*version)
+            if on_commit is not None:
+                try:
+                    on_commit(result)
+                except Exception as e: # The write is committed either way
+                    print(f"Error after committing a write: {e}")
+            future.set_result(result)
@@ -0,0 +1,279 @@
+"""
+Command line interface for scripts and cron jobs, built on database.py and UserManager.
+
+Nothing here imports Tk, PIL or the screens, so a command costs little more than opening the
+database. Modules needed by a single command (import/export, activity files) are imported by
+that command only, and only the parser of the command being run is built. `batch` reads one
+command per line from stdin and runs them all in this process.
+
+    python -m fitness_tracker register alice --password secret
+    python -m fitness_tracker log alice Squats --sets 3 --reps 10 --weight 60
+    python -m fitness_tracker progress alice --exercise Squats --period month
+    python -m fitness_tracker batch < commands.txt
+"""
+import argparse
+import datetime
+import shlex
+import sys
+
+import database
+from user_manager import UserManager
+
+TREND_COLUMNS = ("period_start", "logs", "sets", "reps", "volume", "duration_minutes", "calories")
+EXERCISE_TREND_COLUMNS = ("period_start", "logs", "sets", "reps", "volume", "avg_weight", "duration_minutes", "calories")
+TABLES = ("exercises", "workouts", "exercise_logs")
+FORMATS = ("csv", "jsonl")
+
+# Command name -> (function, help, [(args, kwargs) for add_argument])
+COMMANDS = {}
+
+def arg(*args, **kwargs):
+    return args, kwargs
+
+def command(name, help, *arguments):
+    """Registers the decorated function as a subcommand taking `arguments`."""
+    def register(func):
+        COMMANDS[name] = (func, help, arguments)
+        return func
+    return register
+
+def iso_date(text):
+    """argparse type for YYYY-MM-DD dates."""
+    return datetime.date.fromisoformat(text).isoformat()
+
+def _user_id(username):
+    user_id = database.get_user_id(username)
+    if user_id is None:
+        print(f"Unknown user '{username}'.", file=sys.stderr)
+    return user_id
+
+def _exercise(name):
+    exercise = database.get_exercise_by_name(name)
+    if exercise is None:
+        print(f"Unknown exercise '{name}'.", file=sys.stderr)
+    return exercise
+
+def _write_rows(header, rows):
+    import csv
+    writer = csv.writer(sys.stdout, lineterminator="\n")
+    writer.writerow(header)
+    writer.writerows(rows)
+
+@command("register", "Register a user.",
+         arg("username"), arg("--password", help="prompted for if not given"))
+def cmd_register(args):
+    password = args.password
+    if password is None:
+        import getpass
+        password = getpass.getpass(f"Password for {args.username}: ")
+    return UserManager.register_user(args.username, password)
+
+@command("add-exercise", "Add an exercise to the catalog.",
+         arg("name"), arg("--description", default=""), arg("--image"), arg("--gif"))
+def cmd_add_exercise(args):
+    return database.add_exercise(args.name, args.description, args.image, args.gif)
+
+@command("exercises", "List the exercise catalog as CSV.",
+         arg("--search", help="full-text search instead of listing everything"),
+         arg("--limit", type=int, default=50, help="maximum search results"))
+def cmd_exercises(args):
+    if args.search:
+        exercises, _next_offset = database.search_exercises(args.search, limit=args.limit)
+    else:
+        exercises = database.get_all_exercises()
+    _write_rows(("id", "name", "description"), ((e.id, e.name, e.description) for e in exercises))
+    return True
+
+@command("create-workout", "Create a workout from exercise names, in order.",
+         arg("username"), arg("name"), arg("exercises", nargs="+", metavar="EXERCISE"))
+def cmd_create_workout(args):
+    user_id = _user_id(args.username)
+    exercises = [_exercise(name) for name in args.exercises]
+    if user_id is None or None in exercises:
+        return False
+    return database.create_workout(user_id, args.name, [e.id for e in exercises])
+
+@command("workouts", "List a user's workouts as CSV.", arg("username"))
+def cmd_workouts(args):
+    user_id = _user_id(args.username)
+    if user_id is None:
+        return False
+    _write_rows(("id", "name"), database.get_user_workouts(user_id))
+    return True
+
+@command("log", "Log a performed exercise.",
+         arg("username"), arg("exercise"),
+         arg("--sets", type=int), arg("--reps", type=int), arg("--weight", type=float),
+         arg("--duration", type=float, help="minutes"), arg("--calories", type=float),
+         arg("--notes", default=""), arg("--date", type=iso_date, help="YYYY-MM-DD, today by default"))
+def cmd_log(args):
+    user_id = _user_id(args.username)
+    exercise = _exercise(args.exercise)
+    if user_id is None or exercise is None:
+        return False
+    return database.log_exercise(user_id, exercise.id, args.sets, args.reps, args.weight, args.duration,
+                                 args.calories, args.notes, args.date or datetime.date.today().isoformat())
+
+@command("progress", "Dump a user's totals per period as CSV.",
+         arg("username"), arg("--exercise", help="one exercise instead of all of them"),
+         arg("--period", choices=tuple(database.ROLLUP_PERIODS), default="week"),
+         arg("--start", type=iso_date, help="first period start, YYYY-MM-DD"),
+         arg("--end", type=iso_date, help="last period start, YYYY-MM-DD"))
+def cmd_progress(args):
+    user_id = _user_id(args.username)
+    if user_id is None:
+        return False
+    if args.exercise:
+        exercise = _exercise(args.exercise)
+        if exercise is None:
+            return False
+        rows = database.get_exercise_trend(user_id, exercise.id, args.period, args.start, args.end)
+        _write_rows(EXERCISE_TREND_COLUMNS, rows)
+    else:
+        _write_rows(TREND_COLUMNS, database.get_user_trend(user_id, args.period, args.start, args.end))
+    return True
+
+@command("import", "Import a CSV or JSON Lines file, resuming an interrupted import.",
+         arg("table", choices=TABLES), arg("path"),
+         arg("--format", choices=FORMATS, help="defaults to the file extension"),
+         arg("--commit-every", type=int, default=100_000),
+         arg("--restart", action="store_true", help="ignore the checkpoint of an earlier import"))
+def cmd_import(args):
+    import data_transfer
+    result = data_transfer.import_file(args.path, args.table, args.format, commit_every=args.commit_every,
+                                       restart=args.restart)
+    if result is None:
+        return False
+    read, inserted, skipped = result
+    print(f"Imported {inserted:,} {args.table} rows from {read:,} records ({skipped:,} skipped).", file=sys.stderr)
+    return True
+
+@command("export", "Export a table to a CSV or JSON Lines file.",
+         arg("table", choices=TABLES), arg("path"),
+         arg("--format", choices=FORMATS, help="defaults to the file extension"),
+         arg("--user", help="only this user's rows"))
+def cmd_export(args):
+    import data_transfer
+    count = data_transfer.export_file(args.path, args.table, args.format, args.user)
+    if count is None:
+        return False
+    print(f"Exported {count:,} {args.table} records to '{args.path}'.", file=sys.stderr)
+    return True
+
+@command("import-activities", "Import GPX/TCX activity files or directories of them.",
+         arg("username"), arg("paths", nargs="+", metavar="PATH"),
+         arg("--workers", type=int, help="processes to parse with, one per CPU by default"),
+         arg("--exercise", help="log every file as this exercise"))
+def cmd_import_activities(args):
+    import activity_import # Loads NumPy through samples.py
+    user_id = _user_id(args.username)
+    if user_id is None:
+        return False
+    imported, skipped, failed = activity_import.import_activities(args.paths, user_id, args.exercise, args.workers)
+    print(f"Imported {imported} activities ({skipped} already imported, {failed} failed).", file=sys.stderr)
+    return not failed
+
+@command("rebuild-rollups", "Recompute the progress rollups from the exercise logs.")
+def cmd_rebuild_rollups(args):
+    return database.rebuild_rollups()
+
+@command("build-packs", "Build the asset packs of every exercise image and GIF that lacks an up-to-date one.")
+def cmd_build_packs(args):
+    import asset_packs # Loads PIL to resize the frames
+    built = failed = 0
+    for exercise in database.get_all_exercises():
+        for asset_path in (exercise.image_path, exercise.gif_path):
+            if not asset_path or asset_packs.find_pack(asset_path) is not None:
+                continue
+            if asset_packs.find_pack(asset_path, build=True) is not None:
+                built += 1
+            else:
+                failed += 1
+    print(f"Built {built} asset pack(s) ({failed} failed).", file=sys.stderr)
+    return not failed
+
+@command("serve", "Serve the HTTP/JSON API (see api_server.py) until interrupted.",
+         arg("--host", default="127.0.0.1"), arg("--port", type=int, default=8080),
+         arg("--pool", type=int, help="database connections (executor threads)"))
+def cmd_serve(args):
+    import api_server
+    argv = ["--host", args.host, "--port", str(args.port), "--db", database.DATABASE_NAME]
+    if args.pool:
+        argv += ["--pool", str(args.pool)]
+    database.close_db() # The server opens its own connections on its pool threads
+    return api_server.main(argv) == 0
+
+@command("batch", "Run commands read from stdin, one per line ('#' starts a comment).",
+         arg("--stop-on-error", action="store_true"))
+def cmd_batch(args):
+    failed = 0
+    for line_num, line in enumerate(sys.stdin, 1):
+        try:
+            argv = shlex.split(line, comments=True)
+        except ValueError as e:
+            print(f"line {line_num}: {e}", file=sys.stderr)
+            failed += 1
+            continue
+        if not argv:
+            continue
+        if argv[0] == "batch":
+            print(f"line {line_num}: batch cannot be nested", file=sys.stderr)
+            status = 1
+        else:
+            status = run(argv)
+        if status != 0:
+            print(f"line {line_num}: failed: {line.strip()}", file=sys.stderr)
+            failed += 1
+            if args.stop_on_error:
+                break
+    return not failed
+
+def _command_name(argv):
+    """The subcommand in `argv`, skipping the global options before it, or None."""
+    i = 0
+    while i < len(argv) and argv[i].startswith("-"):
+        i += 2 if argv[i] == "--db" else 1
+    return argv[i] if i < len(argv) and argv[i] in COMMANDS else None
+
+def build_parser(only=None):
+    """Builds the argument parser, with just the `only` subcommand if given (every one otherwise)."""
+    parser = argparse.ArgumentParser(prog="fitness_tracker", description="Fitness tracker command line interface.")
+    parser.add_argument("--db", help=f"database file (default: {database.DATABASE_NAME})")
+    subparsers = parser.add_subparsers(dest="command", required=True, metavar="COMMAND")
+    for name, (func, help, arguments) in COMMANDS.items():
+        if only is not None and name != only:
+            continue
+        sub = subparsers.add_parser(name, help=help, description=help)
+        sub.set_defaults(func=func)
+        for args, kwargs in arguments:
+            sub.add_argument(*args, **kwargs)
+    return parser
+
+_parsers = {} # Subcommand (None for all of them) -> parser, reused by batch
+_initialized_db = None
+
+def run(argv):
+    """Runs one command line and returns its exit status."""
+    global _initialized_db
+    name = _command_name(argv)
+    if name not in _parsers:
+        _parsers[name] = build_parser(name)
+    try:
+        args = _parsers[name].parse_args(argv)
+    except SystemExit as e: # --help, or bad arguments after argparse has printed the usage
+        return e.code
+    if args.db:
+        database.DATABASE_NAME = args.db
+    if _initialized_db != database.DATABASE_NAME:
+        database.init_db()
+        _initialized_db = database.DATABASE_NAME
+    return 0 if args.func(args) else 1
+
+def main(argv=None):
+    try:
+        return run(sys.argv[1:] if argv is None else argv)
+    finally:
+        database.close_db()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import ImageTk
+
+from asset_packs import find_pack
+from image_cache import frame_cache, frame_duration, image_nbytes, estimate_nbytes, FrameRing, stream_frames
+
+class FrameRequest:
+    """Handle for one asynchronous frame load. cancel() stops decoding and delivery."""
+    def __init__(self, on_frame, on_done, on_error, on_stream):
+        self.on_frame = on_frame
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_stream = on_stream
+        self.cancelled = False
+        self.frame_count = 0
+        self.ring = None # Set when the animation is streamed instead of preloaded
+        self.nbytes = 0 # Decoded frame data currently held for this request
+        self.peak_bytes = 0
+
+    def cancel(self):
+        self.cancelled = True
+
+    def _track(self, nbytes):
+        self.nbytes = nbytes
+        self.peak_bytes = max(self.peak_bytes, nbytes)
+
+    def next_frame(self):
+        """
+        Streaming mode: takes the next frame from the ring on the Tk thread.
+        Returns (photo, duration_ms), or None if the decoder has not caught up yet.
+        Only the returned PhotoImage and the frames still in the ring are kept alive.
+        """
+        frame = self.ring.get_nowait()
+        if frame is None:
+            return None
+        photo = ImageTk.PhotoImage(frame)
+        self._track(self.ring.nbytes + 2 * image_nbytes(frame)) # Ring + current frame and its PhotoImage
+        return photo, frame_duration(frame)
+
+class AsyncFrameLoader:
+    """
+    Decodes and resizes image frames on background threads.
+    Frames are converted to PhotoImages and handed to the Tk thread one by one as
+    they are decoded, so playback can start on frame 0. Neighbouring assets can be
+    prefetched into the shared frame cache on a separate, lower priority thread, which
+    also builds the asset pack of anything that had to be decoded from its source.
+    """
+    FRAMES_PER_POLL = 4 # Caps the PhotoImage conversions done per Tk callback
+
+    def __init__(self, master, cache=frame_cache, poll_interval_ms=15, preload_max_bytes=None, ring_frames=8):
+        self.master = master
+        self.cache = cache
+        self.poll_interval_ms = poll_interval_ms
+        # Animations larger than this are streamed through a ring of `ring_frames` frames
+        self.preload_max_bytes = preload_max_bytes
+        self.ring_frames = ring_frames
+        # Separate threads so queued prefetches never delay what the user is looking at
+        self._foreground = ThreadPoolExecutor(max_workers=1, thread_name_prefix="frame-decoder")
+        self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="frame-prefetch")
+        self._prefetches = []
+        self._pack_builds = set() # (path, size) already queued; only touched by the decoder thread
+        self._events = queue.SimpleQueue() # (request, kind, payload) from decoder threads
+        self._active = 0
+        self._after_id = None
+
+    def load(self, path, size, on_frame, on_done=None, on_error=None, on_stream=None):
+        """
+        Loads the frames of `path` at `size` in the background.
+        on_frame(photo, index, duration_ms) is called on the Tk thread for each frame, then on_done(),
+        or on_error(exception) if the file cannot be read. Returns a FrameRequest.
+
+        If on_stream is given and the whole animation would exceed preload_max_bytes, the
+        frames are not preloaded: on_stream(request.next_frame) is called instead and the
+        caller pulls frames one at a time while a decoder thread refills a bounded ring.
+        """
+        request = FrameRequest(on_frame, on_done, on_error, on_stream)
+        self._active += 1
+        self._foreground.submit(self._decode, request, path, size)
+        self._schedule_poll(self.poll_interval_ms)
+        return request
+
+    def prefetch(self, path, size):
+        """Decodes `path` into the frame cache in the background without displaying it."""
+        if path:
+            self._prefetches.append(self._background.submit(self._prefetch, path, size))
+
+    def cancel_prefetches(self):
+        """Drops prefetches that have not started yet."""
+        for future in self._prefetches:
+            future.cancel()
+        self._prefetches = []
+
+    def _build_pack_later(self, path, size):
+        """Queues a pack build for an asset just shown from its source file, behind any prefetches."""
+        key = (path, tuple(size))
+        if key in self._pack_builds or find_pack(path, size) is not None:
+            return
+        self._pack_builds.add(key)
+        self._background.submit(find_pack, path, size, build=True)
+
+    def _too_big_to_preload(self, path, size):
+        return self.preload_max_bytes is not None and estimate_nbytes(path, size) > self.preload_max_bytes
+
+    def _prefetch(self, path, size):
+        try:
+            if not self._too_big_to_preload(path, size):
+                self.cache.get(path, size)
+        except Exception:
+            pass # A missing or broken asset is reported when it is actually shown
+
+    def _decode(self, request, path, size):
+        """Runs on the decoder thread and queues each frame for the Tk thread."""
+        try:
+            if not path:
+                raise FileNotFoundError(path)
+            if request.on_stream and self._too_big_to_preload(path, size):
+                request.ring = FrameRing(self.ring_frames)
+                # A dedicated thread, since the stream lives for as long as the animation plays
+                threading.Thread(target=self._stream, args=(request, path, size),
+                                 name="frame-stream", daemon=True).start()
+                self._events.put((request, "stream", None))
+            else:
+                self.cache.get(path, size,
+                               on_frame=lambda frame: self._events.put((request, "frame", frame)),
+                               cancelled=lambda: request.cancelled)
+                self._events.put((request, "done", None))
+        except Exception as e:
+            self._events.put((request, "error", e))
+            return
+        self._build_pack_later(path, size)
+
+    def _stream(self, request, path, size):
+        try:
+            stream_frames(path, size, request.ring, lambda: request.cancelled)
+        except Exception as e:
+            print(f"Error streaming {path}: {e}")
+
+    def _schedule_poll(self, delay_ms):
+        if self._after_id is None:
+            self._after_id = self.master.after(delay_ms, self._poll)
+
+    def _poll(self):
+        """Delivers decoded frames on the Tk thread, a few at a time to keep frames short."""
+        self._after_id = None
+        converted = 0
+        while converted < self.FRAMES_PER_POLL:
+            try:
+                request, kind, payload = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if kind != "frame":
+                self._active -= 1
+            if request.cancelled:
+                continue
+            if kind == "frame":
+                photo = ImageTk.PhotoImage(payload)
+                converted += 1
+                request.on_frame(photo, request.frame_count, frame_duration(payload))
+                request.frame_count += 1
+                request._track(request.nbytes + 2 * image_nbytes(payload)) # Cached frame + PhotoImage
+            elif kind == "stream":
+                request.on_stream(request.next_frame)
+            elif kind == "done":
+                if request.on_done:
+                    request.on_done()
+            elif request.on_error:
+                request.on_error(payload)
+
+        if self._active:
+            # Come back immediately while frames are still queued
+            self._schedule_poll(1 if converted == self.FRAMES_PER_POLL else self.poll_interval_ms)
+
+    def shutdown(self):
+        """Stops delivery and background decoding."""
+        if self._after_id is not None:
+            self.master.after_cancel(self._after_id)
+            self._after_id = None
+        self.cancel_prefetches()
+        self._foreground.shutdown(wait=False, cancel_futures=True)
+        self._background.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,217 @@
+import os
+import threading
+from collections import OrderedDict, deque
+
+from PIL import Image, ImageSequence
+
+from asset_packs import find_pack, resolve_asset
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024 # Memory budget for decoded frames (64 MiB)
+
+def image_nbytes(img):
+    """Approximate memory held by a decoded PIL image."""
+    return img.width * img.height * len(img.getbands())
+
+def frame_duration(frame):
+    """Display time of a decoded frame in milliseconds, or None if the file does not say."""
+    return frame.info.get("duration")
+
+def _resized_frames(img, size):
+    """Yields the frames of an open image resized to `size`, keeping each frame's GIF delay."""
+    for frame in ImageSequence.Iterator(img):
+        duration = frame.info.get("duration")
+        # Palette frames are converted so LANCZOS can resample them
+        frame = frame.convert("RGBA") if frame.mode in ("P", "1") else frame.copy()
+        frame = frame.resize(size, Image.LANCZOS)
+        frame.info["duration"] = duration
+        yield frame
+
+def iter_frames(path, size):
+    """
+    Decodes the frames of an image or GIF one at a time, resized to `size`.
+    Each frame's own GIF delay is kept in frame.info["duration"]. Frames come from the
+    prebuilt asset pack when there is one, so no resampling happens at runtime.
+    """
+    pack = find_pack(path, size)
+    if pack is not None:
+        yield from pack.iter_frames(size)
+        return
+    yield from decode_frames(path, size)
+
+def decode_frames(path, size):
+    """Like iter_frames, but always decodes and resizes the source file itself."""
+    with Image.open(resolve_asset(path)) as img:
+        yield from _resized_frames(img, size)
+
+def load_frames(path, size):
+    """Decodes every frame of an image or GIF and resizes it to `size`."""
+    return list(iter_frames(path, size))
+
+def estimate_nbytes(path, size):
+    """Memory needed to hold every frame of `path` decoded at `size`, without decoding pixels."""
+    pack = find_pack(path, size)
+    if pack is not None:
+        frame_count = pack.frame_count(size)
+    else:
+        with Image.open(resolve_asset(path)) as img:
+            frame_count = getattr(img, "n_frames", 1)
+    return frame_count * size[0] * size[1] * 4 # Frames are held as RGB(A)
+
+class FrameRing:
+    """
+    Fixed-capacity ring buffer of decoded frames between a decoder thread and the Tk thread.
+    The producer blocks while the ring is full, so memory stays bounded by `capacity` frames.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._frames = deque()
+        self._ready = threading.Condition()
+        self.nbytes = 0
+        self.peak_bytes = 0
+
+    def put(self, frame, cancelled):
+        """Adds a frame, waiting for space. Returns False if cancelled() became true meanwhile."""
+        with self._ready:
+            while len(self._frames) >= self.capacity:
+                if cancelled():
+                    return False
+                self._ready.wait(0.1)
+            self._frames.append(frame)
+            self.nbytes += image_nbytes(frame)
+            self.peak_bytes = max(self.peak_bytes, self.nbytes)
+            return True
+
+    def get_nowait(self):
+        """Removes and returns the oldest frame, or None if the decoder has not caught up."""
+        with self._ready:
+            if not self._frames:
+                return None
+            frame = self._frames.popleft()
+            self.nbytes -= image_nbytes(frame)
+            self._ready.notify()
+            return frame
+
+def stream_frames(path, size, ring, cancelled):
+    """
+    Decodes `path` on demand into `ring`, looping over the animation until cancelled().
+    The file stays open, so only the frames being played are ever decoded and held.
+    """
+    pack = find_pack(path, size)
+    if pack is not None:
+        while not cancelled():
+            for frame in pack.iter_frames(size):
+                if not ring.put(frame, cancelled):
+                    return
+        return
+    with Image.open(resolve_asset(path)) as img:
+        while not cancelled():
+            for frame in _resized_frames(img, size):
+                if not ring.put(frame, cancelled):
+                    return
+
+class FrameCache:
+    """
+    LRU cache of decoded, resized image frames.
+    Entries are keyed by (path, mtime, file size, display size), so an edited file
+    is decoded again. Least recently used entries are evicted to stay within max_bytes.
+    """
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # key -> (frames, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._inflight = {} # key -> Event set when the thread decoding it finishes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _key(self, path, size):
+        pack = find_pack(path, size)
+        path = pack.path if pack is not None else resolve_asset(path)
+        st = os.stat(path) # Raises FileNotFoundError for missing assets
+        return (path, st.st_mtime_ns, st.st_size, tuple(size))
+
+    def get(self, path, size, on_frame=None, cancelled=None):
+        """
+        Returns the list of frames of `path` resized to `size`, decoding them on a miss.
+        on_frame(frame) is called for each frame as soon as it is available, so callers
+        can show the first frame before the rest are decoded. If `cancelled()` becomes
+        true mid-decode, decoding stops and None is returned. Concurrent calls for the
+        same key wait for a single decode instead of repeating it.
+        """
+        key = self._key(path, size)
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    frames = entry[0]
+                    break
+                pending = self._inflight.get(key)
+                if pending is None:
+                    self.misses += 1
+                    self._inflight[key] = threading.Event()
+            if pending is None:
+                return self._decode(key, path, size, on_frame, cancelled)
+            pending.wait()
+
+        if on_frame:
+            for frame in frames:
+                on_frame(frame)
+        return frames
+
+    def _decode(self, key, path, size, on_frame, cancelled):
+        """Decodes `path` for a key this thread has claimed and caches the result."""
+        try:
+            frames = []
+            for frame in iter_frames(path, size):
+                if cancelled and cancelled():
+                    return None
+                frames.append(frame)
+                if on_frame:
+                    on_frame(frame)
+            self.put(key, frames)
+            return frames
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+
+    def put(self, key, frames):
+        """Stores decoded frames under `key`, evicting old entries to stay within budget."""
+        nbytes = sum(image_nbytes(frame) for frame in frames)
+        if nbytes > self.max_bytes:
+            return # Too big to cache without evicting everything else
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (frames, nbytes)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                _key, (_frames, evicted_bytes) = self._entries.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self.evictions += 1
+
+    def clear(self):
+        """Drops every cached entry. Statistics are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Returns hit/miss counters and current memory use."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+# Process-wide cache shared by the screens
+frame_cache = FrameCache()
@@ -1,63 +1,89 @@
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import messagebox
-import os
 
 import database
+from charts import ChartService
+from db_worker import DatabaseWorker
 from screens import LoginScreen, HomeScreen, ExerciseBrowserScreen, WorkoutCreatorScreen, LogWorkoutScreen, ProgressTrackingScreen
 from user_manager import UserManager # Import UserManager to check login state for screen transitions
 
+def prepare_database():
+    """Migrates the database and adds the default exercises on first run."""
+    # Initialize database (create tables and dummy data if needed)
+    database.init_db()
+
+    # Add initial exercises if database is empty (for first run). Asset paths are relative
+    # to the application directory; their packs are built after they are first shown
+    # (or ahead of time with `python -m fitness_tracker build-packs`).
+    if not database.get_all_exercises():
+        database.add_exercise("Push-ups", "A common calisthenics exercise performed in a prone position by raising and lowering the body using the arms.", "pushup.png", "pushup.gif")
+        database.add_exercise("Squats", "A strength exercise in which the trainee lowers their hips from a standing position and then stands back up.", "squat.png", "squat.gif")
+        database.add_exercise("Plank", "An isometric core strength exercise that involves maintaining a position similar to a push-up for the maximum possible time.", "plank.png", "plank.gif")
+        database.add_exercise("Lunges", "A strength training exercise that works the quads, glutes, hamstrings, and calves.", "lunge.png", "lunge.gif")
+        print("Default exercises populated.")
+
 class FitnessApp(tk.Tk):
+    # Screens are built the first time they are shown, so startup only pays for the login screen
+    SCREEN_CLASSES = {
+        "login": LoginScreen,
+        "home": HomeScreen,
+        "exercise_browser": ExerciseBrowserScreen,
+        "workout_creator": WorkoutCreatorScreen,
+        "log_workout": LogWorkoutScreen,
+        "progress_tracking": ProgressTrackingScreen,
+    }
+
     def __init__(self):
         super().__init__()
         self.title("Fitness Tracker App")
         self.geometry("900x700")
         self.minsize(700, 600) # Minimum window size
 
-        # Initialize database (create tables and dummy data if needed)
-        database.init_db()
-
-        # Ensure image and gif directories exist
-        if not os.path.exists('images'):
-            os.makedirs('images')
-        if not os.path.exists('gifs'):
-            os.makedirs('gifs')
-
-        # Add initial exercises if database is empty (for first run)
-        if not database.get_all_exercises():
-            database.add_exercise("Push-ups", "A common calisthenics exercise performed in a prone position by raising and lowering the body using the arms.", "images/pushup.png", "gifs/pushup.gif")
-            database.add_exercise("Squats", "A strength exercise in which the trainee lowers their hips from a standing position and then stands back up.", "images/squat.png", "gifs/squat.gif")
-            database.add_exercise("Plank", "An isometric core strength exercise that involves maintaining a position similar to a push-up for the maximum possible time.", "images/plank.png", "gifs/plank.gif")
-            database.add_exercise("Lunges", "A strength training exercise that works the quads, glutes, hamstrings, and calves.", "images/lunge.png", "gifs/lunge.gif")
-            print("Default exercises populated.")
+        # Runs database calls off the Tk thread; screens submit through BaseScreen.run_query
+        self.db_worker = DatabaseWorker(self)
+        # Renders progress charts on its own thread and caches them as PNG files
+        self.chart_service = ChartService()
+        # Summarizes workout history for the progress screen without occupying the db worker
+        self.analytics_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analytics")
 
+        # Migration and seeding run on the worker while the login screen comes up. The worker
+        # runs calls in submission order, so every query the screens make waits for them.
+        self.db_worker.submit(prepare_database, on_error=self.on_database_error)
 
         self.current_screen = None
-
-        self.screens = {
-            "login": LoginScreen(self, self),
-            "home": HomeScreen(self, self),
-            "exercise_browser": ExerciseBrowserScreen(self, self),
-            "workout_creator": WorkoutCreatorScreen(self, self),
-            "log_workout": LogWorkoutScreen(self, self),
-            "progress_tracking": ProgressTrackingScreen(self, self),
-        }
+        self.screens = {}
 
         # Start with the login screen
         self.show_screen("login")
 
+    def on_database_error(self, error):
+        messagebox.showerror("Error", f"Could not open the database: {error}")
+
+    def get_screen(self, screen_name):
+        """Returns the named screen, building it on first use, or None if there is no such screen."""
+        screen = self.screens.get(screen_name)
+        if screen is None and screen_name in self.SCREEN_CLASSES:
+            screen = self.screens[screen_name] = self.SCREEN_CLASSES[screen_name](self, self)
+        return screen
+
     def show_screen(self, screen_name):
         """Hides the current screen and shows the new one."""
         if self.current_screen:
             self.current_screen.hide()
 
-        screen_to_show = self.screens.get(screen_name)
+        screen_to_show = self.get_screen(screen_name)
         if screen_to_show:
             self.current_screen = screen_to_show
-            self.current_screen.refresh() # Refresh content when showing
+            self.current_screen.refresh_if_stale() # Reload content only if its data changed
             self.current_screen.show()
         else:
             messagebox.showerror("Error", f"Screen '{screen_name}' not found.")
 
 if __name__ == "__main__":
     app = FitnessApp()
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
+    app.chart_service.shutdown()
+    app.analytics_executor.shutdown(wait=True, cancel_futures=True)
+    app.db_worker.shutdown()
+    database.close_db()
\ No newline at end of file
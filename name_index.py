@@ -0,0 +1,109 @@
+from collections import defaultdict
+
+class NameIndex:
+    """
+    In-memory type-ahead index over a sequence of items sorted by name, such as the
+    exercise catalog. Every 1..GRAM_SIZE character substring of each lowercased name
+    maps to the positions of the items containing it, so short queries are a single
+    dict lookup and longer ones intersect a few posting lists before checking the
+    remaining candidates. Results list prefix matches first, then other substring
+    matches, each group in the original (name) order.
+    """
+    GRAM_SIZE = 3
+
+    def __init__(self, items, name=lambda item: item[1]):
+        self.items = tuple(items)
+        self.positions = {item: i for i, item in enumerate(self.items)}
+        self._names = [name(item).lower() for item in self.items]
+        self._grams = defaultdict(list) # substring -> ascending item positions
+        for i, text in enumerate(self._names):
+            grams = {text[start:start + size]
+                     for size in range(1, self.GRAM_SIZE + 1)
+                     for start in range(len(text) - size + 1)}
+            for gram in grams:
+                self._grams[gram].append(i)
+
+    def search(self, query):
+        """Returns the positions of the items whose name contains `query`, best matches first."""
+        query = query.strip().lower()
+        if not query:
+            return list(range(len(self.items)))
+        if len(query) <= self.GRAM_SIZE:
+            candidates = self._grams.get(query, [])
+        else:
+            postings = sorted((self._grams.get(query[i:i + self.GRAM_SIZE], [])
+                               for i in range(len(query) - self.GRAM_SIZE + 1)), key=len)
+            common = set(postings[0]).intersection(*postings[1:])
+            candidates = sorted(i for i in common if query in self._names[i])
+        prefix = [i for i in candidates if self._names[i].startswith(query)]
+        if len(prefix) == len(candidates):
+            return prefix
+        return prefix + [i for i in candidates if not self._names[i].startswith(query)]
+
+class ResultRows:
+    """
+    The rows of a list widget showing search() results, with some results hidden (e.g.
+    items already picked). A Fenwick tree counts the shown results, so mapping a row to
+    its item and hiding or showing one item take O(log n), and nothing is shifted.
+    """
+    def __init__(self, results, shown=lambda position: True):
+        self._results = results # Item positions in result order
+        self._slots = {position: slot for slot, position in enumerate(results)}
+        self._shown = bytearray(1 if shown(position) else 0 for position in results)
+        self._tree = [0] + list(self._shown) # 1-based; built in place in O(n)
+        for i in range(1, len(self._tree)):
+            parent = i + (i & -i)
+            if parent < len(self._tree):
+                self._tree[parent] += self._tree[i]
+        self._count = sum(self._shown)
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        """Item positions of the rows, top to bottom."""
+        return (position for slot, position in enumerate(self._results) if self._shown[slot])
+
+    def _add(self, slot, delta):
+        self._shown[slot] += delta
+        self._count += delta
+        i = slot + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _slot_of_row(self, row):
+        """Slot of the result shown on `row` (0-based), by descending the tree."""
+        slot, remaining = 0, row + 1
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            if slot + step < len(self._tree) and self._tree[slot + step] < remaining:
+                slot += step
+                remaining -= self._tree[slot]
+            step >>= 1
+        return slot # The 1-based index just before the row's result, i.e. its 0-based slot
+
+    def position(self, row):
+        """Item position shown on `row`."""
+        return self._results[self._slot_of_row(row)]
+
+    def hide(self, row):
+        """Hides the result on `row`; the rows below move up one. Returns its item position."""
+        slot = self._slot_of_row(row)
+        self._add(slot, -1)
+        return self._results[slot]
+
+    def show(self, position):
+        """
+        Shows the item at `position` again, where the results list it. Returns its row, or
+        None if it is not among the results or already shown.
+        """
+        slot = self._slots.get(position)
+        if slot is None or self._shown[slot]:
+            return None
+        row, i = 0, slot
+        while i > 0: # Shown results before the slot
+            row += self._tree[i]
+            i -= i & -i
+        self._add(slot, 1)
+        return row
@@ -0,0 +1,193 @@
+"""
+Compact storage of wearable sensor samples (heart rate, cadence, power, ...) for a logged session.
+
+Each channel of a session is stored in chunks of up to CHUNK_SAMPLES samples. A chunk keeps its
+values as a packed little-endian float32 array (the bytes of an array('f')) and its timestamps as
+the first timestamp plus either one interval, when the samples are evenly spaced, or a packed
+uint32 array('I') of millisecond deltas. An hour of 1 Hz data takes 14 KiB: 4 bytes per sample,
+or 8 when the spacing is irregular.
+
+Reads decode chunks without copying them element by element: NumPy views the BLOBs with
+frombuffer, and iter_samples() walks memoryviews for callers that do without NumPy.
+"""
+import sqlite3
+import sys
+from array import array
+
+import numpy as np
+
+import database
+
+CHUNK_SAMPLES = 3600 # An hour of 1 Hz data per chunk
+MAX_DELTA_MS = 2**32 - 1
+
+def _pack(typecode, values):
+    """Packs values into little-endian bytes of array(typecode)."""
+    packed = array(typecode, values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+def _unpack(typecode, blob):
+    """Unpacks little-endian bytes into array(typecode)."""
+    unpacked = array(typecode)
+    unpacked.frombytes(blob)
+    if sys.byteorder == "big":
+        unpacked.byteswap()
+    return unpacked
+
+def _encode_chunk(timestamps, values):
+    """Returns (chunk_start, chunk_end, interval_ms, time_deltas, sample_values) for one chunk."""
+    deltas = [b - a for a, b in zip(timestamps, timestamps[1:])]
+    if any(d < 0 or d > MAX_DELTA_MS for d in deltas):
+        raise ValueError("timestamps must be ascending, at most 49 days apart")
+    if len(set(deltas)) <= 1:
+        interval, packed_deltas = (deltas[0] if deltas else 0), None
+    else:
+        interval, packed_deltas = None, _pack("I", [0] + deltas)
+    return timestamps[0], timestamps[-1], interval, packed_deltas, _pack("f", values)
+
+def encode_chunks(timestamps, values):
+    """
+    Packs samples of one channel into chunk rows of up to CHUNK_SAMPLES samples for
+    insert_chunks(): (sample_count, chunk_start, chunk_end, interval_ms, time_deltas,
+    sample_values). `timestamps` are ascending integer milliseconds since the epoch. Raises
+    ValueError on samples that cannot be stored.
+    """
+    timestamps = [int(t) for t in timestamps]
+    values = [float(v) for v in values]
+    if len(timestamps) != len(values):
+        raise ValueError(f"{len(timestamps)} timestamps for {len(values)} values")
+    return [(len(timestamps[i:i + CHUNK_SAMPLES]),
+             *_encode_chunk(timestamps[i:i + CHUNK_SAMPLES], values[i:i + CHUNK_SAMPLES]))
+            for i in range(0, len(timestamps), CHUNK_SAMPLES)]
+
+def insert_chunks(cursor, log_id, channel, chunks):
+    """
+    Inserts chunk rows from encode_chunks() for one channel of a logged session without
+    committing. They must come after the samples already stored for the channel.
+    """
+    if not chunks:
+        return
+    last_end = cursor.execute("SELECT max(chunk_end) FROM session_samples WHERE log_id = ? AND channel = ?",
+                              (log_id, channel)).fetchone()[0]
+    if last_end is not None and chunks[0][1] <= last_end:
+        raise ValueError(f"samples must start after the stored ones, which end at {last_end}")
+    cursor.executemany("""
+        INSERT INTO session_samples
+            (log_id, channel, sample_count, chunk_start, chunk_end, interval_ms, time_deltas, sample_values)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, [(log_id, channel, *chunk) for chunk in chunks])
+
+def insert_samples(cursor, log_id, channel, timestamps, values):
+    """Inserts samples of one channel of a logged session without committing; see encode_chunks()."""
+    insert_chunks(cursor, log_id, channel, encode_chunks(timestamps, values))
+
+def add_samples(log_id, channel, timestamps, values):
+    """Appends samples of one channel to a logged session with insert_samples() and commits."""
+    conn = database.connect_db()
+    try:
+        insert_samples(conn.cursor(), log_id, channel, timestamps, values)
+        conn.commit()
+        return True
+    except (ValueError, sqlite3.Error) as e:
+        print(f"Error adding {channel} samples: {e}")
+        conn.rollback()
+        return False
+
+def _chunks(log_id, channel, start_ms, end_ms):
+    """Stored chunks of a channel that overlap [start_ms, end_ms], oldest first."""
+    return database.connect_db().execute("""
+        SELECT chunk_start, sample_count, interval_ms, time_deltas, sample_values
+        FROM session_samples
+        WHERE log_id = ? AND channel = ? AND chunk_start <= ? AND chunk_end >= ?
+        ORDER BY chunk_start
+    """, (log_id, channel, 2**63 - 1 if end_ms is None else end_ms, -2**63 if start_ms is None else start_ms))
+
+def read_samples(log_id, channel, start_ms=None, end_ms=None):
+    """
+    Returns (timestamps, values) of a channel between start_ms and end_ms inclusive as NumPy
+    arrays of int64 milliseconds and float32 values. Values read from a single chunk are a
+    read-only view of the stored BLOB.
+    """
+    times, values = [], []
+    for chunk_start, count, interval, deltas, packed in _chunks(log_id, channel, start_ms, end_ms):
+        if deltas is None:
+            times.append(chunk_start + np.arange(count, dtype=np.int64) * interval)
+        else:
+            times.append(chunk_start + np.cumsum(np.frombuffer(deltas, dtype="<u4"), dtype=np.int64))
+        values.append(np.frombuffer(packed, dtype="<f4"))
+    if not times:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    times = times[0] if len(times) == 1 else np.concatenate(times)
+    values = values[0] if len(values) == 1 else np.concatenate(values)
+    # Only the first and last chunks can reach past the range
+    first = 0 if start_ms is None else np.searchsorted(times, start_ms, side="left")
+    last = len(times) if end_ms is None else np.searchsorted(times, end_ms, side="right")
+    return times[first:last], values[first:last]
+
+def iter_samples(log_id, channel, start_ms=None, end_ms=None):
+    """Yields (timestamp, value) pairs of a channel between start_ms and end_ms without NumPy."""
+    for chunk_start, count, interval, deltas, packed in _chunks(log_id, channel, start_ms, end_ms):
+        if sys.byteorder == "little":
+            values = memoryview(packed).cast("f")
+            deltas = memoryview(deltas).cast("I") if deltas is not None else None
+        else:
+            values = _unpack("f", packed)
+            deltas = _unpack("I", deltas) if deltas is not None else None
+        timestamp = chunk_start
+        for i in range(count):
+            if i:
+                timestamp += interval if deltas is None else deltas[i]
+            if end_ms is not None and timestamp > end_ms:
+                return
+            if start_ms is None or timestamp >= start_ms:
+                yield timestamp, values[i]
+
+def downsample(timestamps, values, max_points, how="mean"):
+    """
+    Reduces samples to at most `max_points` equal-count buckets for display. Each bucket is
+    placed at its middle timestamp and its value is the mean, min or max of its samples.
+    """
+    reducers = {"mean": np.add, "min": np.minimum, "max": np.maximum}
+    if how not in reducers:
+        raise ValueError(f"Unknown downsampling '{how}', expected one of {', '.join(reducers)}.")
+    n = len(values)
+    if n <= max_points:
+        return timestamps, values
+    starts = np.linspace(0, n, max_points, endpoint=False).astype(np.int64)
+    counts = np.diff(np.append(starts, n))
+    reduced = reducers[how].reduceat(np.asarray(values, dtype=np.float64), starts)
+    if how == "mean":
+        reduced /= counts
+    return timestamps[starts + counts // 2], reduced
+
+def read_downsampled(log_id, channel, max_points=600, start_ms=None, end_ms=None, how="mean"):
+    """read_samples() reduced to at most `max_points` points with downsample()."""
+    timestamps, values = read_samples(log_id, channel, start_ms, end_ms)
+    return downsample(timestamps, values, max_points, how)
+
+def get_session_channels(log_id):
+    """Returns (channel, sample count, first timestamp, last timestamp) for each channel of a session."""
+    return database.connect_db().execute("""
+        SELECT channel, sum(sample_count), min(chunk_start), max(chunk_end)
+        FROM session_samples
+        WHERE log_id = ?
+        GROUP BY channel
+        ORDER BY channel
+    """, (log_id,)).fetchall()
+
+def delete_samples(log_id, channel=None):
+    """Deletes the samples of a session, or of one of its channels."""
+    conn = database.connect_db()
+    try:
+        if channel is None:
+            conn.execute("DELETE FROM session_samples WHERE log_id = ?", (log_id,))
+        else:
+            conn.execute("DELETE FROM session_samples WHERE log_id = ? AND channel = ?", (log_id, channel))
+        conn.commit()
+        return True
+    except sqlite3.Error as e:
+        print(f"Error deleting samples: {e}")
+        conn.rollback()
+        return False
@@ -1,12 +1,14 @@
 import tkinter as tk
 from tkinter import messagebox, scrolledtext, StringVar, Toplevel
-from PIL import Image, ImageTk, ImageSequence
-import os
 import datetime
+import math
 
+import asset_packs
+import charts
 import database
+from name_index import NameIndex, ResultRows
 from user_manager import UserManager
-from UI_elements import ScrollFrame, NotificationManager
+from UI_elements import ScrollFrame, NotificationManager, GifPlayer
 
 class BaseScreen(tk.Frame):
     """Base class for all application screens."""
@@ -14,6 +16,53 @@ class BaseScreen(tk.Frame):
         super().__init__(master)
         self.app = app_instance
         self.config(bg="#f0f0f0") # Default background
+        self._loading_count = 0
+        self._rendered_versions = None # data_versions() as of the last refresh()
+        self.loading_label = tk.Label(self, text="", font=("Arial", 12, "italic"), bg="#fff3cd", fg="#856404", padx=12, pady=6)
+
+    def show_loading(self, message="Loading..."):
+        """Shows a loading banner on top of the screen until hide_loading() is called."""
+        self._loading_count += 1
+        self.loading_label.config(text=message)
+        self.loading_label.place(relx=0.5, rely=0.0, y=8, anchor="n")
+        self.loading_label.lift()
+
+    def hide_loading(self):
+        """Removes the loading banner once every outstanding call has finished."""
+        self._loading_count = max(0, self._loading_count - 1)
+        if not self._loading_count:
+            self.loading_label.place_forget()
+
+    def run_query(self, func, *args, on_done=None, on_error=None, loading="Loading...", executor=None):
+        """
+        Runs a database call on the app's background worker, or on `executor` if given, while
+        showing a loading state. on_done(result) is called on the Tk thread once the call
+        returns, or on_error(error) after the error has been reported if it raises.
+        """
+        self.show_loading(loading)
+
+        def done(result):
+            self.hide_loading()
+            if on_done:
+                on_done(result)
+
+        def failed(error):
+            self.hide_loading()
+            self._rendered_versions = None # Retry on the next show instead of keeping a broken view
+            NotificationManager.show_notification(f"Database error: {error}", fg="red")
+            if on_error:
+                on_error(error)
+
+        if executor is not None:
+            return self.app.db_worker.watch(executor.submit(func, *args), on_done=done, on_error=failed)
+        return self.app.db_worker.submit(func, *args, on_done=done, on_error=failed)
+
+    def load_exercises(self, on_done, loading="Loading exercises..."):
+        """Passes the exercise catalog to on_done: directly once it is cached, else through the worker."""
+        if database.is_exercise_catalog_loaded():
+            on_done(database.get_all_exercises())
+        else:
+            self.run_query(database.get_all_exercises, on_done=on_done, loading=loading)
 
     def show(self):
         """Packs the screen frame."""
@@ -27,6 +76,22 @@ class BaseScreen(tk.Frame):
         """Method to refresh screen content when it becomes active. Override in subclasses."""
         pass
 
+    def data_versions(self):
+        """
+        The database.get_data_version() counters (and current user) the screen's content
+        depends on. Override in subclasses; None means the screen refreshes on every show.
+        """
+        return None
+
+    def refresh_if_stale(self):
+        """Calls refresh() unless nothing the screen shows has changed since the last one."""
+        versions = self.data_versions()
+        if versions is not None and versions == self._rendered_versions:
+            return False
+        self._rendered_versions = versions
+        self.refresh()
+        return True
+
 class LoginScreen(BaseScreen):
     def __init__(self, master, app_instance):
         super().__init__(master, app_instance)
@@ -54,7 +119,11 @@ class LoginScreen(BaseScreen):
     def login(self):
         username = self.username_entry.get()
         password = self.password_entry.get()
-        if UserManager.login_user(username, password):
+        self.run_query(UserManager.login_user, username, password,
+                       on_done=lambda ok: self.on_login_done(ok, username), loading="Logging in...")
+
+    def on_login_done(self, logged_in, username):
+        if logged_in:
             NotificationManager.show_notification(f"Welcome, {username}!", fg="green")
             self.app.show_screen("home")
         else:
@@ -66,7 +135,11 @@ class LoginScreen(BaseScreen):
         if not username or not password:
             NotificationManager.show_notification("Username and password cannot be empty.", fg="red")
             return
-        if UserManager.register_user(username, password):
+        self.run_query(UserManager.register_user, username, password,
+                       on_done=self.on_register_done, loading="Registering...")
+
+    def on_register_done(self, registered):
+        if registered:
             NotificationManager.show_notification("Registration successful! Please login.", fg="green")
             self.username_entry.delete(0, tk.END)
             self.password_entry.delete(0, tk.END)
@@ -104,21 +177,42 @@ class HomeScreen(BaseScreen):
         self.app.show_screen("login")
 
 class ExerciseBrowserScreen(BaseScreen):
+    THUMBNAIL_SIZE = asset_packs.THUMBNAIL_SIZE
+    GIF_SIZE = asset_packs.ANIMATION_SIZE
+    GIF_PRELOAD_MAX_BYTES = 16 * 1024 * 1024 # Larger animations are streamed instead of preloaded
+    GIF_RING_FRAMES = 8 # Frames buffered ahead when streaming
+    SEARCH_LIMIT = 50 # Search results browsed at a time
+
     def __init__(self, master, app_instance):
         super().__init__(master, app_instance)
 
         self.exercises = []
         self.current_exercise_index = 0
-        self.gif_frames = []
-        self._after_id = None # To manage GIF animation loop
+        # Pulls in PIL, so it is imported when this screen is first built, not at startup
+        from frame_loader import AsyncFrameLoader
+        self.frame_loader = AsyncFrameLoader(self, preload_max_bytes=self.GIF_PRELOAD_MAX_BYTES, ring_frames=self.GIF_RING_FRAMES)
+        self._frame_requests = []
+        self._gif_request = None
+        self._shown_exercise_id = None
+        self.gif_peak_bytes = {} # Exercise id -> peak decoded frame memory of its animation
 
         tk.Label(self, text="Exercise Browser", font=("Arial", 20, "bold"), bg="#f0f0f0").pack(pady=15)
 
+        # Full-text search over names and descriptions; results replace the browsed list
+        search_frame = tk.Frame(self, bg="#f0f0f0")
+        search_frame.pack(pady=5)
+        self.search_entry = tk.Entry(search_frame, font=("Arial", 12), width=30)
+        self.search_entry.pack(side="left", padx=5)
+        self.search_entry.bind("<Return>", self.search)
+        tk.Button(search_frame, text="Search", command=self.search, font=("Arial", 10), bg="#007BFF", fg="white").pack(side="left", padx=5)
+        tk.Button(search_frame, text="Show All", command=self.clear_search, font=("Arial", 10), bg="#6C757D", fg="white").pack(side="left", padx=5)
+
         self.image_label = tk.Label(self, bg="#f0f0f0")
         self.image_label.pack(pady=5)
 
         self.gif_label = tk.Label(self, bg="#f0f0f0")
         self.gif_label.pack(pady=5)
+        self.gif_player = GifPlayer(self.gif_label) # Plays each frame with its own GIF delay
 
         self.exercise_name_label = tk.Label(self, text="", font=("Arial", 16, "bold"), bg="#f0f0f0")
         self.exercise_name_label.pack(pady=5)
@@ -134,25 +228,65 @@ class ExerciseBrowserScreen(BaseScreen):
 
         tk.Button(self, text="Back to Home", command=lambda: self.app.show_screen("home"), font=("Arial", 12), bg="#6C757D", fg="white").pack(pady=10)
 
+    def data_versions(self):
+        return (database.get_data_version("exercises"),)
+
     def refresh(self):
-        self.exercises = database.get_all_exercises()
-        if self.exercises:
-            self.current_exercise_index = 0
-            self.load_exercise()
-        else:
+        self.search_entry.delete(0, tk.END)
+        self.load_exercises(self.on_exercises_loaded)
+
+    def search(self, event=None):
+        query = self.search_entry.get().strip()
+        if not query:
+            self.clear_search()
+            return
+        self.run_query(database.search_exercises, query, self.SEARCH_LIMIT,
+                       on_done=lambda result: self.on_search_results(result, query), loading="Searching exercises...")
+
+    def on_search_results(self, result, query):
+        exercises, next_offset = result
+        if not exercises:
+            NotificationManager.show_notification(f"No exercises match '{query}'.", fg="blue")
+            return
+        if next_offset is not None:
+            NotificationManager.show_notification(f"Showing the best {len(exercises)} matches for '{query}'.", fg="blue")
+        self.exercises = exercises
+        self.current_exercise_index = 0
+        self.load_exercise()
+
+    def clear_search(self):
+        self.search_entry.delete(0, tk.END)
+        self.load_exercises(self.on_exercises_loaded)
+
+    def on_exercises_loaded(self, exercises):
+        self.exercises = exercises
+        if not self.exercises:
             self.clear_display()
+            self._shown_exercise_id = None
             self.exercise_name_label.config(text="No exercises found.")
+            return
+        # Stay on the exercise being shown, without decoding it again, if it is still in the catalog
+        ids = [ex[0] for ex in self.exercises]
+        if self._shown_exercise_id in ids:
+            self.current_exercise_index = ids.index(self._shown_exercise_id)
+        else:
+            self.current_exercise_index = 0
+            self.load_exercise()
 
     def clear_display(self):
-        self.image_label.config(image='')
+        self.image_label.config(image='', text="")
         self.image_label.image = None
-        self.gif_label.config(image='')
-        self.gif_label.image = None
+        self.gif_player.stop()
+        self.gif_label.config(text="")
         self.exercise_name_label.config(text="")
         self.description_label.config(text="")
-        if hasattr(self, '_after_id') and self._after_id:
-            self.master.after_cancel(self._after_id)
-            self._after_id = None
+        # Stop delivering frames for the exercise we are leaving
+        self.record_gif_memory()
+        self._gif_request = None
+        for request in self._frame_requests:
+            request.cancel()
+        self._frame_requests = []
+        self.frame_loader.cancel_prefetches()
 
     def load_exercise(self):
         self.clear_display() # Clear previous content and stop GIF
@@ -162,79 +296,98 @@ class ExerciseBrowserScreen(BaseScreen):
 
         exercise_data = self.exercises[self.current_exercise_index]
         _id, name, description, image_path, gif_path = exercise_data
+        self._shown_exercise_id = _id
 
         self.exercise_name_label.config(text=name)
         self.description_label.config(text=description)
 
-        # Load and display static image
-        if image_path and os.path.exists(image_path):
-            try:
-                img = Image.open(image_path)
-                img = img.resize((100, 100), Image.LANCZOS)
-                self.photo_image = ImageTk.PhotoImage(img)
-                self.image_label.config(image=self.photo_image)
-            except Exception as e:
-                self.image_label.config(text=f"Error loading image: {e}")
-                self.image_label.image = None
-        else:
-            self.image_label.config(text=f"Image not found: {image_path}")
-            self.image_label.image = None
-
-        # Load and display GIF
-        if gif_path and os.path.exists(gif_path):
-            try:
-                self.gif_frames = []
-                gif_obj = Image.open(gif_path)
-                for frame in ImageSequence.Iterator(gif_obj):
-                    frame = frame.resize((300, 300), Image.LANCZOS)
-                    self.gif_frames.append(ImageTk.PhotoImage(frame))
-                self.animate_gif(0)
-            except Exception as e:
-                self.gif_label.config(text=f"Error loading GIF: {e}")
-                self.gif_label.image = None
+        # Decoding happens on background threads; frames arrive through the callbacks below
+        self.image_label.config(text="Loading image...")
+        self.gif_label.config(text="Loading animation...")
+        self._gif_request = self.frame_loader.load(
+            gif_path, self.GIF_SIZE, self.on_gif_frame, on_done=self.on_gif_loaded,
+            on_error=lambda e: self.on_asset_error(self.gif_label, "GIF", gif_path, e),
+            on_stream=self.on_gif_stream)
+        self._frame_requests = [
+            self.frame_loader.load(image_path, self.THUMBNAIL_SIZE, self.on_image_frame,
+                                   on_error=lambda e: self.on_asset_error(self.image_label, "Image", image_path, e)),
+            self._gif_request,
+        ]
+
+    def on_image_frame(self, photo, index, duration_ms):
+        if index == 0:
+            self.photo_image = photo
+            self.image_label.config(image=self.photo_image)
+
+    def on_gif_frame(self, photo, index, duration_ms):
+        self.gif_player.add_frame(photo, duration_ms) # Playback starts with the first frame
+
+    def on_gif_loaded(self):
+        self.gif_player.mark_complete()
+        self.prefetch_neighbours()
+
+    def on_gif_stream(self, next_frame):
+        # Too large to preload: play from a bounded ring that a decoder thread keeps filled
+        self.gif_player.play_stream(next_frame)
+        self.prefetch_neighbours()
+
+    def record_gif_memory(self):
+        """Stores the peak frame memory of the animation on screen under its exercise id."""
+        if self._gif_request is not None and self._shown_exercise_id is not None:
+            previous = self.gif_peak_bytes.get(self._shown_exercise_id, 0)
+            self.gif_peak_bytes[self._shown_exercise_id] = max(previous, self._gif_request.peak_bytes)
+
+    def on_asset_error(self, label, kind, path, error):
+        if isinstance(error, FileNotFoundError):
+            label.config(text=f"{kind} not found: {path}")
         else:
-            self.gif_label.config(text=f"GIF not found: {gif_path}")
-            self.gif_label.image = None
+            label.config(text=f"Error loading {kind}: {error}")
+        label.image = None
+        if label is self.gif_label:
+            self.prefetch_neighbours()
+
+    def prefetch_neighbours(self):
+        """Warms the frame cache with the assets Next and Previous would show."""
+        for offset in (1, -1):
+            _id, _name, _description, image_path, gif_path = self.exercises[self.ring_index(offset)]
+            self.frame_loader.prefetch(gif_path, self.GIF_SIZE)
+            self.frame_loader.prefetch(image_path, self.THUMBNAIL_SIZE)
 
+    def show(self):
+        super().show()
+        self.gif_player.resume()
 
-    def animate_gif(self, frame_index):
-        if not self.gif_frames:
-            return
+    def hide(self):
+        self.gif_player.pause() # No frame timers while the screen is not visible
+        super().hide()
 
-        frame = self.gif_frames[frame_index]
-        self.gif_label.config(image=frame)
-        self.gif_label.image = frame
+    def destroy(self):
+        self.frame_loader.shutdown()
+        super().destroy()
 
-        next_frame_index = (frame_index + 1) % len(self.gif_frames)
-        # You can try to get duration from GIF info if available, otherwise use a default
-        # For simplicity, using a fixed duration. A real GIF might have frame durations.
-        duration = 100 # milliseconds
-        try:
-            # Attempt to get duration from the first frame, if not, default
-            duration = Image.open(self.exercises[self.current_exercise_index][4]).info.get('duration', 100)
-        except:
-            pass # Fallback to default
-        self._after_id = self.master.after(duration, self.animate_gif, next_frame_index)
+    def ring_index(self, offset):
+        """Index of the exercise `offset` steps away, wrapping around the list."""
+        return (self.current_exercise_index + offset) % len(self.exercises)
 
     def next_exercise(self):
         if self.exercises:
-            if hasattr(self, '_after_id') and self._after_id:
-                self.master.after_cancel(self._after_id)
-            self.current_exercise_index = (self.current_exercise_index + 1) % len(self.exercises)
+            self.current_exercise_index = self.ring_index(1)
             self.load_exercise()
 
     def prev_exercise(self):
         if self.exercises:
-            if hasattr(self, '_after_id') and self._after_id:
-                self.master.after_cancel(self._after_id)
-            self.current_exercise_index = (self.current_exercise_index - 1 + len(self.exercises)) % len(self.exercises)
+            self.current_exercise_index = self.ring_index(-1)
             self.load_exercise()
 
 class WorkoutCreatorScreen(BaseScreen):
     def __init__(self, master, app_instance):
         super().__init__(master, app_instance)
         self.available_exercises = []
+        self.search_index = NameIndex([])
+        self._shown = ResultRows([]) # Catalog positions of the rows in available_listbox
         self.selected_exercises = []
+        self._selected_ids = set()
+        self._form_user_id = None # User the half-built workout belongs to
 
         tk.Label(self, text="Create New Workout", font=("Arial", 20, "bold"), bg="#f0f0f0").pack(pady=15)
 
@@ -245,62 +398,101 @@ class WorkoutCreatorScreen(BaseScreen):
         selection_frame = tk.Frame(self, bg="#f0f0f0")
         selection_frame.pack(fill="x", expand=True, padx=20, pady=10)
 
-        # Available Exercises Listbox
+        # Available Exercises Listbox, filtered by the type-ahead search box
         tk.Label(selection_frame, text="Available Exercises:", font=("Arial", 12, "bold"), bg="#f0f0f0").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.search_var = StringVar()
+        search_entry = tk.Entry(selection_frame, textvariable=self.search_var, font=("Arial", 12))
+        search_entry.grid(row=1, column=0, padx=5, sticky="ew")
+        search_entry.bind("<Return>", self.add_first_match)
+        self.search_var.trace_add("write", lambda *_args: self.show_available())
         self.available_listbox = tk.Listbox(selection_frame, selectmode="single", height=10, font=("Arial", 12))
-        self.available_listbox.grid(row=1, column=0, padx=5, pady=5, sticky="nsew")
+        self.available_listbox.grid(row=2, column=0, padx=5, pady=5, sticky="nsew")
         self.available_listbox.bind("<Double-Button-1>", self.add_to_workout)
         selection_frame.grid_columnconfigure(0, weight=1)
 
         # Buttons in the middle
         button_col_frame = tk.Frame(selection_frame, bg="#f0f0f0")
-        button_col_frame.grid(row=1, column=1, padx=10)
+        button_col_frame.grid(row=2, column=1, padx=10)
         tk.Button(button_col_frame, text="Add >", command=self.add_to_workout, font=("Arial", 10), bg="#28A745", fg="white").pack(pady=5)
         tk.Button(button_col_frame, text="< Remove", command=self.remove_from_workout, font=("Arial", 10), bg="#DC3545", fg="white").pack(pady=5)
 
         # Selected Exercises Listbox
         tk.Label(selection_frame, text="Workout Exercises:", font=("Arial", 12, "bold"), bg="#f0f0f0").grid(row=0, column=2, padx=5, pady=5, sticky="w")
         self.selected_listbox = tk.Listbox(selection_frame, selectmode="single", height=10, font=("Arial", 12))
-        self.selected_listbox.grid(row=1, column=2, padx=5, pady=5, sticky="nsew")
+        self.selected_listbox.grid(row=2, column=2, padx=5, pady=5, sticky="nsew")
         self.selected_listbox.bind("<Double-Button-1>", self.remove_from_workout)
         selection_frame.grid_columnconfigure(2, weight=1)
 
         tk.Button(self, text="Save Workout", command=self.save_workout, font=("Arial", 14), bg="#007BFF", fg="white").pack(pady=20)
         tk.Button(self, text="Back to Home", command=lambda: self.app.show_screen("home"), font=("Arial", 12), bg="#6C757D", fg="white").pack(pady=10)
 
+    def data_versions(self):
+        user = UserManager.get_current_user()
+        return (user["id"] if user else None, database.get_data_version("exercises"))
+
     def refresh(self):
+        # A half-built workout survives a catalog reload, but not a change of user
+        user = UserManager.get_current_user()
+        user_id = user["id"] if user else None
+        if user_id != self._form_user_id:
+            self._form_user_id = user_id
+            self.reset_form()
+        self.load_available_exercises()
+
+    def reset_form(self):
         self.workout_name_entry.delete(0, tk.END)
         self.selected_exercises = []
-        self.update_listboxes()
-        self.load_available_exercises()
+        self._selected_ids = set()
+        self.selected_listbox.delete(0, tk.END)
+        self.search_var.set("") # Also refills the available list
 
     def load_available_exercises(self):
-        self.available_exercises = database.get_all_exercises()
-        self.update_listboxes()
+        self.load_exercises(self.on_exercises_loaded)
+
+    def on_exercises_loaded(self, exercises):
+        self.available_exercises = exercises
+        self.search_index = NameIndex(exercises)
+        self.show_available()
 
-    def update_listboxes(self):
+    def show_available(self):
+        """Fills the available list with the unselected exercises matching the search box."""
+        self._shown = ResultRows(self.search_index.search(self.search_var.get()),
+                                 lambda i: self.available_exercises[i][0] not in self._selected_ids)
         self.available_listbox.delete(0, tk.END)
-        for ex in self.available_exercises:
-            if ex not in self.selected_exercises:
-                self.available_listbox.insert(tk.END, ex[1]) # ex[1] is the name
+        if self._shown:
+            self.available_listbox.insert(tk.END, *(self.available_exercises[i][1] for i in self._shown)) # ex[1] is the name
 
-        self.selected_listbox.delete(0, tk.END)
-        for ex in self.selected_exercises:
-            self.selected_listbox.insert(tk.END, ex[1])
+    def add_first_match(self, event=None):
+        if self._shown:
+            self.add_at(0)
 
     def add_to_workout(self, event=None):
         selection_index = self.available_listbox.curselection()
         if selection_index:
-            exercise = self.available_exercises[selection_index[0]]
-            if exercise not in self.selected_exercises:
-                self.selected_exercises.append(exercise)
-                self.update_listboxes()
+            self.add_at(selection_index[0])
+
+    def add_at(self, row):
+        """Moves the exercise on `row` of the available list into the workout, touching only that row."""
+        exercise = self.available_exercises[self._shown.hide(row)] # Rows map through _shown, not the catalog
+        self.available_listbox.delete(row)
+        self._selected_ids.add(exercise[0])
+        self.selected_exercises.append(exercise)
+        self.selected_listbox.insert(tk.END, exercise[1])
 
     def remove_from_workout(self, event=None):
         selection_index = self.selected_listbox.curselection()
-        if selection_index:
-            del self.selected_exercises[selection_index[0]]
-            self.update_listboxes()
+        if not selection_index:
+            return
+        row = selection_index[0]
+        exercise = self.selected_exercises.pop(row)
+        self.selected_listbox.delete(row)
+        self._selected_ids.discard(exercise[0])
+
+        # Put it back where the current search lists it, if it matches at all
+        position = self.search_index.positions.get(exercise)
+        row = self._shown.show(position) if position is not None else None
+        if row is not None:
+            self.available_listbox.insert(row, exercise[1])
 
     def save_workout(self):
         workout_name = self.workout_name_entry.get().strip()
@@ -320,14 +512,59 @@ class WorkoutCreatorScreen(BaseScreen):
 
         exercise_ids = [ex[0] for ex in self.selected_exercises] # ex[0] is the ID
 
-        if database.create_workout(user["id"], workout_name, exercise_ids):
+        self.run_query(database.create_workout, user["id"], workout_name, exercise_ids,
+                       on_done=lambda saved: self.on_workout_saved(saved, workout_name), loading="Saving workout...")
+
+    def on_workout_saved(self, saved, workout_name):
+        if saved:
             NotificationManager.show_notification(f"Workout '{workout_name}' saved successfully!", fg="green")
+            self.reset_form()
             self.app.show_screen("home") # Or stay on screen and clear form
         else:
             NotificationManager.show_notification("Failed to save workout.", fg="red")
 
 
+class ExerciseLogPanel(tk.LabelFrame):
+    """
+    Form for logging one exercise of a workout. LogWorkoutScreen keeps a small pool
+    of these and rebinds them to whichever exercises are scrolled into view.
+    """
+    FIELDS = [("Sets", "sets"), ("Reps", "reps"), ("Weight (kg)", "weight"),
+              ("Duration (min)", "duration"), ("Calories Burned", "calories"), ("Notes", "notes")]
+
+    def __init__(self, master):
+        super().__init__(master, text="", font=("Arial", 12, "bold"), bg="#f0f0f0", bd=2, relief="groove")
+        self.entries = {}
+        for field, key in self.FIELDS:
+            row_frame = tk.Frame(self, bg="#f0f0f0")
+            row_frame.pack(fill="x", padx=5, pady=2)
+            tk.Label(row_frame, text=f"{field}:", font=("Arial", 10), bg="#f0f0f0", width=15, anchor="w").pack(side="left")
+            if key == "notes":
+                entry = scrolledtext.ScrolledText(row_frame, height=2, width=30, font=("Arial", 10))
+            else:
+                entry = tk.Entry(row_frame, width=20, font=("Arial", 10))
+            entry.pack(side="left", expand=True, fill="x")
+            self.entries[key] = entry
+
+    def load(self, exercise_name, values):
+        """Shows the form for `exercise_name`, filled with `values` (field key -> text)."""
+        self.config(text=exercise_name)
+        for key, entry in self.entries.items():
+            if key == "notes":
+                entry.delete("1.0", tk.END)
+                entry.insert("1.0", values.get(key, ""))
+            else:
+                entry.delete(0, tk.END)
+                entry.insert(0, values.get(key, ""))
+
+    def read(self):
+        """Returns the text of every field, keyed like FIELDS."""
+        return {key: entry.get("1.0", tk.END).strip() if key == "notes" else entry.get()
+                for key, entry in self.entries.items()}
+
 class LogWorkoutScreen(BaseScreen):
+    PANEL_PADDING = 5 # Vertical gap above and below each exercise panel
+
     def __init__(self, master, app_instance):
         super().__init__(master, app_instance)
         self.workouts = []
@@ -341,71 +578,106 @@ class LogWorkoutScreen(BaseScreen):
         self.workout_listbox.pack(pady=5, padx=20, fill="x")
         self.workout_listbox.bind("<<ListboxSelect>>", self.on_workout_select)
 
-        # Exercise Logging Area (Scrollable)
-        self.log_frame = ScrollFrame(self, bg="#e0e0e0")
+        # Exercise Logging Area (Scrollable). Only the rows in view have a panel; panels
+        # scrolled out of view go back to the pool and are rebound to the rows coming in.
+        self.log_frame = ScrollFrame(self, bg="#e0e0e0", on_scroll=self.update_visible_panels)
         self.log_frame.pack(pady=10, padx=20, fill="both", expand=True)
+        self.form_message = tk.Label(self.log_frame.frame, text="", font=("Arial", 12), bg="#e0e0e0")
 
-        self.exercise_entries = {} # Store Entry widgets for each exercise
+        self.form_values = {} # Row -> field values entered so far, kept while its panel is reused
+        self._panels = {} # Row -> panel currently showing it
+        self._panel_pool = [] # Built panels not bound to any row
+        self._slot_height = None # Height of one row, measured from the first panel built
 
         tk.Button(self, text="Submit Log", command=self.submit_log, font=("Arial", 14), bg="#007BFF", fg="white").pack(pady=20)
         tk.Button(self, text="Back to Home", command=lambda: self.app.show_screen("home"), font=("Arial", 12), bg="#6C757D", fg="white").pack(pady=10)
 
+    def data_versions(self):
+        user = UserManager.get_current_user()
+        return (user["id"], database.get_data_version("workouts", user["id"])) if user else (None,)
+
     def refresh(self):
         self.workouts = []
         user = UserManager.get_current_user()
         if user:
-            self.workouts = database.get_user_workouts(user["id"])
-            self.workout_listbox.delete(0, tk.END)
-            if self.workouts:
-                for wid, wname in self.workouts:
-                    self.workout_listbox.insert(tk.END, wname)
-            else:
-                self.workout_listbox.insert(tk.END, "No workouts created yet.")
-                self.workout_listbox.config(state="disabled") # Disable if no workouts
+            self.run_query(database.get_user_workouts, user["id"], on_done=self.on_workouts_loaded, loading="Loading workouts...")
         self.clear_exercise_entries()
 
+    def on_workouts_loaded(self, workouts):
+        self.workouts = workouts
+        self.workout_listbox.config(state="normal")
+        self.workout_listbox.delete(0, tk.END)
+        if self.workouts:
+            for wid, wname in self.workouts:
+                self.workout_listbox.insert(tk.END, wname)
+        else:
+            self.workout_listbox.insert(tk.END, "No workouts created yet.")
+            self.workout_listbox.config(state="disabled") # Disable if no workouts
+
     def clear_exercise_entries(self):
-        for widget in self.log_frame.frame.winfo_children():
-            widget.destroy()
-        self.exercise_entries = {}
+        self.reset_form()
         self.selected_workout_exercises = []
 
+    def reset_form(self):
+        """Unbinds every panel and forgets the values entered. Costs the same for any workout size."""
+        for panel in self._panels.values():
+            panel.place_forget()
+            self._panel_pool.append(panel)
+        self._panels = {}
+        self.form_values = {}
+        self.form_message.place_forget()
+        self.log_frame.frame.config(height=1)
+
     def on_workout_select(self, event):
         selection_index = self.workout_listbox.curselection()
         if selection_index:
             workout_id = self.workouts[selection_index[0]][0] # Get workout ID
-            self.selected_workout_exercises = database.get_workout_details(workout_id)
-            self.display_exercise_logging_form()
+            self.run_query(database.get_workout_details, workout_id, on_done=self.on_workout_details_loaded, loading="Loading workout...")
+
+    def on_workout_details_loaded(self, exercises):
+        self.selected_workout_exercises = exercises
+        self.display_exercise_logging_form()
 
     def display_exercise_logging_form(self):
-        self.clear_exercise_entries()
+        self.reset_form()
+        self.log_frame.scrollToTop()
 
         if not self.selected_workout_exercises:
-            tk.Label(self.log_frame.frame, text="Select a workout to log exercises.", font=("Arial", 12), bg="#e0e0e0").pack(pady=10)
+            self.form_message.config(text="Select a workout to log exercises.")
+            self.form_message.place(x=10, y=10)
+            self.log_frame.frame.config(height=self.form_message.winfo_reqheight() + 20)
             return
 
-        for i, exercise in enumerate(self.selected_workout_exercises):
-            ex_id, ex_name, _, _, _ = exercise
-            frame = tk.LabelFrame(self.log_frame.frame, text=ex_name, font=("Arial", 12, "bold"), bg="#f0f0f0", bd=2, relief="groove")
-            frame.pack(fill="x", padx=10, pady=5)
-
-            # Use a dictionary to store entry widgets for easy retrieval
-            self.exercise_entries[ex_id] = {}
-
-            fields = ["Sets", "Reps", "Weight (kg)", "Duration (min)", "Calories Burned", "Notes"]
-            keys = ["sets", "reps", "weight", "duration", "calories", "notes"]
-
-            for j, (field, key) in enumerate(zip(fields, keys)):
-                row_frame = tk.Frame(frame, bg="#f0f0f0")
-                row_frame.pack(fill="x", padx=5, pady=2)
-                tk.Label(row_frame, text=f"{field}:", font=("Arial", 10), bg="#f0f0f0", width=15, anchor="w").pack(side="left")
-                if key == "notes":
-                    entry = scrolledtext.ScrolledText(row_frame, height=2, width=30, font=("Arial", 10))
-                else:
-                    entry = tk.Entry(row_frame, width=20, font=("Arial", 10))
-                entry.pack(side="left", expand=True, fill="x")
-                self.exercise_entries[ex_id][key] = entry
-
+        if self._slot_height is None:
+            panel = ExerciseLogPanel(self.log_frame.frame)
+            self._panel_pool.append(panel)
+            panel.update_idletasks() # Lets Tk compute the panel's requested size
+            self._slot_height = panel.winfo_reqheight() + 2 * self.PANEL_PADDING
+        # Rows are a fixed height, so the scroll region is known without building them
+        self.log_frame.frame.config(height=len(self.selected_workout_exercises) * self._slot_height)
+        self.update_visible_panels()
+
+    def update_visible_panels(self):
+        """Binds panels to the rows in view, taking them from rows that scrolled out of view."""
+        if not self.selected_workout_exercises or self._slot_height is None:
+            return
+        top, bottom = self.log_frame.visibleSpan()
+        first = max(0, int(top // self._slot_height))
+        last = min(len(self.selected_workout_exercises) - 1, int(bottom // self._slot_height))
+
+        for row in [row for row in self._panels if row < first or row > last]:
+            panel = self._panels.pop(row)
+            self.form_values[row] = panel.read()
+            panel.place_forget()
+            self._panel_pool.append(panel)
+
+        for row in range(first, last + 1):
+            if row in self._panels:
+                continue
+            panel = self._panel_pool.pop() if self._panel_pool else ExerciseLogPanel(self.log_frame.frame)
+            panel.load(self.selected_workout_exercises[row][1], self.form_values.get(row, {}))
+            panel.place(x=10, y=row * self._slot_height + self.PANEL_PADDING, relwidth=1, width=-20)
+            self._panels[row] = panel
 
     def submit_log(self):
         user = UserManager.get_current_user()
@@ -415,13 +687,21 @@ class LogWorkoutScreen(BaseScreen):
 
         log_date = datetime.date.today().isoformat() # YYYY-MM-DD
 
-        for exercise_id, entries in self.exercise_entries.items():
-            sets = entries["sets"].get()
-            reps = entries["reps"].get()
-            weight = entries["weight"].get()
-            duration = entries["duration"].get()
-            calories = entries["calories"].get()
-            notes = entries["notes"].get("1.0", tk.END).strip() # For ScrolledText
+        # Values of rows in view still live in their panels
+        for row, panel in self._panels.items():
+            self.form_values[row] = panel.read()
+
+        # Parse every form first so nothing is written if any entry is invalid
+        exercise_logs = []
+        for row, exercise in enumerate(self.selected_workout_exercises):
+            exercise_id, exercise_name = exercise[0], exercise[1]
+            entries = self.form_values.get(row, {})
+            sets = entries.get("sets")
+            reps = entries.get("reps")
+            weight = entries.get("weight")
+            duration = entries.get("duration")
+            calories = entries.get("calories")
+            notes = entries.get("notes", "")
 
             try:
                 sets = int(sets) if sets else None
@@ -430,51 +710,316 @@ class LogWorkoutScreen(BaseScreen):
                 duration = float(duration) if duration else None
                 calories = float(calories) if calories else None
             except ValueError:
-                NotificationManager.show_notification(f"Invalid numeric input for {database.get_exercise_by_id(exercise_id)[1]}. Please use numbers.", fg="red")
+                NotificationManager.show_notification(f"Invalid numeric input for {exercise_name}. Please use numbers.", fg="red")
                 return
 
-            if not database.log_exercise(user["id"], exercise_id, sets, reps, weight, duration, calories, notes, log_date):
-                NotificationManager.show_notification(f"Failed to log exercise: {database.get_exercise_by_id(exercise_id)[1]}", fg="red")
-                return
+            exercise_logs.append((exercise_id, sets, reps, weight, duration, calories, notes))
+
+        self.run_query(database.log_workout_session, user["id"], exercise_logs, log_date,
+                       on_done=self.on_log_submitted, loading="Saving workout log...")
+
+    def on_log_submitted(self, logged):
+        if not logged:
+            NotificationManager.show_notification("Failed to log workout. Nothing was saved.", fg="red")
+            return
 
         NotificationManager.show_notification("Workout logged successfully!", fg="green")
+        # Start from an empty form next time; the workout list itself is still current
+        self.workout_listbox.selection_clear(0, tk.END)
+        self.clear_exercise_entries()
         self.app.show_screen("home")
 
 
 class ProgressTrackingScreen(BaseScreen):
+    PAGE_SIZE = 50 # Log entries fetched per page
+    WINDOW_PAGES = 4 # Pages kept in the text widget; pages scrolled further away are dropped
+    LOAD_MORE_AT = 0.9 # Fetch the next page once the view is scrolled past this fraction (or above 1 - it)
+
     def __init__(self, master, app_instance):
         super().__init__(master, app_instance)
-        self.logs = []
+        # The text widget holds a window of consecutive pages. Page i is fetched with
+        # _page_cursors[i]: a (log_date, id) cursor, or an offset for notes searches.
+        self._page_cursors = []
+        self._window = [] # (page index, line count) of the pages shown, top to bottom
+        self._has_more = False
+        self._page_loading = False
+        self._generation = 0 # Bumped on refresh so a late summary from an old view is dropped
+        self._log_generation = 0 # Bumped when the log list restarts so late pages are dropped
+        self._search_query = None # Notes search shown instead of the full log, if any
+        self.chart_exercises = {} # Exercise name -> id, for the chart selector
+        self.chart_photo = None # Keeps the shown chart's PhotoImage alive
+        self._chart_path = None
+        self._chart_request = 0 # Bumped per chart request so only the newest result is shown
 
         tk.Label(self, text="Your Progress", font=("Arial", 20, "bold"), bg="#f0f0f0").pack(pady=15)
 
+        # Summary panel backed by the vectorized analytics module
+        self.summary_label = tk.Label(self, text="", font=("Arial", 11), justify="left", anchor="w", bg="#e8f4fd", padx=10, pady=8)
+        self.summary_label.pack(padx=20, fill="x")
+
+        # Trend chart, rendered off the Tk thread by the app's chart service
+        chart_controls = tk.Frame(self, bg="#f0f0f0")
+        chart_controls.pack(pady=(10, 0))
+        tk.Label(chart_controls, text="Chart:", font=("Arial", 11), bg="#f0f0f0").pack(side="left")
+        self.chart_exercise_var = StringVar()
+        self.chart_exercise_menu = tk.OptionMenu(chart_controls, self.chart_exercise_var, "")
+        self.chart_exercise_menu.pack(side="left", padx=5)
+        self.chart_metric_var = StringVar(value="weight")
+        tk.OptionMenu(chart_controls, self.chart_metric_var, *charts.METRICS, command=lambda _value: self.show_chart()).pack(side="left", padx=5)
+        self.chart_period_var = StringVar(value="week")
+        tk.OptionMenu(chart_controls, self.chart_period_var, *database.ROLLUP_PERIODS, command=lambda _value: self.show_chart()).pack(side="left", padx=5)
+        self.chart_label = tk.Label(self, text="", font=("Arial", 10, "italic"), bg="#f0f0f0")
+        self.chart_label.pack(padx=20)
+
+        # Full-text search over the notes of past sessions
+        search_frame = tk.Frame(self, bg="#f0f0f0")
+        search_frame.pack(pady=(10, 0))
+        tk.Label(search_frame, text="Search notes:", font=("Arial", 11), bg="#f0f0f0").pack(side="left")
+        self.log_search_entry = tk.Entry(search_frame, font=("Arial", 11), width=30)
+        self.log_search_entry.pack(side="left", padx=5)
+        self.log_search_entry.bind("<Return>", self.search_logs)
+        tk.Button(search_frame, text="Search", command=self.search_logs, font=("Arial", 10), bg="#007BFF", fg="white").pack(side="left", padx=5)
+        tk.Button(search_frame, text="Show All", command=self.clear_log_search, font=("Arial", 10), bg="#6C757D", fg="white").pack(side="left", padx=5)
+
         self.log_display_area = scrolledtext.ScrolledText(self, wrap=tk.WORD, width=80, height=20, font=("Arial", 10))
         self.log_display_area.pack(pady=10, padx=20, fill="both", expand=True)
         self.log_display_area.config(state="disabled") # Make it read-only
+        self.log_display_area.config(yscrollcommand=self.on_log_scroll)
 
         tk.Button(self, text="Back to Home", command=lambda: self.app.show_screen("home"), font=("Arial", 12), bg="#6C757D", fg="white").pack(pady=10)
 
+    def data_versions(self):
+        user = UserManager.get_current_user()
+        if not user:
+            return (None,)
+        return (user["id"], database.get_data_version("exercise_logs", user["id"]), database.get_data_version("exercises"))
+
     def refresh(self):
         user = UserManager.get_current_user()
+        self._generation += 1
+        self.summary_label.config(text="")
+        self.reload_logs()
+        if user:
+            generation = self._generation
+            # On its own thread, so the log pages and charts queued behind it are not held up
+            self.run_query(self.load_summary, user["id"],
+                           on_done=lambda summary: self.on_summary_loaded(summary, generation),
+                           loading="Analyzing your workouts...", executor=self.app.analytics_executor)
+            self.load_exercises(self.on_chart_exercises_loaded, loading="Loading charts...")
+        else:
+            self.set_log_text("Please log in to view your progress.")
+            self.set_chart(None, "")
+
+    @staticmethod
+    def load_summary(user_id):
+        """Runs on the app's analytics thread, which is also where NumPy gets imported on first use."""
+        import analytics
+        return analytics.user_summary(user_id)
+
+    def on_summary_loaded(self, summary, generation):
+        if generation != self._generation or not summary["total_logs"]:
+            return
+        streaks = summary["streaks"]
+        lines = [
+            f"Logged exercises: {summary['total_logs']}    Active days: {streaks['active_days']}    "
+            f"Streak: {streaks['current']} day(s) (longest {streaks['longest']})",
+        ]
+        week_line = f"Latest week volume: {summary['latest_week_volume']:.0f} kg"
+        if not math.isnan(summary["week_over_week_pct"]):
+            week_line += f" ({summary['week_over_week_pct']:+.0f}% vs previous week)"
+        lines.append(week_line)
+        best_lifts = sorted(
+            ((record["best_1rm"], name) for name, record in summary["records"].items() if not math.isnan(record["best_1rm"])),
+            reverse=True)[:3]
+        if best_lifts:
+            lines.append("Best estimated 1RM: " + ", ".join(f"{name} {one_rm:.1f} kg" for one_rm, name in best_lifts))
+        self.summary_label.config(text="\n".join(lines))
+
+    def on_chart_exercises_loaded(self, exercises):
+        self.chart_exercises = {ex[1]: ex[0] for ex in exercises}
+        menu = self.chart_exercise_menu["menu"]
+        menu.delete(0, tk.END)
+        for name in self.chart_exercises:
+            menu.add_command(label=name, command=lambda name=name: self.select_chart_exercise(name))
+        # Keep the selection across refreshes while the exercise still exists
+        if self.chart_exercise_var.get() not in self.chart_exercises:
+            self.chart_exercise_var.set(next(iter(self.chart_exercises), ""))
+        self.show_chart()
+
+    def select_chart_exercise(self, name):
+        self.chart_exercise_var.set(name)
+        self.show_chart()
+
+    def show_chart(self):
+        """
+        Shows the last chart rendered for the current selection straight away, then asks
+        the chart service for an up-to-date one, which is only redrawn if logs changed.
+        """
+        user = UserManager.get_current_user()
+        exercise_name = self.chart_exercise_var.get()
+        exercise_id = self.chart_exercises.get(exercise_name)
+        if not user or exercise_id is None:
+            self.set_chart(None, "")
+            return
+        metric = self.chart_metric_var.get()
+        period = self.chart_period_var.get()
+        self._chart_request += 1
+        request = self._chart_request
+
+        cached = self.app.chart_service.latest(user["id"], exercise_id, metric, period)
+        self.set_chart(cached, "" if cached else "Drawing chart...")
+        future = self.app.chart_service.submit(user["id"], exercise_id, metric, f"{exercise_name}: {metric} per {period}", period)
+        self.app.db_worker.watch(future,
+                                 on_done=lambda path: self.on_chart_rendered(path, request, exercise_name),
+                                 on_error=lambda error: self.on_chart_rendered(None, request, exercise_name, error))
+
+    def on_chart_rendered(self, path, request, exercise_name, error=None):
+        if request != self._chart_request:
+            return # The selection changed while this chart was rendering
+        if error is not None:
+            self.set_chart(None, f"Could not draw chart: {error}")
+        elif path is None:
+            self.set_chart(None, f"No {exercise_name} logs to chart yet.")
+        elif path != self._chart_path:
+            self.set_chart(path, "")
+
+    def set_chart(self, path, message):
+        # Tk reads PNG natively, so showing a cached chart needs neither Matplotlib nor PIL
+        try:
+            self.chart_photo = tk.PhotoImage(file=path) if path else None
+        except tk.TclError:
+            self.chart_photo, path = None, None # Replaced by a newer chart in the meantime
+        self._chart_path = path
+        self.chart_label.config(image=self.chart_photo or "", text=message)
+
+    def set_log_text(self, text):
         self.log_display_area.config(state="normal")
         self.log_display_area.delete("1.0", tk.END)
+        self.log_display_area.insert(tk.END, text)
+        self.log_display_area.config(state="disabled")
+
+    def reload_logs(self):
+        """Restarts the log list (or the notes search) from its first page."""
+        user = UserManager.get_current_user()
+        self._log_generation += 1
+        self._page_cursors = [None]
+        self._window = []
+        self._has_more = bool(user)
+        self._page_loading = False
         if user:
-            self.logs = database.get_user_exercise_logs(user["id"])
-            if self.logs:
-                self.log_display_area.insert(tk.END, "--- Your Exercise Log ---\n\n")
-                for log in self.logs:
-                    log_date, ex_name, sets, reps, weight, duration, calories, notes = log
-                    self.log_display_area.insert(tk.END, f"Date: {log_date}\n")
-                    self.log_display_area.insert(tk.END, f"  Exercise: {ex_name}\n")
-                    if sets is not None: self.log_display_area.insert(tk.END, f"  Sets: {sets}\n")
-                    if reps is not None: self.log_display_area.insert(tk.END, f"  Reps: {reps}\n")
-                    if weight is not None: self.log_display_area.insert(tk.END, f"  Weight: {weight:.1f} kg\n")
-                    if duration is not None: self.log_display_area.insert(tk.END, f"  Duration: {duration:.1f} min\n")
-                    if calories is not None: self.log_display_area.insert(tk.END, f"  Calories: {calories:.1f} kcal\n")
-                    if notes: self.log_display_area.insert(tk.END, f"  Notes: {notes}\n")
-                    self.log_display_area.insert(tk.END, "------------------------\n\n")
+            self.set_log_text("")
+            self.load_page(0)
+
+    def search_logs(self, event=None):
+        self._search_query = self.log_search_entry.get().strip() or None
+        self.reload_logs()
+
+    def clear_log_search(self):
+        self.log_search_entry.delete(0, tk.END)
+        self.search_logs()
+
+    def on_log_scroll(self, first, last):
+        self.log_display_area.vbar.set(first, last)
+        if float(last) >= self.LOAD_MORE_AT:
+            self.load_next_page()
+        elif float(first) <= 1 - self.LOAD_MORE_AT:
+            self.load_previous_page()
+
+    def load_next_page(self):
+        if self._window and self._has_more:
+            self.load_page(self._window[-1][0] + 1)
+
+    def load_previous_page(self):
+        """Fetches again the page above the window, if it was dropped."""
+        if self._window and self._window[0][0] > 0:
+            self.load_page(self._window[0][0] - 1)
+
+    def load_page(self, index):
+        user = UserManager.get_current_user()
+        if not user or self._page_loading:
+            return
+        self._page_loading = True
+        generation = self._log_generation
+        cursor = self._page_cursors[index]
+        on_done = lambda page: self.on_page_loaded(page, index, generation)
+        on_error = lambda _error: self.on_page_failed(generation)
+        if self._search_query:
+            # Search pages are ranked, so the cursor is an offset into the results
+            self.run_query(database.search_exercise_logs, user["id"], self._search_query, self.PAGE_SIZE, cursor or 0,
+                           on_done=on_done, on_error=on_error, loading="Searching notes...")
+            return
+        self.run_query(database.get_user_exercise_logs_page, user["id"], self.PAGE_SIZE, cursor,
+                       on_done=on_done, on_error=on_error,
+                       loading="Loading your progress..." if index == 0 else "Loading more logs...")
+
+    def on_page_failed(self, generation):
+        if generation == self._log_generation:
+            self._page_loading = False # Scrolling tries the page again
+
+    @staticmethod
+    def format_log(log):
+        log_date, ex_name, sets, reps, weight, duration, calories, notes = log
+        lines = [f"Date: {log_date}", f"  Exercise: {ex_name}"]
+        if sets is not None: lines.append(f"  Sets: {sets}")
+        if reps is not None: lines.append(f"  Reps: {reps}")
+        if weight is not None: lines.append(f"  Weight: {weight:.1f} kg")
+        if duration is not None: lines.append(f"  Duration: {duration:.1f} min")
+        if calories is not None: lines.append(f"  Calories: {calories:.1f} kcal")
+        if notes: lines.append(f"  Notes: {notes}")
+        lines.append("------------------------\n\n")
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_search_result(result):
+        _log_id, log_date, ex_name, snippet = result
+        return f"Date: {log_date}\n  Exercise: {ex_name}\n  Notes: {snippet}\n------------------------\n\n"
+
+    def on_page_loaded(self, page, index, generation):
+        if generation != self._log_generation:
+            return # The list was restarted while this page was loading
+        self._page_loading = False
+        logs, next_cursor = page
+        if index == 0 and not logs:
+            if self._search_query:
+                self.set_log_text(f"No notes match '{self._search_query}'.")
             else:
-                self.log_display_area.insert(tk.END, "No exercise logs found yet. Start logging your workouts!")
+                self.set_log_text("No exercise logs found yet. Start logging your workouts!")
+            return
+        if len(self._page_cursors) == index + 1:
+            self._page_cursors.append(next_cursor)
+
+        if self._search_query:
+            text = "".join(self.format_search_result(result) for result in logs)
+            header = f"--- Notes matching '{self._search_query}' (best first) ---\n\n"
+        else:
+            text = "".join(self.format_log(log) for log in logs)
+            header = "--- Your Exercise Log ---\n\n"
+        if index == 0:
+            text = header + text
+        lines = text.count("\n")
+
+        # One insert per page keeps Tk layout work proportional to the page, not the history.
+        # Pages beyond WINDOW_PAGES are dropped from the far end, and the view is moved by the
+        # lines added or removed above it so the visible logs stay in place.
+        area = self.log_display_area
+        top_line = int(area.index("@0,0").split(".")[0])
+        area.config(state="normal")
+        if not self._window or index > self._window[-1][0]:
+            area.insert(tk.END, text)
+            self._window.append((index, lines))
+            self._has_more = next_cursor is not None
+            if len(self._window) > self.WINDOW_PAGES:
+                _index, dropped = self._window.pop(0)
+                area.delete("1.0", f"{dropped + 1}.0")
+                top_line -= dropped
         else:
-            self.log_display_area.insert(tk.END, "Please log in to view your progress.")
-        self.log_display_area.config(state="disabled")
\ No newline at end of file
+            area.insert("1.0", text)
+            self._window.insert(0, (index, lines))
+            top_line += lines
+            if len(self._window) > self.WINDOW_PAGES:
+                _index, dropped = self._window.pop()
+                kept = sum(page_lines for _index, page_lines in self._window)
+                area.delete(f"{kept + 1}.0", "end-1c")
+                self._has_more = True
+        area.config(state="disabled")
+        area.yview(f"{max(top_line, 1)}.0")